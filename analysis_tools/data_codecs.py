@@ -0,0 +1,226 @@
+"""Module containing functions to save and load pickled data files with a selectable compression codec
+
+Files are written with a short format header that records the codec used, so that files can be loaded without
+knowing how they were written. Files without a header are read as bz2 compressed pickles, which is the format of
+existing files within the data directory, so existing and transcoded files can be mixed freely. Files are written
+with bz2 by default. The zstd and lz4 codecs require the optional zstandard and lz4 packages respectively, which are
+only imported when used.
+
+Functions
+---------
+save_object(obj, file_path, codec='bz2', level=None):
+    Pickle and save an object to file, compressed using the selected codec.
+
+load_object(file_path):
+    Load a pickled object from file, determining the codec from the file header.
+
+file_codec(file_path):
+    Determine the codec used to write a data file.
+
+transcode_folder(folder, codec='zstd', level=None, extension='.pbz2'):
+    Rewrite all data files within a folder (and sub-folders) using the selected codec.
+
+benchmark_codecs(file_paths, codecs=('bz2', 'zstd', 'lz4', 'none'), repeats=3):
+    Measure the compressed size and decode throughput of each codec on a set of data files.
+"""
+
+import bz2
+import os
+import pickle
+import time
+import pandas as pd
+
+
+# File header: magic bytes, format version and codec identifier
+MAGIC = b'JKDC'
+FORMAT_VERSION = 1
+CODEC_IDS = {'none': 0, 'bz2': 1, 'zstd': 2, 'lz4': 3}
+HEADER_LENGTH = len(MAGIC) + 2
+
+
+def _get_codec(codec, level=None):
+    """ Get the compress and decompress functions of a codec, importing optional packages as required."""
+
+    if codec == 'none':
+        return (lambda data: data), (lambda data: data)
+
+    elif codec == 'bz2':
+        return (lambda data: bz2.compress(data, level or 9)), bz2.decompress
+
+    elif codec == 'zstd':
+        try:
+            import zstandard
+        except ImportError:
+            raise ImportError("The zstd codec requires the zstandard package (pip install zstandard)")
+        return (lambda data: zstandard.ZstdCompressor(level=level or 3).compress(data),
+                lambda data: zstandard.ZstdDecompressor().decompress(data))
+
+    elif codec == 'lz4':
+        try:
+            import lz4.frame
+        except ImportError:
+            raise ImportError("The lz4 codec requires the lz4 package (pip install lz4)")
+        return (lambda data: lz4.frame.compress(data, compression_level=level or 0)), lz4.frame.decompress
+
+    else:
+        raise ValueError(f"Unknown codec '{codec}'. Choose from {list(CODEC_IDS)}")
+
+
+def save_object(obj, file_path, codec='bz2', level=None):
+    """ Pickle and save an object to file, compressed using the selected codec.
+
+    Args:
+        obj (object): object to save, e.g. pandas.DataFrame.
+        file_path (str): location of file to write, relative to script in which function is called.
+        codec (str, optional): compression codec, one of 'bz2', 'zstd', 'lz4' or 'none'. Defaults to 'bz2'. The zstd
+                               and lz4 codecs require the optional zstandard and lz4 packages.
+        level (int, optional): compression level. Defaults to the standard level of the codec.
+
+    Returns:
+        int: size of file written, in bytes.
+    """
+
+    compress, _ = _get_codec(codec, level)
+    data = compress(pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL))
+
+    # Write to temporary file first, so that an existing file is only replaced once the new file is complete
+    with open(f"{file_path}.tmp", 'wb') as f:
+        f.write(MAGIC + bytes([FORMAT_VERSION, CODEC_IDS[codec]]))
+        f.write(data)
+    os.replace(f"{file_path}.tmp", file_path)
+
+    return HEADER_LENGTH + len(data)
+
+
+def _read_file(file_path):
+    """ Read a data file, returning codec and (still compressed) payload. Files without a header are bz2 payloads."""
+
+    with open(file_path, 'rb') as f:
+        data = f.read()
+
+    if data[:len(MAGIC)] == MAGIC:
+        if data[len(MAGIC)] > FORMAT_VERSION:
+            raise ValueError(f"{file_path} was written with a newer file format (version {data[len(MAGIC)]})")
+        codec = {codec_id: name for name, codec_id in CODEC_IDS.items()}[data[len(MAGIC) + 1]]
+        return codec, data[HEADER_LENGTH:]
+    else:
+        return 'bz2', data
+
+
+def load_object(file_path):
+    """ Load a pickled object from file, determining the codec from the file header.
+
+    Args:
+        file_path (str): location of file to read, relative to script in which function is called.
+
+    Returns:
+        object: unpickled object, e.g. pandas.DataFrame.
+    """
+
+    codec, data = _read_file(file_path)
+    _, decompress = _get_codec(codec)
+
+    return pickle.loads(decompress(data))
+
+
+def file_codec(file_path):
+    """ Determine the codec used to write a data file.
+
+    Args:
+        file_path (str): location of file, relative to script in which function is called.
+
+    Returns:
+        str: codec name.
+    """
+
+    with open(file_path, 'rb') as f:
+        header = f.read(HEADER_LENGTH)
+
+    if header[:len(MAGIC)] == MAGIC:
+        return {codec_id: name for name, codec_id in CODEC_IDS.items()}[header[len(MAGIC) + 1]]
+    else:
+        return 'bz2'
+
+
+def transcode_folder(folder, codec='zstd', level=None, extension='.pbz2'):
+    """ Rewrite all data files within a folder (and sub-folders) using the selected codec.
+
+    Function to rewrite existing data files in place, using the selected codec. File names are unchanged, and files
+    already written with the selected codec are skipped. Files can be read with load_object regardless of codec.
+
+    Args:
+        folder (str): location of folder, relative to script in which function is called.
+        codec (str, optional): compression codec, one of 'zstd', 'lz4', 'bz2' or 'none'. Defaults to 'zstd', which
+                               requires the optional zstandard package.
+        level (int, optional): compression level. Defaults to the standard level of the codec.
+        extension (str, optional): extension of files to transcode. Defaults to '.pbz2'.
+
+    Returns:
+        pandas.DataFrame: file path, original codec, original size and new size of each transcoded file.
+    """
+
+    # Initialise output
+    transcoded = []
+
+    for root, _, files in os.walk(folder):
+        for file in sorted(files):
+            if not file.endswith(extension):
+                continue
+            file_path = f"{root}/{file}"
+            original_codec = file_codec(file_path)
+            if original_codec == codec:
+                continue
+            original_size = os.path.getsize(file_path)
+            new_size = save_object(load_object(file_path), file_path, codec=codec, level=level)
+            transcoded.append({'file': file_path, 'original_codec': original_codec, 'original_size': original_size,
+                               'new_size': new_size})
+
+    return pd.DataFrame(transcoded, columns=['file', 'original_codec', 'original_size', 'new_size'])
+
+
+def benchmark_codecs(file_paths, codecs=('bz2', 'zstd', 'lz4', 'none'), repeats=3):
+    """ Measure the compressed size and decode throughput of each codec on a set of data files.
+
+    Function to load each data file, re-compress its pickled contents in memory with each codec and time how long
+    each codec takes to decompress and unpickle the contents. Codecs whose optional package is not installed are
+    skipped. Decode throughput is reported relative to the uncompressed (pickled) size of the data.
+
+    Args:
+        file_paths (list): locations of data files to benchmark, relative to script in which function is called.
+        codecs (tuple, optional): codecs to benchmark. Defaults to bz2, zstd, lz4 and none.
+        repeats (int, optional): number of timed decodes of each file, with the fastest taken. Defaults to 3.
+
+    Returns:
+        pandas.DataFrame: one row per codec, with total compressed size, compression ratio, decode time and decode
+                          throughput (MB/s) across all files.
+    """
+
+    # Initialise output
+    results = []
+
+    raw_data = [pickle.dumps(load_object(file_path), protocol=pickle.HIGHEST_PROTOCOL) for file_path in file_paths]
+    raw_size = sum(len(data) for data in raw_data)
+
+    for codec in codecs:
+        try:
+            compress, decompress = _get_codec(codec)
+        except ImportError:
+            continue
+
+        compressed_size = 0
+        decode_time = 0
+        for data in raw_data:
+            compressed = compress(data)
+            compressed_size += len(compressed)
+            timings = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                pickle.loads(decompress(compressed))
+                timings.append(time.perf_counter() - start)
+            decode_time += min(timings)
+
+        results.append({'codec': codec, 'compressed_mb': compressed_size / 1024 ** 2,
+                        'compression_ratio': raw_size / compressed_size, 'decode_seconds': decode_time,
+                        'decode_mb_per_second': (raw_size / 1024 ** 2) / decode_time})
+
+    return pd.DataFrame(results)
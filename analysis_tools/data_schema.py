@@ -0,0 +1,164 @@
+"""Module containing the compact dtype schema applied to event and player data, and functions to enforce it
+
+The schemas map column names to the dtype each column is held in once loaded. Repeated strings (event types,
+outcomes, team and player names) are held as categoricals, integer-valued ids, periods and minutes as pandas nullable
+integers (so that missing values no longer force float64), and pitch coordinates as float32. Columns that are absent
+from a dataframe are ignored, and columns whose values cannot be represented in the schema dtype (for example
+WhoScored carry events, which are given half-integer event ids) are left unchanged.
+
+Schemas
+-------
+WHOSCORED_EVENT_SCHEMA, WHOSCORED_PLAYER_SCHEMA:
+    Compact dtypes for WhoScored-style event and player data.
+
+STATSBOMB_EVENT_SCHEMA, STATSBOMB_LINEUP_SCHEMA:
+    Compact dtypes for StatsBomb-style event and lineup data.
+
+Functions
+---------
+apply_schema(df, schema, report=False):
+    Convert the columns of a dataframe to the dtypes defined in a schema.
+
+concat_with_schema(frames, schema):
+    Concatenate dataframes and apply a schema, without losing categorical dtypes.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+# WhoScored event data. eventId is held as float32 as carries are given half-integer ids.
+WHOSCORED_EVENT_SCHEMA = {
+    'eventType': 'category', 'outcomeType': 'category', 'team_name': 'category', 'opp_team_name': 'category',
+    'match_id': 'Int32', 'teamId': 'Int32', 'playerId': 'Int32', 'relatedEventId': 'Int32',
+    'relatedPlayerId': 'Int32', 'pass_recipient': 'Int32', 'period': 'Int8', 'minute': 'Int16', 'second': 'Int8',
+    'expandedMinute': 'Int16', 'eventId': 'float32', 'x': 'float32', 'y': 'float32', 'endX': 'float32',
+    'endY': 'float32', 'goalMouthY': 'float32', 'goalMouthZ': 'float32', 'blockedX': 'float32', 'blockedY': 'float32'}
+
+# WhoScored player data
+WHOSCORED_PLAYER_SCHEMA = {
+    'name': 'category', 'team': 'category', 'position': 'category', 'field': 'category',
+    'match_id': 'Int32', 'teamId': 'Int32', 'playerId': 'Int32', 'shirtNo': 'Int8', 'age': 'Int8',
+    'height': 'Int16', 'weight': 'Int16', 'subbedInExpandedMinute': 'Int16', 'subbedOutExpandedMinute': 'Int16'}
+
+# StatsBomb event data
+STATSBOMB_EVENT_SCHEMA = {
+    'type_name': 'category', 'sub_type_name': 'category', 'outcome_name': 'category', 'team_name': 'category',
+    'possession_team_name': 'category', 'player_name': 'category', 'position_name': 'category',
+    'play_pattern_name': 'category', 'body_part_name': 'category', 'technique_name': 'category',
+    'pass_height_name': 'category', 'match_id': 'Int32', 'team_id': 'Int32', 'player_id': 'Int32',
+    'possession_team_id': 'Int32', 'position_id': 'Int8', 'type_id': 'Int16', 'sub_type_id': 'Int16',
+    'outcome_id': 'Int16', 'period': 'Int8', 'minute': 'Int16', 'second': 'Int8', 'possession': 'Int16',
+    'index': 'Int32', 'x': 'float32', 'y': 'float32', 'z': 'float32', 'end_x': 'float32', 'end_y': 'float32',
+    'end_z': 'float32', 'pass_length': 'float32', 'pass_angle': 'float32', 'shot_statsbomb_xg': 'float32',
+    'obv_for_net': 'float32', 'obv_against_net': 'float32', 'obv_total_net': 'float32'}
+
+# StatsBomb lineup data
+STATSBOMB_LINEUP_SCHEMA = {
+    'player_name': 'category', 'player_nickname': 'category', 'team_name': 'category', 'position_name': 'category',
+    'competition': 'category', 'season': 'category', 'match_id': 'Int32', 'team_id': 'Int32', 'player_id': 'Int32',
+    'position_id': 'Int8', 'jersey_number': 'Int8'}
+
+
+def _memory_mb(df):
+    """ Deep memory usage of a dataframe, in megabytes."""
+
+    return df.memory_usage(index=True, deep=True).sum() / 1024 ** 2
+
+
+def _convert_column(series, dtype):
+    """ Convert a series to a schema dtype, returning the series unchanged if it cannot be represented."""
+
+    if series.dtype == dtype:
+        return series
+
+    if dtype == 'category':
+        try:
+            return series.astype('category')
+        except TypeError:
+            # Unhashable values, such as nested dicts or lists
+            return series
+
+    if not pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series):
+        return series
+
+    if dtype.startswith('float'):
+        return series.astype(dtype)
+
+    # Nullable integers only where values are integral and within range of the target dtype
+    values = series.dropna().to_numpy(dtype='float64')
+    limits = np.iinfo(dtype.lower())
+    if len(values) and (np.any(values % 1 != 0) or values.min() < limits.min or values.max() > limits.max):
+        return series
+
+    return series.astype(dtype)
+
+
+def apply_schema(df, schema, report=False):
+    """ Convert the columns of a dataframe to the dtypes defined in a schema.
+
+    Function to convert each column of a dataframe that appears within a schema to the compact dtype defined by the
+    schema. Columns not within the schema, and columns whose values cannot be represented by the schema dtype, are
+    left unchanged. The memory saved by the conversion can optionally be reported.
+
+    Args:
+        df (pandas.DataFrame): event or player dataframe to convert.
+        schema (dict): dictionary of column names and dtypes, e.g. WHOSCORED_EVENT_SCHEMA.
+        report (bool, optional): selection of whether to print the memory used before and after conversion. False by
+                                 default.
+
+    Returns:
+        pandas.DataFrame: dataframe with columns converted to schema dtypes.
+    """
+
+    if report:
+        mem_before = _memory_mb(df)
+
+    # Initialise output
+    df_out = df.copy()
+    for col, dtype in schema.items():
+        if col in df_out.columns:
+            df_out[col] = _convert_column(df_out[col], dtype)
+
+    if report:
+        mem_after = _memory_mb(df_out)
+        saving = 100 * (1 - mem_after / mem_before) if mem_before else 0
+        print(f"Memory usage reduced from {mem_before:.1f} MB to {mem_after:.1f} MB ({saving:.0f}% saving)")
+
+    return df_out
+
+
+def concat_with_schema(frames, schema):
+    """ Concatenate dataframes and apply a schema, without losing categorical dtypes.
+
+    Function to concatenate a list of dataframes (for example, the event data of individual matches) that have each
+    had a schema applied. Categorical columns are given a common set of categories before concatenation, so that they
+    are not expanded back to object strings, and the schema is re-applied to the concatenated dataframe.
+
+    Args:
+        frames (list): list of pandas.DataFrame objects to concatenate.
+        schema (dict): dictionary of column names and dtypes, e.g. WHOSCORED_EVENT_SCHEMA.
+
+    Returns:
+        pandas.DataFrame: concatenated dataframe, with columns converted to schema dtypes.
+    """
+
+    frames = [frame for frame in frames if frame is not None]
+    if not frames:
+        return pd.DataFrame()
+
+    # Union categories of each categorical schema column across all dataframes
+    for col, dtype in schema.items():
+        if dtype != 'category':
+            continue
+        categoricals = [frame[col] for frame in frames
+                        if col in frame.columns and isinstance(frame[col].dtype, pd.CategoricalDtype)]
+        if not categoricals:
+            continue
+        categories = pd.Index(np.concatenate([cat.cat.categories.to_numpy(dtype=object)
+                                              for cat in categoricals])).unique()
+        frames = [frame.assign(**{col: frame[col].cat.set_categories(categories)})
+                  if col in frame.columns and isinstance(frame[col].dtype, pd.CategoricalDtype) else frame
+                  for frame in frames]
+
+    return apply_schema(pd.concat(frames), schema)
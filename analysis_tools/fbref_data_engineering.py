@@ -0,0 +1,124 @@
+"""Module containing functions to assist with pre-processing and engineering of FBref-style data
+
+FBref statistics are scraped as one table per statistic group (e.g. standard, shooting, passing), each with two-level
+column headers. These functions flatten the headers, align all statistic groups of a table on their key columns in a
+single join, and convert numeric columns in bulk.
+
+Functions
+---------
+flatten_columns(columns):
+    Flatten two-level FBref column headers into single strings.
+
+combine_stat_groups(frames, keys):
+    Combine FBref tables of different statistic groups into a single table, aligned on key columns.
+
+infer_numeric_dtypes(df):
+    Convert columns whose values are all numeric (or missing) to float.
+
+normalise_fbref_stats(fbref_dict):
+    Combine scraped FBref statistic groups into team, vs team and player tables.
+"""
+
+import pandas as pd
+
+
+# Key columns of team and player tables
+TEAM_KEYS = ['Team ID']
+PLAYER_KEYS = ['Player', 'Player ID', 'Squad']
+
+
+def flatten_columns(columns):
+    """ Flatten two-level FBref column headers into single strings.
+
+    Upper level headers that FBref leaves unnamed are dropped, and other upper level headers are prefixed to the lower
+    level header, e.g. ('Performance', 'Gls') becomes 'Performance Gls' and ('Unnamed: 0_level_0', 'Player') becomes
+    'Player'.
+
+    Args:
+        columns (pandas.MultiIndex): two-level column headers.
+
+    Returns:
+        list: flattened column names.
+    """
+
+    return [(col_name[1] if 'Unnamed' in col_name[0] else f"{col_name[0]} {col_name[1]}").strip()
+            if isinstance(col_name, tuple) else col_name for col_name in columns]
+
+
+def combine_stat_groups(frames, keys):
+    """ Combine FBref tables of different statistic groups into a single table, aligned on key columns.
+
+    Function to flatten the column headers of each statistic group table, and join all tables on their key columns in
+    a single outer join. Where a column appears in more than one statistic group (e.g. 'Player' or '90s'), the first
+    occurrence is retained.
+
+    Args:
+        frames (list): FBref statistic group dataframes, with two-level column headers.
+        keys (list): key columns shared by all tables, e.g. ['Player', 'Player ID', 'Squad'].
+
+    Returns:
+        pandas.DataFrame: combined table, with key columns first.
+    """
+
+    # Initialise list of indexed tables and columns already included
+    indexed_frames = []
+    included_cols = set(keys)
+
+    for frame in frames:
+        frame = frame.copy()
+        frame.columns = flatten_columns(frame.columns)
+        frame = frame.loc[:, ~frame.columns.duplicated()]
+        new_cols = [col for col in frame.columns if col not in included_cols]
+        included_cols.update(new_cols)
+        frame = frame.drop_duplicates(keys).set_index(keys)[new_cols]
+        indexed_frames.append(frame)
+
+    if not indexed_frames:
+        return pd.DataFrame(columns=keys)
+
+    return pd.concat(indexed_frames, axis=1, join='outer').reset_index()
+
+
+def infer_numeric_dtypes(df):
+    """ Convert columns whose values are all numeric (or missing) to float.
+
+    Args:
+        df (pandas.DataFrame): dataframe with object columns.
+
+    Returns:
+        pandas.DataFrame: dataframe with numeric columns converted to float.
+    """
+
+    # Initialise output
+    df_out = df.copy()
+
+    for col in df_out.select_dtypes(include=['object', 'string']).columns:
+        converted = pd.to_numeric(df_out[col], errors='coerce')
+        if converted.notna().sum() == df_out[col].notna().sum():
+            df_out[col] = converted.astype(float)
+
+    return df_out
+
+
+def normalise_fbref_stats(fbref_dict):
+    """ Combine scraped FBref statistic groups into team, vs team and player tables.
+
+    Args:
+        fbref_dict (dict): scraped FBref statistics, keyed by statistic group, each containing a team table, a vs team
+                           table and a player table (as returned by ScraperFC's scrape_all_stats).
+
+    Returns:
+        pandas.DataFrame: team statistics, one row per team.
+        pandas.DataFrame: statistics against each team, one row per team.
+        pandas.DataFrame: player statistics, one row per player and team.
+    """
+
+    stat_groups = [stat_tables for stat_tables in fbref_dict.values() if stat_tables is not None]
+
+    teaminfo_for_df = combine_stat_groups([tables[0] for tables in stat_groups if tables[0] is not None], TEAM_KEYS)
+    teaminfo_against_df = combine_stat_groups([tables[1] for tables in stat_groups if tables[1] is not None],
+                                              TEAM_KEYS)
+    playerinfo_df = combine_stat_groups([tables[2] for tables in stat_groups if tables[2] is not None], PLAYER_KEYS)
+
+    return (infer_numeric_dtypes(teaminfo_for_df), infer_numeric_dtypes(teaminfo_against_df),
+            infer_numeric_dtypes(playerinfo_df))
@@ -0,0 +1,263 @@
+"""Module containing functions and classes to run data imports concurrently, with rate limiting, retries and resumption
+
+Imports such as a full season of WhoScored matches consist of many independent tasks (one per match), each of which
+downloads and saves data. These tools run such tasks on a bounded pool of worker threads, limit the rate of requests
+made to each host, retry failed tasks with exponential backoff and record the progress of each task in a progress
+file, so that an interrupted import can be re-run and will only repeat unfinished tasks. When run_tasks is given a
+rate limiter, it spaces out task attempts rather than the individual requests made within each task. Workers that
+make their own HTTP requests can instead fetch each URL with fetch_url, passing the rate limiter, so that every request
+is spaced out, retried and cached on disk. The import scripts call get_football_data functions, which make their own
+requests, so their rate limit applies per task.
+
+Classes
+---------
+HostRateLimiter
+    Thread-safe limiter that spaces out requests to each host by a minimum interval.
+
+Functions
+---------
+retry_with_backoff(func, *args, retries=3, backoff=1.0, retry_on=(Exception,), **kwargs):
+    Call a function, retrying with exponentially increasing delay if it raises an exception.
+
+fetch_url(url, cache_folder="../../data_directory/response_cache", rate_limiter=None, retries=3, backoff=1.0,
+          timeout=30, refresh=False):
+    Get the content of a URL, from the response cache if available.
+
+run_tasks(tasks, worker, max_workers=4, progress_file=None, rate_limiter=None, host=None, retries=3, backoff=1.0):
+    Run import tasks on a pool of worker threads, skipping tasks already completed in a previous run.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlparse
+import pandas as pd
+import requests
+
+
+# Location of response cache
+RESPONSE_CACHE_FOLDER = "../../data_directory/response_cache"
+
+# HTTP status codes that indicate a temporary failure, and so are retried
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class HostRateLimiter:
+    """ Thread-safe limiter that spaces out requests to each host by a minimum interval.
+
+    Each call to wait reserves the next free request slot for the host and sleeps until that slot, so that concurrent
+    workers requesting the same host are queued rather than all requesting at once. Requests to different hosts do
+    not delay each other.
+
+    Args:
+        min_interval (float, optional): minimum time between requests to the same host, in seconds. Defaults to 1.
+        host_intervals (dict, optional): minimum interval of specific hosts, overriding min_interval, e.g.
+                                         {'www.whoscored.com': 3}.
+    """
+
+    def __init__(self, min_interval=1.0, host_intervals=None):
+        self.min_interval = min_interval
+        self.host_intervals = host_intervals if host_intervals is not None else {}
+        self._next_slot = {}
+        self._lock = threading.Lock()
+
+    def wait(self, host):
+        """ Wait until a request can be made to a host.
+
+        Args:
+            host (str): host name, e.g. 'www.whoscored.com'.
+
+        Returns:
+            float: time waited, in seconds.
+        """
+
+        interval = self.host_intervals.get(host, self.min_interval)
+
+        # Reserve next slot under lock, then sleep outside of lock so other hosts are not held up
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+        return delay
+
+
+def retry_with_backoff(func, *args, retries=3, backoff=1.0, retry_on=(Exception,), **kwargs):
+    """ Call a function, retrying with exponentially increasing delay if it raises an exception.
+
+    Args:
+        func (function): function to call.
+        *args: positional arguments passed to func.
+        retries (int, optional): number of retries after the first attempt. Defaults to 3.
+        backoff (float, optional): delay before the first retry, in seconds, doubling with each further retry.
+                                   Defaults to 1.
+        retry_on (tuple, optional): exception types that trigger a retry. Other exceptions are raised immediately.
+                                    Defaults to all exceptions.
+        **kwargs: keyword arguments passed to func.
+
+    Returns:
+        object: output of func.
+    """
+
+    for attempt in range(retries + 1):
+        try:
+            return func(*args, **kwargs)
+        except retry_on:
+            if attempt == retries:
+                raise
+            time.sleep(backoff * 2 ** attempt)
+
+
+class _RetryableStatus(Exception):
+    """ Raised for HTTP responses with a temporary failure status code, so that they are retried."""
+
+
+def fetch_url(url, cache_folder=RESPONSE_CACHE_FOLDER, rate_limiter=None, retries=3, backoff=1.0, timeout=30,
+              refresh=False):
+    """ Get the content of a URL, from the response cache if available.
+
+    Function to download the content of a URL, retrying with backoff on connection errors and on temporary failure
+    status codes (429 and 5xx). Successful responses are saved to the response cache, keyed on URL, and returned from
+    the cache on later calls. Requests are spaced out by the rate limiter if provided.
+
+    Args:
+        url (str): URL to fetch.
+        cache_folder (str, optional): location of response cache, relative to script in which function is called.
+        rate_limiter (HostRateLimiter, optional): limiter applied before each request. Defaults to no limit.
+        retries (int, optional): number of retries after the first attempt. Defaults to 3.
+        backoff (float, optional): delay before the first retry, in seconds, doubling with each further retry.
+                                   Defaults to 1.
+        timeout (float, optional): request timeout, in seconds. Defaults to 30.
+        refresh (bool, optional): selection of whether to ignore any cached response and fetch again. Defaults to
+                                  False.
+
+    Returns:
+        bytes: response content.
+    """
+
+    cache_file = f"{cache_folder}/{hashlib.sha256(url.encode()).hexdigest()}"
+    if not refresh and os.path.isfile(cache_file):
+        with open(cache_file, 'rb') as f:
+            return f.read()
+
+    def request():
+        if rate_limiter is not None:
+            rate_limiter.wait(urlparse(url).netloc)
+        response = requests.get(url, timeout=timeout)
+        if response.status_code in RETRY_STATUS_CODES:
+            raise _RetryableStatus(f"{response.status_code} response from {url}")
+        response.raise_for_status()
+        return response.content
+
+    content = retry_with_backoff(request, retries=retries, backoff=backoff,
+                                 retry_on=(requests.ConnectionError, requests.Timeout, _RetryableStatus))
+
+    # Write to temporary file first, so that a partially written response is never read from the cache
+    os.makedirs(cache_folder, exist_ok=True)
+    with open(f"{cache_file}.{threading.get_ident()}.tmp", 'wb') as f:
+        f.write(content)
+    os.replace(f"{cache_file}.{threading.get_ident()}.tmp", cache_file)
+
+    return content
+
+
+def _load_progress(progress_file):
+    """ Load task progress from file, returning an empty record if the file does not exist."""
+
+    if progress_file is None or not os.path.isfile(progress_file):
+        return {}
+
+    with open(progress_file) as f:
+        return json.load(f)
+
+
+def _save_progress(progress, progress_file):
+    """ Save task progress to file, replacing the existing file only once the new file is complete."""
+
+    if progress_file is None:
+        return
+
+    if os.path.dirname(progress_file):
+        os.makedirs(os.path.dirname(progress_file), exist_ok=True)
+    with open(f"{progress_file}.tmp", 'w') as f:
+        json.dump(progress, f, indent=1)
+    os.replace(f"{progress_file}.tmp", progress_file)
+
+
+def run_tasks(tasks, worker, max_workers=4, progress_file=None, rate_limiter=None, host=None, retries=3,
+              backoff=1.0):
+    """ Run import tasks on a pool of worker threads, skipping tasks already completed in a previous run.
+
+    Function to call worker once for each task, using up to max_workers concurrent threads. Tasks that raise an
+    exception are retried with exponential backoff, and recorded as failed once all retries are exhausted, without
+    stopping other tasks. The status of each task is written to the progress file as it finishes, so if an import is
+    interrupted, re-running it with the same progress file only runs tasks that have not completed. Failed tasks are
+    run again on the next run.
+
+    Args:
+        tasks (list): task identifiers, each passed to worker, e.g. match ids. Identifiers are stored as strings within
+                      the progress file.
+        worker (function): function that carries out a single task, taking the task identifier as its only argument.
+        max_workers (int, optional): maximum number of concurrent tasks. Defaults to 4.
+        progress_file (str, optional): location of progress file, relative to script in which function is called.
+                                       Defaults to no progress tracking.
+        rate_limiter (HostRateLimiter, optional): limiter applied before each task attempt (not each request made
+                                                  within a task). Requires host. Defaults to no limit.
+        host (str, optional): host requested by worker, used by rate_limiter.
+        retries (int, optional): number of retries of each task after the first attempt. Defaults to 3.
+        backoff (float, optional): delay before the first retry, in seconds, doubling with each further retry.
+                                   Defaults to 1.
+
+    Returns:
+        pandas.DataFrame: task, status ('complete', 'failed' or 'skipped'), attempts, seconds taken and error message of
+                          each task.
+    """
+
+    # Initialise output and progress record
+    results = []
+    progress = _load_progress(progress_file)
+    progress_lock = threading.Lock()
+
+    def run_task(task):
+        attempts = 0
+
+        def attempt():
+            nonlocal attempts
+            attempts += 1
+            if rate_limiter is not None and host is not None:
+                rate_limiter.wait(host)
+            return worker(task)
+
+        start = time.perf_counter()
+        try:
+            retry_with_backoff(attempt, retries=retries, backoff=backoff)
+            status, error = 'complete', None
+        except Exception as e:
+            status, error = 'failed', f"{type(e).__name__}: {e}"
+
+        with progress_lock:
+            progress[str(task)] = {'status': status, 'attempts': attempts, 'error': error}
+            _save_progress(progress, progress_file)
+
+        return {'task': task, 'status': status, 'attempts': attempts, 'seconds': time.perf_counter() - start,
+                'error': error}
+
+    pending = []
+    for task in tasks:
+        if progress.get(str(task), {}).get('status') == 'complete':
+            results.append({'task': task, 'status': 'skipped', 'attempts': 0, 'seconds': 0.0, 'error': None})
+        else:
+            pending.append(task)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(run_task, task) for task in pending]
+        for future in as_completed(futures):
+            results.append(future.result())
+
+    return pd.DataFrame(results, columns=['task', 'status', 'attempts', 'seconds', 'error'])
@@ -0,0 +1,149 @@
+"""Module containing functions to count events that occur within time intervals, such as while a player is on the pitch
+
+Events are sorted once by group (for example match or team within match) and time, so that the number of events
+within any interval of the same group is found with two binary searches. Several event selections (for example passes,
+touches, or touches within a pitch region) are counted from the same sort using cumulative sums of each selection.
+Event times are cumulative match minutes, which are built from the match minutes of each period using period_offsets.
+
+Functions
+---------
+count_events_in_intervals(event_groups, event_times, interval_groups, interval_starts, interval_ends, event_masks,
+                          inclusive=False, distinct_ids=None):
+    Count events within intervals of the same group, for several event selections at once.
+
+period_offsets(events_df, match_mins):
+    Time added to the match minutes of each event so that each period follows on from the end of the last.
+"""
+
+import numpy as np
+
+
+def count_events_in_intervals(event_groups, event_times, interval_groups, interval_starts, interval_ends, event_masks,
+                              inclusive=False, distinct_ids=None):
+    """ Count events within intervals of the same group, for several event selections at once.
+
+    Function to count, for each interval (e.g. the time a player is on the pitch), the number of events of the same
+    group (e.g. the player's team in the same match) that occur within the interval. Each event selection is counted
+    separately, and all selections share a single sort of the events. Events are ordered by time, with ties kept in
+    their original order.
+
+    Args:
+        event_groups (numpy.ndarray): integer group code of each event. Events with negative codes are ignored.
+        event_times (numpy.ndarray): time of each event. Events with missing times are ignored.
+        interval_groups (numpy.ndarray): integer group code of each interval, using the same codes as event_groups.
+        interval_starts (numpy.ndarray): start time of each interval.
+        interval_ends (numpy.ndarray): end time of each interval.
+        event_masks (dict): boolean array for each event selection, keyed by selection name.
+        inclusive (bool, optional): selection of whether events at the interval start and end times are counted.
+                                    False by default.
+        distinct_ids (dict, optional): for selections to count distinct values of rather than events (e.g.
+                                       possessions), array of values keyed by selection name. Values must appear in
+                                       contiguous runs in time order within each group. None by default.
+
+    Returns:
+        dict: array of counts of each selection, keyed by selection name. Counts are NaN for intervals with negative
+              group codes, and zero for intervals with missing start or end times.
+    """
+
+    distinct_ids = distinct_ids if distinct_ids is not None else {}
+    event_times = np.asarray(event_times, dtype=float)
+    event_groups = np.asarray(event_groups)
+    interval_groups = np.asarray(interval_groups)
+    interval_starts = np.asarray(interval_starts, dtype=float)
+    interval_ends = np.asarray(interval_ends, dtype=float)
+
+    # Sort valid events once by group, then time, then original order
+    valid_pos = np.flatnonzero((event_groups >= 0) & ~np.isnan(event_times))
+    order = valid_pos[np.lexsort((valid_pos, event_times[valid_pos], event_groups[valid_pos]))]
+    groups = event_groups[order]
+    times = event_times[order]
+
+    # Combine group and time into a single sorted key, with interval times clipped to the range of event times so
+    # that interval keys remain within their group
+    if len(times):
+        time_offset = times.min() - 1
+        group_span = times.max() - time_offset + 1
+    else:
+        time_offset, group_span = 0.0, 1.0
+    event_keys = groups * group_span + (times - time_offset)
+    start_keys = interval_groups * group_span + np.clip(interval_starts - time_offset, 0.5, group_span - 0.5)
+    end_keys = interval_groups * group_span + np.clip(interval_ends - time_offset, 0.5, group_span - 0.5)
+
+    # Position of first and last (exclusive) event within each interval
+    lo = np.searchsorted(event_keys, start_keys, side='left' if inclusive else 'right')
+    hi = np.searchsorted(event_keys, end_keys, side='right' if inclusive else 'left')
+    hi = np.maximum(hi, lo)
+
+    valid_intervals = (interval_groups >= 0)
+    timed_intervals = ~np.isnan(interval_starts) & ~np.isnan(interval_ends)
+
+    # Initialise output
+    counts = {}
+
+    for name, mask in event_masks.items():
+        selected = np.asarray(mask, dtype=bool)[order]
+
+        if name in distinct_ids:
+            # Count runs of the same value: events that start a new run, plus one if the interval starts mid-run
+            ids = np.asarray(distinct_ids[name])[order]
+            selected_pos = np.flatnonzero(selected)
+            new_run = np.ones(len(selected_pos), dtype=bool)
+            new_run[1:] = (ids[selected_pos[1:]] != ids[selected_pos[:-1]]) | \
+                          (groups[selected_pos[1:]] != groups[selected_pos[:-1]])
+            run_starts = np.zeros(len(selected), dtype=bool)
+            run_starts[selected_pos[new_run]] = True
+            cumulative = np.concatenate([[0], np.cumsum(run_starts)])
+
+            if len(selected_pos):
+                first_selected = np.searchsorted(selected_pos, lo)
+                first_pos = selected_pos[np.minimum(first_selected, len(selected_pos) - 1)]
+                starts_mid_run = (first_selected < len(selected_pos)) & (first_pos < hi) & ~run_starts[first_pos]
+            else:
+                starts_mid_run = np.zeros(len(lo), dtype=bool)
+            interval_counts = cumulative[hi] - cumulative[lo] + starts_mid_run
+        else:
+            cumulative = np.concatenate([[0], np.cumsum(selected)])
+            interval_counts = cumulative[hi] - cumulative[lo]
+
+        counts[name] = np.where(valid_intervals, np.where(timed_intervals, interval_counts, 0), np.nan)
+
+    return counts
+
+
+def period_offsets(events_df, match_mins):
+    """ Time added to the match minutes of each event so that each period follows on from the end of the last.
+
+    Function to calculate the offset that converts the match minutes of each event (which restart or overlap between
+    periods) into cumulative match minutes, for WhoScored or StatsBomb-style event data. The offset of each (match,
+    period) is calculated once, from the first and last match minute of each period, so that the start of each period
+    follows on from the end of the previous period. Events outside of periods 1 onwards are not offset. If a match
+    skips a period, later periods of that match cannot be placed and have no offset (NaN).
+
+    Args:
+        events_df (pandas.DataFrame): event data, with 'match_id' and 'period' columns. Can be from multiple matches.
+        match_mins (pandas.Series): match minute of each event, with the same index as events_df.
+
+    Returns:
+        numpy.ndarray: offset of each event, in minutes.
+    """
+
+    # First and last match minute of each period of each match, with columns for every period up to the last played
+    period = events_df['period'].astype(float)
+    period_extent = match_mins.groupby([events_df['match_id'], period]).agg(['min', 'max'])
+    period_range = np.arange(1, max(period.max(), 1) + 1)
+    period_start = period_extent['min'].unstack().reindex(columns=period_range)
+    period_end = period_extent['max'].unstack().reindex(columns=period_range)
+
+    # Each period adds its duration to the end of the previous period. The offset of a period is the difference
+    # between where it ends once shifted and where it ends unshifted.
+    period_duration = period_end - period_start
+    period_duration[1] = period_end[1]
+    offsets = period_duration.cumsum(axis=1, skipna=False) - period_end
+
+    # Look up offset of each event, by row (match) and column (period) position
+    in_period_range = (period >= 1).to_numpy()
+    match_pos = offsets.index.get_indexer(events_df['match_id'])
+    period_pos = np.where(in_period_range, period.to_numpy() - 1, 0).astype(int)
+    event_offsets = offsets.to_numpy()[match_pos, period_pos]
+
+    return np.where(in_period_range, event_offsets, 0)
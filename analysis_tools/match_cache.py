@@ -0,0 +1,179 @@
+"""Module containing functions to persist derived event and player data per match, to avoid recomputation
+
+Derived columns (for example carries, expected threat and possession chains) are calculated match by match, so their
+outputs can be cached on disk per match and reused by later reports. Each cached output is keyed on the match id, the
+source code of the module containing the function that produced it, its arguments and a fingerprint of all values of
+the input data, so a cached output is never reused once any of these change. Changes to other modules that the
+function calls are not detected, so clear_cache should be used after editing them. The cache is bounded in size, with
+the least recently used outputs evicted first.
+
+Functions
+---------
+cached_apply(func, df, *args, cache_folder="../../data_directory/derived_cache", max_size_mb=2048,
+             ignore_index=False, **kwargs):
+    Apply a per-match function to a dataframe, reusing outputs cached on disk for matches already processed.
+
+clear_cache(cache_folder="../../data_directory/derived_cache", func=None):
+    Remove cached outputs, either for a single function or for all functions.
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import pandas as pd
+
+
+def _code_version(func):
+    """ Hash of the source code of the module containing a function, so that changes to helper functions or module
+    constants used by the function also change the version (falls back to the function's compiled code)."""
+
+    try:
+        code = inspect.getsource(inspect.getmodule(func)).encode()
+    except (OSError, TypeError):
+        code = func.__code__.co_code
+
+    return hashlib.sha1(code).hexdigest()[:12]
+
+
+def _fingerprint(df):
+    """ Fingerprint of a dataframe, from its shape, columns and all values (including index and row order)."""
+
+    # Encode list and dict values (e.g. qualifiers) as json strings so that they can be hashed
+    hashable = df.copy()
+    for col in hashable.columns[hashable.dtypes == object]:
+        if hashable[col].map(lambda x: isinstance(x, (list, dict))).any():
+            hashable[col] = [json.dumps(x, sort_keys=True, default=str) if isinstance(x, (list, dict)) else x
+                             for x in hashable[col]]
+    row_hashes = pd.util.hash_pandas_object(hashable, index=True).to_numpy()
+    values_hash = hashlib.sha1(row_hashes.tobytes()).hexdigest()
+
+    return f"{len(df)}|{','.join(map(str, df.columns))}|{','.join(map(str, df.dtypes))}|{values_hash}"
+
+
+def _cache_key(match_id, code_version, args, kwargs):
+    """ Cache key combining match, function code version, and arguments (with dataframes fingerprinted)."""
+
+    def describe(arg):
+        return _fingerprint(arg) if isinstance(arg, pd.DataFrame) else repr(arg)
+
+    key_parts = [str(match_id), code_version] + [describe(arg) for arg in args] + \
+                [f"{name}={describe(arg)}" for name, arg in sorted(kwargs.items())]
+
+    return hashlib.sha1('|'.join(key_parts).encode()).hexdigest()
+
+
+def _evict(cache_folder, max_size_mb):
+    """ Remove least recently used cache files until the cache is within its size bound."""
+
+    cache_files = [entry for folder in os.scandir(cache_folder) if folder.is_dir()
+                   for entry in os.scandir(folder.path) if entry.name.endswith('.pkl')]
+    cache_files.sort(key=lambda entry: entry.stat().st_mtime)
+    total_size = sum(entry.stat().st_size for entry in cache_files)
+
+    for entry in cache_files:
+        if total_size <= max_size_mb * 1024 ** 2:
+            break
+        total_size -= entry.stat().st_size
+        os.remove(entry.path)
+
+
+def cached_apply(func, df, *args, cache_folder="../../data_directory/derived_cache", max_size_mb=2048,
+                 ignore_index=False, **kwargs):
+    """ Apply a per-match function to a dataframe, reusing outputs cached on disk for matches already processed.
+
+    Function to apply a function that derives data match by match (e.g. whoscored_custom_events.insert_ball_carries,
+    whoscored_custom_events.get_xthreat or whoscored_custom_events.get_possession_chains) to a dataframe of one or more
+    matches. The dataframe is split by match_id, and the output of each match is loaded from the cache if the same
+    function code has already been applied to the same match data with the same arguments. Otherwise, the function is
+    applied to that match and its output is cached. Any other dataframe argument that contains a match_id column is
+    split by match in the same way. Outputs are combined in order of match appearance. Vectorised functions that run
+    quickly across a whole competition (e.g. whoscored_data_engineering.minutes_played) gain nothing from caching, and
+    should be called directly.
+
+    Args:
+        func (function): function to apply, which takes the dataframe as its first argument.
+        df (pandas.DataFrame): event or player dataframe. Can be from multiple matches.
+        *args: further positional arguments passed to func.
+        cache_folder (str, optional): location of cache, relative to script in which function is called.
+        max_size_mb (float, optional): maximum size of cache in megabytes, beyond which least recently used outputs
+                                       are removed. 2048MB by default.
+        ignore_index (bool, optional): selection of whether to reset the index of the combined output. False by
+                                       default.
+        **kwargs: further keyword arguments passed to func.
+
+    Returns:
+        pandas.DataFrame: combined output of func across all matches.
+    """
+
+    func_folder = f"{cache_folder}/{func.__module__.split('.')[-1]}.{func.__name__}"
+    os.makedirs(func_folder, exist_ok=True)
+    code_version = _code_version(func)
+
+    # Index rows of each match within dataframe arguments
+    match_ids = df['match_id'].unique()
+    match_rows = df.groupby('match_id', sort=False).indices
+    split_args = {idx: arg.groupby('match_id', sort=False).indices for idx, arg in enumerate(args)
+                  if isinstance(arg, pd.DataFrame) and 'match_id' in arg.columns}
+    split_kwargs = {name: arg.groupby('match_id', sort=False).indices for name, arg in kwargs.items()
+                    if isinstance(arg, pd.DataFrame) and 'match_id' in arg.columns}
+
+    # Initialise output
+    outputs = []
+    cache_written = False
+
+    for match_id in match_ids:
+        match_df = df.iloc[match_rows[match_id]]
+        match_args = [arg.iloc[split_args[idx].get(match_id, [])] if idx in split_args else arg
+                      for idx, arg in enumerate(args)]
+        match_kwargs = {name: arg.iloc[split_kwargs[name].get(match_id, [])] if name in split_kwargs else arg
+                        for name, arg in kwargs.items()}
+
+        cache_file = f"{func_folder}/{match_id}-" \
+                     f"{_cache_key(match_id, code_version, [match_df] + match_args, match_kwargs)}.pkl"
+
+        # Load from cache, marking output as recently used, otherwise apply function and cache output
+        if os.path.isfile(cache_file):
+            with open(cache_file, 'rb') as f:
+                match_output = pickle.load(f)
+            os.utime(cache_file)
+        else:
+            match_output = func(match_df, *match_args, **match_kwargs)
+            with open(f"{cache_file}.tmp", 'wb') as f:
+                pickle.dump(match_output, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(f"{cache_file}.tmp", cache_file)
+            cache_written = True
+
+        outputs.append(match_output)
+
+    if cache_written:
+        _evict(cache_folder, max_size_mb)
+
+    return pd.concat(outputs, ignore_index=ignore_index) if outputs else func(df, *args, **kwargs)
+
+
+def clear_cache(cache_folder="../../data_directory/derived_cache", func=None):
+    """ Remove cached outputs, either for a single function or for all functions.
+
+    Args:
+        cache_folder (str, optional): location of cache, relative to script in which function is called.
+        func (function, optional): function whose cached outputs are removed. All cached outputs by default.
+
+    Returns:
+        int: number of cached outputs removed.
+    """
+
+    # Initialise output
+    removed = 0
+
+    if not os.path.isdir(cache_folder):
+        return removed
+
+    for folder in os.scandir(cache_folder):
+        if folder.is_dir() and (func is None or folder.name == f"{func.__module__.split('.')[-1]}.{func.__name__}"):
+            for entry in os.scandir(folder.path):
+                os.remove(entry.path)
+                removed += 1
+
+    return removed
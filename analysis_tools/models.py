@@ -1,7 +1,20 @@
 """Module containing a variety of predictive and statistical models relevant to the analysis of football data
 
+Trained models are listed within a model registry, which records the location of each model within the model
+directory of this repository, along with model metadata (version, training data and input schema). Models are loaded
+from file once per process, when first used, and reused thereafter.
+
 Functions
 ---------
+model_info(name):
+    Get the metadata of a registered model.
+
+model_path(name):
+    Get the location of a registered model file.
+
+load_model(name):
+    Load a registered model, loading from file only on first use within the process.
+
 get_pass_clusters(events):
     Assign statsbomb or whoscored pass events to a pass cluster
 
@@ -14,10 +27,40 @@ simulate_match_outcome(events, matches, match_id, sim_count=10000):
 import joblib
 from sklearn.base import BaseEstimator, TransformerMixin
 import os
+import threading
 import numpy as np
 import pandas as pd
 
 
+# Location of model directory, relative to this module
+MODEL_DIRECTORY = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'model_directory')
+
+# Registered models, with location within model directory and model metadata
+MODEL_REGISTRY = {
+    'pass_cluster': {
+        'file': 'pass_cluster_model/PassClusterModel65.joblib',
+        'version': '65',
+        'description': 'KMeans pass clustering pipeline with 65 clusters, based on pass start and end location',
+        'training_data': 'Over 5,000,000 successful WhoScored passes across EPL, Serie A, Ligue 1, Bundesliga, La Liga '
+                         'and EFLC (2019/20 - 2022/23)',
+        'input_schema': {'x': 'float (0-100)', 'y': 'float (0-100)', 'endX': 'float (0-100)',
+                         'endY': 'float (0-100)'}},
+    'xg_log_regression': {
+        'file': 'xg_model/log_regression_xg_model.joblib',
+        'version': '1',
+        'description': 'Logistic regression expected goals model',
+        'training_data': 'Wyscout shots from the top 5 European leagues (2017/18)',
+        'input_schema': {'x_yards': 'float', 'c_yards': 'float', 'distance_yards': 'float', 'angle': 'float (radians)',
+                         'header_tag': 'int (0 or 1)', 'xG': 'float'},
+        'notes': 'Model file was fitted with an additional xG input column. Retraining with '
+                 'xg_log_regression_model.py fits the model on xg_features.FEATURE_COLUMNS only.'},
+}
+
+# Models loaded within this process, and lock to ensure each model is only loaded once
+_LOADED_MODELS = {}
+_MODEL_LOCK = threading.Lock()
+
+
 # Load custom classes that are required for model pipeline (done manually here for ease)
 # noinspection PyPep8Naming
 class convertYards(BaseEstimator, TransformerMixin):
@@ -47,6 +90,60 @@ class customScaler(BaseEstimator, TransformerMixin):
         return X
 
 
+def model_info(name):
+    """ Get the metadata of a registered model.
+
+    Args:
+        name (str): registered model name, e.g. 'pass_cluster' or 'xg_log_regression'.
+
+    Returns:
+        dict: model metadata, including version, description, training data, input schema and model file location.
+    """
+
+    if name not in MODEL_REGISTRY:
+        raise KeyError(f"Model '{name}' is not registered. Choose from {list(MODEL_REGISTRY)}")
+
+    return dict(MODEL_REGISTRY[name], path=model_path(name), loaded=name in _LOADED_MODELS)
+
+
+def model_path(name):
+    """ Get the location of a registered model file.
+
+    Args:
+        name (str): registered model name, e.g. 'pass_cluster' or 'xg_log_regression'.
+
+    Returns:
+        str: absolute location of model file.
+    """
+
+    if name not in MODEL_REGISTRY:
+        raise KeyError(f"Model '{name}' is not registered. Choose from {list(MODEL_REGISTRY)}")
+
+    return os.path.join(MODEL_DIRECTORY, MODEL_REGISTRY[name]['file'])
+
+
+def load_model(name):
+    """ Load a registered model, loading from file only on first use within the process.
+
+    Function to return a registered model. The model is loaded from the model directory the first time it is
+    requested, and the loaded model is returned on all subsequent requests. Loading is thread-safe, so a model is only
+    loaded once even if first requested from multiple threads at the same time.
+
+    Args:
+        name (str): registered model name, e.g. 'pass_cluster' or 'xg_log_regression'.
+
+    Returns:
+        object: loaded model.
+    """
+
+    if name not in _LOADED_MODELS:
+        with _MODEL_LOCK:
+            if name not in _LOADED_MODELS:
+                _LOADED_MODELS[name] = joblib.load(model_path(name))
+
+    return _LOADED_MODELS[name]
+
+
 def get_pass_clusters(events, data_mode='whoscored'):
     """ Assign statsbomb or whoscored pass events to a pass cluster
 
@@ -76,20 +173,17 @@ def get_pass_clusters(events, data_mode='whoscored'):
     else:
         raise ValueError("Specify 'whoscored' or 'statsbomb' as data mode")
 
-    # Load pass clustering model
-    current_dir = os.getcwd()
-    os.chdir(current_dir.split("football-data-analytics")[0] +
-             "football-data-analytics/model_directory/pass_cluster_model")
-    cluster_model = joblib.load("PassClusterModel65.joblib")
-    os.chdir(current_dir)
+    # Get pass clustering model (loaded once per process)
+    cluster_model = load_model('pass_cluster')
 
     # Make cluster predictions and add cluster info
     passes_out['pass_cluster_id'] = cluster_model.predict(passes_out)
     cluster_centers = cluster_model['model'].cluster_centers_ * 120
-    passes_out['pass_cluster_mean_x'] = passes_out['pass_cluster_id'].apply(lambda x: cluster_centers[x, 0])
-    passes_out['pass_cluster_mean_y'] = passes_out['pass_cluster_id'].apply(lambda x: cluster_centers[x, 1])
-    passes_out['pass_cluster_mean_end_x'] = passes_out['pass_cluster_id'].apply(lambda x: cluster_centers[x, 2])
-    passes_out['pass_cluster_mean_end_y'] = passes_out['pass_cluster_id'].apply(lambda x: cluster_centers[x, 3])
+    cluster_ids = passes_out['pass_cluster_id'].to_numpy()
+    passes_out['pass_cluster_mean_x'] = cluster_centers[cluster_ids, 0]
+    passes_out['pass_cluster_mean_y'] = cluster_centers[cluster_ids, 1]
+    passes_out['pass_cluster_mean_end_x'] = cluster_centers[cluster_ids, 2]
+    passes_out['pass_cluster_mean_end_y'] = cluster_centers[cluster_ids, 3]
 
     # Return data to standard state based on data_mode
     if data_mode == 'whoscored':
@@ -8,7 +8,7 @@ add_cumulative_mins(events)
 process_lineups(lineups, events, tactics):
     Process and format statsbomb-style lineup information.
 
-events_while_playing(events, lineups, event_name='Pass', event_team='opposition')
+events_while_playing(events, lineups, event_name='Pass', event_team='opposition', event_specs=None)
     Determine number of times an event type occurs whilst players are on the pitch, and add to lineups dataframe.
 
 add_player_nickname(events, lineups)
@@ -32,7 +32,7 @@ create_league_table(matches, xmetrics=False):
 
 import numpy as np
 import pandas as pd
-import datetime
+import analysis_tools.interval_counts as ic
 
 
 def add_cumulative_mins(events):
@@ -48,37 +48,22 @@ def add_cumulative_mins(events):
         pandas.DataFrame: event dataframe with additional 'cumulative_mins' column.
     """
 
-    # Function to convert time stamp to mins
-    def convert_time(t):
-        if isinstance(t, datetime.time):
-            t_out = 60 * t.hour + t.minute + (1 / 60) * t.second
-
-        else:
-            t_out = 0
-        return t_out
-
     # Initialise output dataframe
-    events_out = pd.DataFrame()
-
-    # Add cumulative time to events data, resetting for each unique match
-    for match_id in events['match_id'].unique():
-
-        match_events = events[events['match_id'] == match_id].copy()
-        match_events['cumulative_mins'] = match_events['timestamp'].apply(convert_time)
+    events_out = events.copy()
 
-        # Add time increment to cumulative minutes based on period of game.
-        for period in np.arange(1, match_events['period'].max() + 1, 1):
-            if period > 1:
-                t_delta = match_events[match_events['period'] == period - 1]['cumulative_mins'].max() - \
-                          match_events[match_events['period'] == period]['cumulative_mins'].min()
-            elif period == 1 or period == 5:
-                t_delta = 0
-            else:
-                t_delta = 0
-            match_events.loc[match_events['period'] == period, 'cumulative_mins'] += t_delta
+    # Convert time stamps to minutes (to the nearest whole second), with missing or invalid time stamps set to zero
+    if pd.api.types.is_timedelta64_dtype(events_out['timestamp']):
+        match_mins = (events_out['timestamp'].dt.floor('s').dt.total_seconds() / 60).fillna(0)
+    else:
+        # Parse each distinct 'HH:MM:SS' time stamp once, then map onto events
+        time_strings = events_out['timestamp'].astype(str).str.slice(0, 8)
+        unique_times = pd.Series(pd.unique(time_strings))
+        parsed_times = pd.to_datetime(unique_times, format='%H:%M:%S', errors='coerce')
+        unique_mins = (parsed_times - parsed_times.dt.normalize()).dt.total_seconds() / 60
+        match_mins = time_strings.map(dict(zip(unique_times, unique_mins))).fillna(0)
 
-        # Combine individual matches if events for multiple matches have been passed
-        events_out = pd.concat([events_out, match_events])
+    # Add time increment to match minutes based on period of game, resetting for each unique match
+    events_out['cumulative_mins'] = match_mins + ic.period_offsets(events_out, match_mins)
 
     return events_out
 
@@ -322,7 +307,7 @@ def process_lineups(lineups, events, tactics):
             team_lineups['longest_tactic'] = team_lineups[['player_setup_id', 'tactical_setup_id', 'time_played']].apply(lambda x: 1 if x[0] == longest_tactical_setup_ids['player_setup_id'].values[0] and x[1] == longest_tactical_setup_ids['tactical_setup_id'].values[0] and x[2] == x[2] else np.nan, axis=1)
 
             # Tag longest xi
-            grouped_player_lineups = temp_team_lineups[~temp_team_lineups.duplicated(keep='first', subset=['player_setup_id', 'tactical_setup_id'])].groupby('player_setup_id', as_index=False).sum(numeric_only=True)
+            grouped_player_lineups = temp_team_lineups[~temp_team_lineups.duplicated(keep='first', subset=['player_setup_id', 'tactical_setup_id'])].groupby('player_setup_id', as_index=False, observed=True).sum(numeric_only=True)
             longest_player_setup_id = grouped_player_lineups[grouped_player_lineups['time_played'] == np.max(grouped_player_lineups['time_played'])]['player_setup_id']
             team_lineups['longest_xi'] = team_lineups[['player_setup_id', 'time_played']].apply(lambda x: 1 if x[0] == longest_player_setup_id.values[0] and x[1] == x[1] else np.nan, axis=1)
 
@@ -336,12 +321,12 @@ def process_lineups(lineups, events, tactics):
                                                           'player_gender', 'player_height', 'player_weight',
                                                           'jersey_number', 'match_id', 'competition', 'season',
                                                           'team_id', 'team_name', 'country_id', 'country_name',
-                                                          'position_name', 'tactics_formation'], dropna=False, as_index=False).min().drop(columns=['time_off', 'time_played']),
+                                                          'position_name', 'tactics_formation'], dropna=False, as_index=False, observed=True).min().drop(columns=['time_off', 'time_played']),
                                    match_lineups.groupby(['player_id', 'player_name', 'player_nickname', 'birth_date',
                                                           'player_gender', 'player_height', 'player_weight',
                                                           'jersey_number', 'match_id', 'competition', 'season',
                                                           'team_id', 'team_name', 'country_id', 'country_name',
-                                                          'position_name', 'tactics_formation'], dropna=False, as_index=False).max()['time_off']], axis=1)
+                                                          'position_name', 'tactics_formation'], dropna=False, as_index=False, observed=True).max()['time_off']], axis=1)
         match_lineups['time_played'] = match_lineups['time_off'] - match_lineups['time_on']
 
         # Further condense to revert to standard lineups dataframe (using players most common position)
@@ -349,7 +334,7 @@ def process_lineups(lineups, events, tactics):
                                                                     'birth_date', 'player_gender', 'player_height',
                                                                     'player_weight', 'jersey_number', 'match_id',
                                                                     'competition', 'season', 'team_id', 'team_name',
-                                                                    'country_id', 'country_name'], dropna=False, as_index=False).
+                                                                    'country_id', 'country_name'], dropna=False, as_index=False, observed=True).
                                             min().drop(columns=['time_off', 'longest_tactic', 'tactics_formation',
                                                                 'position_name', 'tactical_setup_id', 'player_setup_id',
                                                                 'time_played']),
@@ -357,21 +342,21 @@ def process_lineups(lineups, events, tactics):
                                                                     'birth_date', 'player_gender', 'player_height',
                                                                     'player_weight', 'jersey_number', 'match_id',
                                                                     'competition', 'season', 'team_id', 'team_name',
-                                                                    'country_id', 'country_name'],dropna=False, as_index=False).max()['time_off']], axis=1)
+                                                                    'country_id', 'country_name'],dropna=False, as_index=False, observed=True).max()['time_off']], axis=1)
 
         match_lineups_condensed['time_played'] = match_lineups_condensed['time_off']-match_lineups_condensed['time_on']
 
         # Add longest positions per player to condensed version
         player_pos_grouped = match_lineups.groupby(['player_id','position_name'],
-                                                   as_index=False).sum(numeric_only=True).sort_values(['player_id', 'time_played'], ascending=False)
+                                                   as_index=False, observed=True).sum(numeric_only=True).sort_values(['player_id', 'time_played'], ascending=False)
         player_pos_grouped = player_pos_grouped[~player_pos_grouped.duplicated(keep='first', subset=['player_id']
                                                                                )][['player_id', 'position_name']]
         match_lineups_condensed['position_name'] = match_lineups_condensed.merge(player_pos_grouped, how='left',
                                                                                  on='player_id')['position_name']
 
         # Add longest formation to condensed version
-        team_form_grouped = match_lineups.groupby(['player_id', 'team_id', 'tactics_formation'], as_index=False
-                                                  ).sum(numeric_only=True).sort_values(['team_id', 'time_played'],
+        team_form_grouped = match_lineups.groupby(['player_id', 'team_id', 'tactics_formation'], as_index=False,
+                                                  observed=True).sum(numeric_only=True).sort_values(['team_id', 'time_played'],
                                                                                        ascending=False)
         team_form_grouped = team_form_grouped[~team_form_grouped.duplicated(keep='first',
                                                                             subset=['team_id'])][['team_id', 'tactics_formation']]
@@ -408,74 +393,94 @@ def process_lineups(lineups, events, tactics):
     return lineups_out, lineups_dense_out
 
 
-def events_while_playing(events, lineups, event_name='Pass', event_team='opposition'):
+def events_while_playing(events, lineups, event_name='Pass', event_team='opposition', event_specs=None):
     """ Determine number of times an event type occurs whilst players are on the pitch, and add to lineups dataframe.
 
     Function to calculate the total number of specific event-types that a player either faces or own team completes
     in each game, and add the information to a statsbomb-style dataframe. The user must define the event type to
     aggregate using statsbomb convention, and specify whether to aggregate for the player's own team or the
     opposition. For example, this function could be used to calculate the number of passes the opposition team makes,
-    and assign to each player within the lineups dataframe.
+    and assign to each player within the lineups dataframe. Several event types can be counted at once by passing a
+    list of event specifications, each of which is a dictionary containing:
+
+    - event_name (str): statsbomb event type, 'Touch' for all touches or 'Possession' for the number of possessions.
+    - event_team (str): 'own' or 'opposition'.
+    - x_range (tuple, optional): minimum and maximum x co-ordinate of events to count, with None for no limit.
+    - y_range (tuple, optional): minimum and maximum y co-ordinate of events to count, with None for no limit.
+    - column (str, optional): name of output column. Defaults to team_ or opp_ followed by the event name.
+
+    Events are counted if they occur between the minutes the player comes on and goes off (inclusive). Players from
+    matches without event data are assigned a missing count.
 
     Args:
         events (pandas.DataFrame): statsbomb-style dataframe of event data. Events can be from multiple matches.
         lineups (pandas.DataFrame): statsbomb-style dataframe of lineups, can be from multiple matches.
         event_name (str): statsbomb event type to aggregate data on. Requires statsbomb convention. Defaults to 'Pass'
         event_team (str): aggregate on the player's own team or opposition team. Defaults to opposition.
+        event_specs (list, optional): event specifications to count, overriding event_name and event_team. None by
+                                      default.
 
     Returns:
-        pandas.DataFrame: statsbomb-style lineup dataframe with additional events count column.
+        pandas.DataFrame: statsbomb-style lineup dataframe with additional events count column(s).
     """
 
     # Initialise output dataframe
-    lineups_out = pd.DataFrame()
-
-    # Add event count to lineup data, resetting for each individual match
-    for match_id in events['match_id'].unique():
-        match_events = events[events['match_id'] == match_id].copy()
-        lineup = lineups[lineups['match_id'] == match_id].copy()
-
-        # For each team calculate team events, and assign to player
-        for team in set(match_events['team_name']):
-            team_lineup = lineup[lineup['team_name'] == team]
-
-            # Choose whether to include own team or opposition events, and build column name
-            if event_team == 'own':
-                if event_name == 'Touch':
-                    team_events = match_events[(match_events['team_name'] == team) &
-                                               (match_events['touch_type'] == match_events['touch_type'])]
-                elif event_name == 'Possession':
-                    team_events = match_events[match_events['possession_team_name'] == team]
-                else:
-                    team_events = match_events[(match_events['team_name'] == team) &
-                                               (match_events['type_name'] == event_name)]
-                col_name = 'team_' + event_name.lower()
+    lineups_out = lineups.copy()
 
-            else:
-                if event_name == 'Touch':
-                    team_events = match_events[(match_events['team_name'] != team) &
-                                               (match_events['touch_type'] == match_events['touch_type'])]
-                elif event_name == 'Possession':
-                    team_events = match_events[match_events['possession_team_name'] != team]
-                else:
-                    team_events = match_events[(match_events['team_name'] != team) &
-                                               (match_events['type_name'] == event_name)]
-
-                col_name = 'opp_' + event_name.lower()
-
-            # For each player, count events whilst they were on the pitch
-            for idx, player in team_lineup.iterrows():
-                if event_name == 'Possession':
-                    event_count = len(set(team_events[(team_events['cumulative_mins'] >= player['time_on']) &
-                                                      (team_events['cumulative_mins'] <= player['time_off'])]
-                                          ['possession']))
-                else:
-                    event_count = len(team_events[(team_events['cumulative_mins'] >= player['time_on']) &
-                                                  (team_events['cumulative_mins'] <= player['time_off'])])
-                lineup.loc[idx, col_name] = event_count
-
-        # Rebuild lineups dataframe
-        lineups_out = pd.concat([lineups_out, lineup])
+    if event_specs is None:
+        event_specs = [{'event_name': event_name, 'event_team': event_team}]
+
+    # Group events and players by match, and by team within match
+    match_index = pd.Index(pd.unique(events['match_id']))
+    team_index = pd.MultiIndex.from_arrays([lineups['match_id'], lineups['team_name']]).unique()
+    event_matches = match_index.get_indexer(events['match_id'])
+    player_matches = match_index.get_indexer(lineups['match_id'])
+    player_teams = np.where(player_matches >= 0, team_index.get_indexer(pd.MultiIndex.from_arrays(
+        [lineups['match_id'], lineups['team_name']])), -1)
+
+    # Select events of each specification. Possessions are grouped by the team in possession rather than the team
+    # making the event, and counted once each.
+    event_masks = {'team_name': {}, 'possession_team_name': {}}
+    for idx, spec in enumerate(event_specs):
+        if spec['event_name'] == 'Touch':
+            mask = events['touch_type'].notna().to_numpy()
+        elif spec['event_name'] == 'Possession':
+            mask = np.ones(len(events), dtype=bool)
+        else:
+            mask = events['type_name'].eq(spec['event_name']).to_numpy(dtype=bool, na_value=False)
+        for axis in ['x', 'y']:
+            axis_min, axis_max = spec.get(f"{axis}_range") or (None, None)
+            if axis_min is not None:
+                mask = mask & events[axis].ge(axis_min).to_numpy(dtype=bool, na_value=False)
+            if axis_max is not None:
+                mask = mask & events[axis].le(axis_max).to_numpy(dtype=bool, na_value=False)
+        event_masks['possession_team_name' if spec['event_name'] == 'Possession' else 'team_name'][idx] = mask
+
+    # Count events of each team, and of both teams, whilst each player is on the pitch
+    event_times = events['cumulative_mins'].astype(float).to_numpy()
+    time_on = lineups['time_on'].astype(float).to_numpy()
+    time_off = lineups['time_off'].astype(float).to_numpy()
+    team_counts = {}
+    match_counts = {}
+    for team_col, masks in event_masks.items():
+        if not masks:
+            continue
+        distinct_ids = {idx: events['possession'].to_numpy() for idx in masks} \
+            if team_col == 'possession_team_name' else None
+        event_teams = team_index.get_indexer(pd.MultiIndex.from_arrays([events['match_id'], events[team_col]]))
+        team_counts.update(ic.count_events_in_intervals(event_teams, event_times, player_teams, time_on, time_off,
+                                                        masks, inclusive=True, distinct_ids=distinct_ids))
+        match_counts.update(ic.count_events_in_intervals(event_matches, event_times, player_matches, time_on,
+                                                         time_off, masks, inclusive=True, distinct_ids=distinct_ids))
+
+    # Add counts to lineup data
+    for idx, spec in enumerate(event_specs):
+        if spec['event_team'] == 'own':
+            col_name = spec.get('column', 'team_' + spec['event_name'].lower())
+            lineups_out[col_name] = team_counts[idx]
+        else:
+            col_name = spec.get('column', 'opp_' + spec['event_name'].lower())
+            lineups_out[col_name] = match_counts[idx] - team_counts[idx]
 
     return lineups_out
 
@@ -550,11 +555,11 @@ def create_player_list(lineups, additional_cols=None, pass_extra=None, group_pos
     if additional_cols is None:
         included_cols = lineups.groupby(['player_id', 'position_name', 'position_group', 'position_category',
                                          'team_name', 'competition',
-                                         'season'], axis=0).sum(numeric_only=True)['time_played']
+                                         'season'], observed=True).sum(numeric_only=True)['time_played']
     else:
         included_cols = lineups.groupby(['player_id', 'position_name', 'position_group', 'position_category',
                                          'team_name', 'competition',
-                                         'season'], axis=0).sum(numeric_only=True)[['time_played'] + additional_cols]
+                                         'season'], observed=True).sum(numeric_only=True)[['time_played'] + additional_cols]
 
     playerinfo_df = playerinfo_df.merge(included_cols, left_on=['player_id', 'position_name', 'position_group',
                                                                 'position_category', 'team_name', 'competition',
@@ -564,11 +569,11 @@ def create_player_list(lineups, additional_cols=None, pass_extra=None, group_pos
     if group_position:
         playerinfo_df.sort_values('time_played', ascending=False, inplace=True)
         if additional_cols is None:
-            playerinfo_df['time_played'] = (playerinfo_df.groupby(['player_id', 'team_name', 'competition', 'season'])
+            playerinfo_df['time_played'] = (playerinfo_df.groupby(['player_id', 'team_name', 'competition', 'season'], observed=True)
                                             ['time_played'].transform('sum'))
         else:
             playerinfo_df[['time_played'] + additional_cols] = (playerinfo_df.groupby(['player_id', 'team_name',
-                                                                                       'competition', 'season'])
+                                                                                       'competition', 'season'], observed=True)
                                                                 [['time_played'] + additional_cols].transform('sum'))
         playerinfo_df.drop_duplicates(subset=['player_id', 'team_name', 'competition', 'season'], keep='first',
                                       inplace=True)
@@ -577,20 +582,20 @@ def create_player_list(lineups, additional_cols=None, pass_extra=None, group_pos
     if group_team:
         playerinfo_df.sort_values('time_played', ascending=False, inplace=True)
         if additional_cols is None:
-            playerinfo_df['time_played'] = (playerinfo_df.groupby(['player_id', 'competition', 'season'])
+            playerinfo_df['time_played'] = (playerinfo_df.groupby(['player_id', 'competition', 'season'], observed=True)
                                             ['time_played'].transform('sum'))
         else:
             playerinfo_df[['time_played'] + additional_cols] = (playerinfo_df.groupby(['player_id', 'competition',
-                                                                                       'season'])
+                                                                                       'season'], observed=True)
                                                             [['time_played'] + additional_cols].transform('sum'))
         playerinfo_df.drop_duplicates(subset=['player_id', 'competition', 'season'], keep='first', inplace=True)
 
     # Group players minutes over different competitions (if group_comp is True).
     if group_comp:
         if additional_cols is None:
-            playerinfo_df['time_played'] = (playerinfo_df.groupby(['player_id'])['time_played'].transform('sum'))
+            playerinfo_df['time_played'] = (playerinfo_df.groupby(['player_id'], observed=True)['time_played'].transform('sum'))
         else:
-            playerinfo_df[['time_played'] + additional_cols] = (playerinfo_df.groupby(['player_id'])
+            playerinfo_df[['time_played'] + additional_cols] = (playerinfo_df.groupby(['player_id'], observed=True)
                                                                 [['time_played'] + additional_cols].transform('sum'))
         playerinfo_df.drop_duplicates(subset=['player_id'], keep='first', inplace=True)
         playerinfo_df = playerinfo_df.drop(columns=['competition', 'season'])
@@ -631,14 +636,14 @@ def group_player_events(events, player_data, group_type='count', agg_columns=Non
 
     # Perform aggregation based on grouping type input
     if group_type == 'count':
-        grouped_events = events.groupby('player_id', axis=0).count()
+        grouped_events = events.groupby('player_id', observed=True).count()
         selected_events = grouped_events[agg_columns].copy()
         selected_events.loc[:, primary_event_name] = grouped_events['match_id']
     elif group_type == 'sum':
-        grouped_events = events.groupby('player_id', axis=0).sum(numeric_only=True)
+        grouped_events = events.groupby('player_id', observed=True).sum(numeric_only=True)
         selected_events = grouped_events[agg_columns].copy()
     elif group_type == 'mean':
-        grouped_events = events.groupby('player_id', axis=0).mean(numeric_only=True)
+        grouped_events = events.groupby('player_id', observed=True).mean(numeric_only=True)
         selected_events = grouped_events[agg_columns].copy()
     else:
         selected_events = pd.DataFrame()
@@ -669,12 +674,12 @@ def create_team_list(lineups):
 
     teaminfo_df = lineups[['team_name', 'match_id']].drop_duplicates()
 
-    included_cols_max = lineups.groupby(['team_name', 'match_id'], axis=0).max()['time_played']
+    included_cols_max = lineups.groupby(['team_name', 'match_id'], observed=True).max()['time_played']
 
     teaminfo_df = teaminfo_df.merge(included_cols_max, left_on=['team_name', 'match_id'], right_index=True)
     teaminfo_df['matches_played'] = 1
 
-    teaminfo_df = teaminfo_df.groupby(['team_name']).sum()[['time_played', 'matches_played']]
+    teaminfo_df = teaminfo_df.groupby(['team_name'], observed=True).sum()[['time_played', 'matches_played']]
 
     return teaminfo_df
 
@@ -707,14 +712,14 @@ def group_team_events(events, team_info, group_type='count', agg_columns=None, p
 
     # Perform aggregation based on grouping type input
     if group_type == 'count':
-        grouped_events = events.groupby('team_name', axis=0).count()
+        grouped_events = events.groupby('team_name', observed=True).count()
         selected_events = grouped_events[agg_columns].copy()
         selected_events.loc[:, primary_event_name] = grouped_events['match_id']
     elif group_type == 'sum':
-        grouped_events = events.groupby('team_name', axis=0).sum(numeric_only=True)
+        grouped_events = events.groupby('team_name', observed=True).sum(numeric_only=True)
         selected_events = grouped_events[agg_columns].copy()
     elif group_type == 'mean':
-        grouped_events = events.groupby('team_name', axis=0).mean(numeric_only=True)
+        grouped_events = events.groupby('team_name', observed=True).mean(numeric_only=True)
         selected_events = grouped_events[agg_columns].copy()
     else:
         selected_events = pd.DataFrame()
@@ -759,14 +764,14 @@ def create_league_table(matches, xmetrics=False):
                                   .apply(lambda x: 3 if x[0] < x[1] else 1 if x[0] == x[1] else 0, axis=1))
 
     # Add information to league table dataframe
-    leaguetable['matches_played'] = (matches_out.groupby('home_team').count()['match_id'] +
-                                     matches_out.groupby('away_team').count()['match_id']).values
-    leaguetable['points'] = (matches_out.groupby('home_team').sum(numeric_only=True)['home_points'] +
-                             matches_out.groupby('away_team').sum(numeric_only=True)['away_points']).values
-    leaguetable['goals_for'] = (matches_out.groupby('home_team').sum(numeric_only=True)['home_score'] +
-                                matches_out.groupby('away_team').sum(numeric_only=True)['away_score']).values
-    leaguetable['goals_against'] = (matches_out.groupby('home_team').sum(numeric_only=True)['away_score'] +
-                                    matches_out.groupby('away_team').sum(numeric_only=True)['home_score']).values
+    leaguetable['matches_played'] = (matches_out.groupby('home_team', observed=True).count()['match_id'] +
+                                     matches_out.groupby('away_team', observed=True).count()['match_id']).values
+    leaguetable['points'] = (matches_out.groupby('home_team', observed=True).sum(numeric_only=True)['home_points'] +
+                             matches_out.groupby('away_team', observed=True).sum(numeric_only=True)['away_points']).values
+    leaguetable['goals_for'] = (matches_out.groupby('home_team', observed=True).sum(numeric_only=True)['home_score'] +
+                                matches_out.groupby('away_team', observed=True).sum(numeric_only=True)['away_score']).values
+    leaguetable['goals_against'] = (matches_out.groupby('home_team', observed=True).sum(numeric_only=True)['away_score'] +
+                                    matches_out.groupby('away_team', observed=True).sum(numeric_only=True)['home_score']).values
     leaguetable['goal_difference'] = leaguetable['goals_for'] - leaguetable['goals_against']
     leaguetable['position'] = (leaguetable[['points', 'goal_difference', 'goals_for']].apply(tuple, axis=1)
                                .rank(method='min', ascending=False).astype(int))
@@ -774,13 +779,13 @@ def create_league_table(matches, xmetrics=False):
     # Add expected information to league table dataframe if parameter is passed
     if xmetrics:
 
-        leaguetable['xg_for'] = (matches_out.groupby('home_team').sum(numeric_only=True)['home_xg'] +
-                                 matches_out.groupby('away_team').sum(numeric_only=True)['away_xg']).values
-        leaguetable['xg_against'] = (matches_out.groupby('home_team').sum(numeric_only=True)['away_xg'] +
-                                     matches_out.groupby('away_team').sum(numeric_only=True)['home_xg']).values
+        leaguetable['xg_for'] = (matches_out.groupby('home_team', observed=True).sum(numeric_only=True)['home_xg'] +
+                                 matches_out.groupby('away_team', observed=True).sum(numeric_only=True)['away_xg']).values
+        leaguetable['xg_against'] = (matches_out.groupby('home_team', observed=True).sum(numeric_only=True)['away_xg'] +
+                                     matches_out.groupby('away_team', observed=True).sum(numeric_only=True)['home_xg']).values
         leaguetable['xg_difference'] = leaguetable['xg_for'] - leaguetable['xg_against']
-        leaguetable['expected_points'] = (matches_out.groupby('home_team').sum(numeric_only=True)['home_xpoints'] +
-                                          matches_out.groupby('away_team').sum(numeric_only=True)['away_xpoints']).values
+        leaguetable['expected_points'] = (matches_out.groupby('home_team', observed=True).sum(numeric_only=True)['home_xpoints'] +
+                                          matches_out.groupby('away_team', observed=True).sum(numeric_only=True)['away_xpoints']).values
         leaguetable['expected_position'] = (leaguetable[['expected_points', 'xg_difference', 'xg_for']]
                                             .apply(tuple, axis=1).rank(method='min', ascending=False).astype(int))
         leaguetable = leaguetable.sort_values('expected_position')
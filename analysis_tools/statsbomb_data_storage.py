@@ -0,0 +1,234 @@
+"""Module containing functions to store and load StatsBomb-style data within a local embedded (SQLite) database
+
+The database holds one indexed table each for events, matches, lineups and player_stats. Every row is tagged with the
+country, competition and season it belongs to, so that data can be selected in the same way as data_grab inputs
+elsewhere in the repository (e.g. [['England', 'Premier League', '2023']]). List and dict valued columns (e.g.
+location, pass_end_location) are stored as json strings and restored on load.
+
+Functions
+---------
+store_statsbomb_data(data_dict, country, competition, season, db_path="../../data_directory/statsbomb_data/statsbomb.db"):
+    Write StatsBomb-style data for a competition season to the local database, replacing any matches already stored.
+
+load_statsbomb_sql(data_grab, events=True, matches=True, lineups=True, player_stats=True, teams=None,
+                   type_names=None, event_columns=None, dtype_backend='pyarrow',
+                   db_path="../../data_directory/statsbomb_data/statsbomb.db"):
+    Load StatsBomb-style data for one or more competition seasons from the local database.
+"""
+
+import json
+import os
+import sqlite3
+import numpy as np
+import pandas as pd
+import analysis_tools.data_schema as dsc
+
+
+# Tables held within the database, and the columns to index on within each table
+TABLE_INDEXES = {'events': [['competition', 'season', 'match_id'], ['team_name'], ['type_name']],
+                 'matches': [['competition', 'season', 'match_id'], ['home_team'], ['away_team']],
+                 'lineups': [['competition', 'season', 'match_id'], ['team_name']],
+                 'player_stats': [['competition', 'season', 'match_id'], ['team_name']]}
+
+# Columns added to every table to identify competition season
+SELECTION_COLUMNS = ['country', 'competition', 'season']
+
+# Schema applied to each table when loaded without Arrow-backed dtypes
+TABLE_SCHEMAS = {'events': dsc.STATSBOMB_EVENT_SCHEMA, 'lineups': dsc.STATSBOMB_LINEUP_SCHEMA}
+
+
+def _connect(db_path):
+    """ Open a connection to the database, creating the table that records json encoded columns if required."""
+
+    con = sqlite3.connect(db_path)
+    con.execute("CREATE TABLE IF NOT EXISTS _nested_columns (table_name TEXT, column_name TEXT, "
+                "PRIMARY KEY (table_name, column_name))")
+
+    return con
+
+
+def _table_columns(con, table):
+    """ Get the columns of a database table, returning an empty list if the table does not exist."""
+
+    return [row[1] for row in con.execute(f'PRAGMA table_info("{table}")')]
+
+
+def _nested_columns(con, table):
+    """ Get the json encoded columns of a database table."""
+
+    return [row[0] for row in con.execute("SELECT column_name FROM _nested_columns WHERE table_name = ?", (table,))]
+
+
+def _write_table(con, df, table, match_ids):
+    """ Write a dataframe to a database table, replacing existing rows of the same matches and adding new columns."""
+
+    # Serialise list and dict valued columns to json strings
+    df_out = df.reset_index(drop=True)
+    nested_cols = []
+    for col in df_out.columns[df_out.dtypes == object]:
+        non_null = df_out[col].dropna()
+        if len(non_null) and isinstance(non_null.iloc[0], (list, dict, tuple, np.ndarray)):
+            df_out[col] = [json.dumps(x.tolist() if isinstance(x, np.ndarray) else x)
+                           if isinstance(x, (list, dict, tuple, np.ndarray)) else None for x in df_out[col]]
+            nested_cols.append(col)
+    con.executemany("INSERT OR IGNORE INTO _nested_columns VALUES (?, ?)", [(table, col) for col in nested_cols])
+
+    existing_cols = _table_columns(con, table)
+    if existing_cols:
+        # Remove previously stored rows for these matches, so that re-storing a match replaces it
+        con.executemany(f'DELETE FROM "{table}" WHERE match_id = ?', [(int(match_id),) for match_id in match_ids])
+
+        # Add any columns not yet within table
+        for col in df_out.columns:
+            if col not in existing_cols:
+                con.execute(f'ALTER TABLE "{table}" ADD COLUMN "{col}"')
+
+    df_out.to_sql(table, con, if_exists='append', index=False)
+
+    # Index on selection columns
+    for idx_cols in TABLE_INDEXES[table]:
+        if all(col in df_out.columns or col in existing_cols for col in idx_cols):
+            con.execute(f'CREATE INDEX IF NOT EXISTS "idx_{table}_{"_".join(idx_cols)}" ON "{table}" '
+                        f'({", ".join(idx_cols)})')
+
+
+def store_statsbomb_data(data_dict, country, competition, season,
+                         db_path="../../data_directory/statsbomb_data/statsbomb.db"):
+    """ Write StatsBomb-style data for a competition season to the local database, replacing any matches already stored.
+
+    Function to write StatsBomb-style events, matches, lineups and player_stats dataframes for a single competition
+    season to the local database. Each row is tagged with the country, competition and season passed. Matches that
+    are already within the database are replaced, so the same data can be stored more than once (for example,
+    after each matchday) without creating duplicates.
+
+    Args:
+        data_dict (dict): dictionary of dataframes, keyed by table name ('events', 'matches', 'lineups' and/or
+                          'player_stats'). Each dataframe must include a match_id column.
+        country (str): country of competition, e.g. 'England'.
+        competition (str): competition name, e.g. 'Premier League'.
+        season (str): start year of season, e.g. '2023'.
+        db_path (str, optional): location of database file, relative to script in which function is called.
+
+    Returns:
+        dict: number of rows written to each table.
+    """
+
+    # Initialise output
+    rows_written = {}
+
+    os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+    with _connect(db_path) as con:
+        for table in TABLE_INDEXES:
+            if data_dict.get(table) is None or len(data_dict[table]) == 0:
+                continue
+            df = data_dict[table].assign(country=country, competition=competition, season=str(season))
+            _write_table(con, df, table, df['match_id'].unique())
+            rows_written[table] = len(df)
+
+    return rows_written
+
+
+def _build_query(con, table, data_grab, match_ids=None, type_names=None, columns=None):
+    """ Build a parameterised select query on a table, selecting competition seasons, matches and event types."""
+
+    # Column pushdown, always including selection columns
+    table_cols = _table_columns(con, table)
+    if columns is not None:
+        columns = [col for col in dict.fromkeys(['match_id'] + SELECTION_COLUMNS + list(columns)) if col in table_cols]
+        select = ", ".join(f'"{col}"' for col in columns)
+    else:
+        select = "*"
+
+    # Competition season selection
+    conditions = ["(" + " OR ".join(["(country = ? AND competition = ? AND season = ?)"] * len(data_grab)) + ")"]
+    params = [str(value) for data in data_grab for value in data]
+
+    if match_ids is not None:
+        conditions.append(f"match_id IN ({', '.join(['?'] * len(match_ids))})")
+        params += [int(match_id) for match_id in match_ids]
+    if type_names is not None:
+        conditions.append(f"type_name IN ({', '.join(['?'] * len(type_names))})")
+        params += list(type_names)
+
+    return f'SELECT {select} FROM "{table}" WHERE {" AND ".join(conditions)}', params
+
+
+def _read_table(con, table, query, params, dtype_backend):
+    """ Read the result of a query into a dataframe, restoring json encoded columns."""
+
+    if dtype_backend is None:
+        df = pd.read_sql(query, con, params=params)
+    else:
+        df = pd.read_sql(query, con, params=params, dtype_backend=dtype_backend)
+
+    for col in _nested_columns(con, table):
+        if col in df.columns:
+            df[col] = pd.Series([json.loads(x) if isinstance(x, str) else np.nan for x in df[col]], index=df.index,
+                                dtype=object)
+
+    if dtype_backend is None and table in TABLE_SCHEMAS:
+        df = dsc.apply_schema(df, TABLE_SCHEMAS[table])
+
+    return df
+
+
+def load_statsbomb_sql(data_grab, events=True, matches=True, lineups=True, player_stats=True, teams=None,
+                       type_names=None, event_columns=None, dtype_backend='pyarrow',
+                       db_path="../../data_directory/statsbomb_data/statsbomb.db"):
+    """ Load StatsBomb-style data for one or more competition seasons from the local database.
+
+    Function to load StatsBomb-style events, matches, lineups and player_stats for one or more competition seasons
+    from the local database, without a connection to a remote data source. Selections are applied within the database
+    query, using the table indexes, so that only the data required is loaded into pandas. Data can be restricted to
+    matches involving specific teams (all events of those matches are loaded, including opposition events), to
+    specific event types, and to specific event columns. By default, dataframes are returned with Arrow-backed dtypes.
+
+    Args:
+        data_grab (list): list of [country, competition, season] selections, e.g. [['England', 'Premier League', '2023']].
+        events (bool, optional): selection of whether to load event data. True by default.
+        matches (bool, optional): selection of whether to load match data. True by default.
+        lineups (bool, optional): selection of whether to load lineup data. True by default.
+        player_stats (bool, optional): selection of whether to load player statistics. True by default.
+        teams (str or list, optional): only load matches involving these team(s). All matches by default.
+        type_names (list, optional): only load events of these types, e.g. ['Shot', 'Pass']. All events by default.
+        event_columns (list, optional): event columns to load. All columns are loaded by default.
+        dtype_backend (str, optional): pandas dtype backend of returned dataframes, 'pyarrow' by default. If None,
+                                       numpy dtypes are returned, with the data_schema compact dtypes applied.
+        db_path (str, optional): location of database file, relative to script in which function is called.
+
+    Returns:
+        dict: dictionary of dataframes, keyed by 'events', 'matches', 'lineups' and 'player_stats' (where selected).
+    """
+
+    if not os.path.isfile(db_path):
+        raise FileNotFoundError(f"No StatsBomb database found at {db_path}. Use store_statsbomb_data to create it.")
+
+    if isinstance(teams, str):
+        teams = [teams]
+
+    # Initialise output
+    data_dict = {}
+
+    with _connect(db_path) as con:
+
+        # Determine matches involving selected teams
+        match_ids = None
+        if teams is not None:
+            query, params = _build_query(con, 'matches', data_grab, columns=['home_team', 'away_team'])
+            query += f" AND (home_team IN ({', '.join(['?'] * len(teams))}) OR away_team IN " \
+                     f"({', '.join(['?'] * len(teams))}))"
+            match_ids = [row[0] for row in con.execute(query, params + teams + teams)]
+
+        selected_tables = {'events': events, 'matches': matches, 'lineups': lineups, 'player_stats': player_stats}
+        for table, selected in selected_tables.items():
+            if not selected:
+                continue
+            if not _table_columns(con, table):
+                data_dict[table] = pd.DataFrame()
+                continue
+            query, params = _build_query(con, table, data_grab, match_ids=match_ids,
+                                         type_names=type_names if table == 'events' else None,
+                                         columns=event_columns if table == 'events' else None)
+            data_dict[table] = _read_table(con, table, query, params, dtype_backend)
+
+    return data_dict
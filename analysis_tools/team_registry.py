@@ -0,0 +1,107 @@
+"""Module containing functions to look up teams and competitions within the team and competition registry
+
+The registry (team_registry.json, held alongside this module) lists each team and competition once, with its
+aliases (the different names used by each data source), badge or logo URL and, for teams, home and away colourmaps.
+On first use, an index from every alias to its registry entry is built, so that each lookup is a single dictionary
+access regardless of the number of teams.
+
+Functions
+---------
+team_info(team)
+    Get the registry entry of a team, from any of its aliases.
+
+competition_info(competition)
+    Get the registry entry of a competition, from any of its aliases.
+
+canonical_team_name(team)
+    Get the registry name of a team from any of its aliases, returning the name unchanged if it is not registered.
+
+normalise_team_names(names)
+    Convert team names to their registry names, so that teams named differently by different sources can be matched.
+"""
+
+import json
+import os
+from functools import lru_cache
+import pandas as pd
+
+
+# Location of registry file
+REGISTRY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'team_registry.json')
+
+
+@lru_cache(maxsize=None)
+def _alias_index(section):
+    """ Load a section of the registry ('teams' or 'competitions'), and index its entries on every alias."""
+
+    with open(REGISTRY_FILE, encoding='utf-8') as f:
+        entries = json.load(f)[section]
+
+    return {alias: entry for entry in entries for alias in entry['aliases']}
+
+
+def team_info(team):
+    """ Get the registry entry of a team, from any of its aliases.
+
+    Args:
+        team (str): team name, e.g. 'Man City'.
+
+    Returns:
+        dict: registry entry, containing name, aliases, badge_url and (where registered) home_cmap and away_cmap.
+    """
+
+    try:
+        return _alias_index('teams')[team]
+    except KeyError:
+        raise KeyError(f"Team '{team}' is not within the team registry ({REGISTRY_FILE})") from None
+
+
+def competition_info(competition):
+    """ Get the registry entry of a competition, from any of its aliases.
+
+    Args:
+        competition (str): competition name, e.g. 'Premier League'.
+
+    Returns:
+        dict: registry entry, containing name, aliases, logo_url and (where registered) logo_url_bright and
+              logo_url_by_year.
+    """
+
+    try:
+        return _alias_index('competitions')[competition]
+    except KeyError:
+        raise KeyError(f"Competition '{competition}' is not within the team registry ({REGISTRY_FILE})") from None
+
+
+def canonical_team_name(team):
+    """ Get the registry name of a team from any of its aliases, returning the name unchanged if it is not registered.
+
+    Args:
+        team (str): team name, e.g. 'Man City'.
+
+    Returns:
+        str: registry name of team, e.g. 'Manchester City'.
+    """
+
+    entry = _alias_index('teams').get(team)
+
+    return entry['name'] if entry is not None else team
+
+
+def normalise_team_names(names):
+    """ Convert team names to their registry names, so that teams named differently by different sources can be matched.
+
+    Function to convert a series of team names (for example the team_name column of event data, or the team column of
+    a league table) to registry names. Each distinct name is looked up once. Names that are not registered are
+    returned unchanged.
+
+    Args:
+        names (pandas.Series): team names.
+
+    Returns:
+        pandas.Series: registry team names, with the same index as the input.
+    """
+
+    unique_names = pd.unique(names.dropna())
+
+    return names.map({name: canonical_team_name(name) for name in unique_names})
@@ -11,6 +11,12 @@ progressive_action(single_event, inplay=True, successful_only=True)
 box_entry(single_event, inplay=True, successful_only=True):
     Identify pass or carry into box from whoscored-style event.
 
+progressive_actions(events_df, inplay=True, successful_only=True):
+    Identify progressive passes and carries within a WhoScored-style event dataframe.
+
+box_entries(events_df, inplay=True, successful_only=True):
+    Identify passes and carries into the box within a WhoScored-style event dataframe.
+
 create_convex_hull(events_df, name='default', min_events=3, include_percent=100, pitch_area = 10000):
     Create a dataframe of convex hull information from statsbomb-style event data.
 
@@ -20,13 +26,19 @@ passes_into_hull(hull_info, events_df, opp_passes=True, xt_info=False):
 insert_ball_carries(events_df, min_carry_length=3, max_carry_length=60, min_carry_duration=1, max_carry_duration=10):
     Add carry events to whoscored-style events dataframe
 
-get_xthreat(events_df, interpolate=True, pitch_length=105, pitch_width=68):
+load_xt_grid(grid=None):
+    Load an expected threat grid, defaulting to Karun Singh's 12x8 grid bundled with analysis_tools.
+
+xt_surface(grid=None, interpolate=True, pitch_length=100, pitch_width=100, resolution=10):
+    Get an expected threat surface, interpolating the expected threat grid if selected.
+
+get_xthreat(events_df, interpolate=True, pitch_length=100, pitch_width=100, grid=None, resolution=10):
     Add expected threat metric to whoscored-style events dataframe
 
-find_offensive_actions(events_df):
+find_offensive_actions(events_df, qualifiers_df=None):
     Return dataframe of in-play offensive actions from event data.
 
-find_defensive_actions(events_df):
+find_defensive_actions(events_df, qualifiers_df=None):
     Return dataframe of in-play defensive actions from event data.
 
 get_pass_outcome(pass_events, contextual_events, t=5)
@@ -36,12 +48,26 @@ get_possession_chains(events_df, chain_check=5, suc_evts_in_chain=3):
     Identify possession chains from whoscored event data.
 """
 
+import hashlib
+import os
 import numpy as np
 import pandas as pd
 from scipy.spatial import ConvexHull
-from scipy.interpolate import interp2d
+from scipy.interpolate import RegularGridInterpolator
 from scipy.spatial import Delaunay
 from shapely.geometry.polygon import Polygon
+import analysis_tools.whoscored_data_engineering as wde
+
+
+# Karun Singh's 12x8 expected threat grid (open_xt_12x8_v1), bundled alongside this module
+XT_GRID_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'open_xt_12x8_v1.json')
+
+# Satisfied event types of set pieces (corners, free kicks, throw-ins and goal kicks), used to exclude actions that are
+# not made in-play
+SET_PIECE_EVENT_TYPES = [48, 50, 51, 42, 44, 45, 31, 34, 212]
+
+# Expected threat surfaces calculated within this process, keyed on grid, pitch size and resolution
+_XT_SURFACES = {}
 
 
 def pre_assist(events_df):
@@ -63,7 +89,7 @@ def pre_assist(events_df):
     events_out.reset_index(inplace=True)
     events_out['pre_assist'] = float('nan')
 
-    for idx, assist_event in events_out[events_out['satisfiedEventsTypes'].apply(lambda x: 92 in x if x == x else False)].iterrows():
+    for idx, assist_event in events_out[wde.has_any(events_out, 92)].iterrows():
 
         # Obtain name of assister and numerical identifier of period
         period_number = assist_event['period']
@@ -197,6 +223,82 @@ def box_entry(single_event, inplay=True, successful_only=True):
         return float('nan')
     
 
+def _pass_or_carry_mask(events_df, inplay=True, successful_only=True):
+    """ Boolean mask of passes and carries, restricted to successful and in-play actions if selected."""
+
+    mask = events_df['eventType'].isin(['Pass', 'Carry']).to_numpy(dtype=bool)
+    if successful_only:
+        mask = mask & (events_df['outcomeType'] == 'Successful').to_numpy(dtype=bool)
+    if inplay:
+        mask = mask & ~wde.has_any(events_df, SET_PIECE_EVENT_TYPES).to_numpy(dtype=bool)
+
+    return mask
+
+
+def progressive_actions(events_df, inplay=True, successful_only=True):
+    """ Identify progressive passes and carries within a WhoScored-style event dataframe.
+
+    Vectorised equivalent of applying progressive_action to every event, using the same distance criteria. Set pieces
+    are identified from the satisfiedEventsTypes bitmask (see whoscored_data_engineering.has_any) rather than by
+    searching the list of each event.
+
+    Args:
+        events_df (pandas.DataFrame): WhoScored-style dataframe of event data. Events can be from multiple matches.
+        inplay (bool, optional): selection of whether to include 'in-play' events only. True by default.
+        successful_only (bool, optional): selection of whether to only include successful actions. True by default
+
+    Returns:
+        pandas.Series: True = progressive action, nan = non-progressive action, unsuccessful action or not a
+                       pass/carry.
+    """
+
+    # Determine action start and end position in yards (assuming standard pitch), and distance moved towards goal
+    x_startpos = 120 * events_df['x'].to_numpy(dtype=float) / 100
+    y_startpos = 80 * events_df['y'].to_numpy(dtype=float) / 100
+    x_endpos = 120 * events_df['endX'].to_numpy(dtype=float) / 100
+    y_endpos = 80 * events_df['endY'].to_numpy(dtype=float) / 100
+    delta_goal_dist = (np.sqrt((120 - x_startpos) ** 2 + (40 - y_startpos) ** 2) -
+                       np.sqrt((120 - x_endpos) ** 2 + (40 - y_endpos) ** 2))
+
+    # At least 30m closer within own half, 15m closer between halves or 10m closer within opponent's half
+    progressive = (((x_startpos < 60) & (x_endpos < 60) & (delta_goal_dist >= 32.8)) |
+                   ((x_startpos < 60) & (x_endpos >= 60) & (delta_goal_dist >= 16.4)) |
+                   ((x_startpos >= 60) & (x_endpos >= 60) & (delta_goal_dist >= 10.94)))
+    progressive = progressive & _pass_or_carry_mask(events_df, inplay, successful_only)
+
+    return pd.Series(np.where(progressive, True, np.nan), index=events_df.index, dtype=object)
+
+
+def box_entries(events_df, inplay=True, successful_only=True):
+    """ Identify passes and carries into the box within a WhoScored-style event dataframe.
+
+    Vectorised equivalent of applying box_entry to every event. Set pieces are identified from the
+    satisfiedEventsTypes bitmask (see whoscored_data_engineering.has_any) rather than by searching the list of each
+    event.
+
+    Args:
+        events_df (pandas.DataFrame): WhoScored-style dataframe of event data. Events can be from multiple matches.
+        inplay (bool, optional): selection of whether to include 'in-play' events only. True by default.
+        successful_only (bool, optional): selection of whether to only include successful events. True by default
+
+    Returns:
+        pandas.Series: True = successful action into the box, nan = not box action, unsuccessful action or not a
+                       pass/carry.
+    """
+
+    x_position = events_df['x'].to_numpy(dtype=float)
+    y_position = events_df['y'].to_numpy(dtype=float)
+    x_position_end = events_df['endX'].to_numpy(dtype=float)
+    y_position_end = events_df['endY'].to_numpy(dtype=float)
+
+    # Check whether action moves ball into the box from outside of it
+    into_box = ((x_position_end >= 83) & (21.1 <= y_position_end) & (y_position_end <= 78.9) &
+                ((x_position < 83) | (y_position < 21.1) | (y_position > 78.9)))
+    into_box = into_box & _pass_or_carry_mask(events_df, inplay, successful_only)
+
+    return pd.Series(np.where(into_box, True, np.nan), index=events_df.index, dtype=object)
+
+
 def create_convex_hull(events_df, name='default', min_events=3, include_events='1std', pitch_area=10000):
     """ Create a dataframe of convex hull information from statsbomb-style event data.
 
@@ -498,139 +600,185 @@ def insert_ball_carries(events_df, min_carry_length=3, max_carry_length=60, min_
     return events_out
 
 
-def get_xthreat(events_df, interpolate=True, pitch_length=100, pitch_width=100):
+def load_xt_grid(grid=None):
+    """ Load an expected threat grid, defaulting to Karun Singh's 12x8 grid bundled with analysis_tools.
+
+    Args:
+        grid (str, numpy.ndarray or pandas.DataFrame, optional): expected threat grid, or location of json file
+                                                                 containing grid. Rows run across the pitch and columns
+                                                                 along the pitch (towards the opposition goal). Karun
+                                                                 Singh's 12x8 grid by default.
+
+    Returns:
+        numpy.ndarray: expected threat grid.
+    """
+
+    if grid is None:
+        grid = XT_GRID_FILE
+    if isinstance(grid, str):
+        grid = pd.read_json(grid)
+
+    return np.asarray(grid, dtype='float64')
+
+
+def xt_surface(grid=None, interpolate=True, pitch_length=100, pitch_width=100, resolution=10):
+    """ Get an expected threat surface, interpolating the expected threat grid if selected.
+
+    Function to return the array of expected threat values used by get_xthreat. If interpolate is selected, the grid
+    is bilinearly interpolated onto a surface of (resolution x pitch_width) by (resolution x pitch_length) cells, with
+    values beyond the outermost cell centres taken from the nearest cell. Surfaces are cached in memory for each grid,
+    pitch size and resolution, so the interpolation is only calculated once per process.
+
+    Args:
+        grid (str, numpy.ndarray or pandas.DataFrame, optional): expected threat grid, or location of json file
+                                                                 containing grid. Karun Singh's 12x8 grid by default.
+        interpolate (bool, optional): selection of whether to interpolate grid. True by default.
+        pitch_length (float, optional): extent of pitch x coordinate (based on event data). 100 by default.
+        pitch_width (float, optional): extent of pitch y coordinate (based on event data). 100 by default.
+        resolution (int, optional): interpolated cells per unit of pitch length and width. 10 by default.
+
+    Returns:
+        numpy.ndarray: expected threat surface.
+    """
+
+    xt_grid = load_xt_grid(grid)
+    if not interpolate:
+        return xt_grid
+
+    surface_key = (hashlib.sha1(xt_grid.tobytes()).hexdigest(), xt_grid.shape, pitch_length, pitch_width, resolution)
+    if surface_key not in _XT_SURFACES:
+        init_cell_count_w, init_cell_count_l = xt_grid.shape
+        cell_length = pitch_length / init_cell_count_l
+        cell_width = pitch_width / init_cell_count_w
+        x = np.arange(0.0, pitch_length, cell_length)[:init_cell_count_l] + 0.5 * cell_length
+        y = np.arange(0.0, pitch_width, cell_width)[:init_cell_count_w] + 0.5 * cell_width
+        xs = np.linspace(0, pitch_length, int(pitch_length * resolution))
+        ys = np.linspace(0, pitch_width, int(pitch_width * resolution))
+
+        # Bilinear interpolation, clipping to cell centres so values beyond the outermost centres match nearest cell
+        interpolator = RegularGridInterpolator((y, x), xt_grid, method='linear')
+        query_y, query_x = np.meshgrid(np.clip(ys, y[0], y[-1]), np.clip(xs, x[0], x[-1]), indexing='ij')
+        _XT_SURFACES[surface_key] = interpolator((query_y, query_x))
+
+    return _XT_SURFACES[surface_key]
+
+
+def get_xthreat(events_df, interpolate=True, pitch_length=100, pitch_width=100, grid=None, resolution=10):
     """ Add expected threat metric to whoscored-style events dataframe
 
     Function to apply Karun Singh's expected threat model to all successful pass and carry events within a
     whoscored-style events dataframe. This imposes a 12x8 grid of expected threat values on a standard pitch. An
-    interpolate parameter can be passed to impose a continous set of expected threat values on the pitch.
+    interpolate parameter can be passed to impose a continous set of expected threat values on the pitch. An
+    alternative expected threat grid can also be passed. The expected threat surface is calculated once per process
+    (see xt_surface), so that expected threat is obtained by indexing the surface at the start and end of each event.
 
     Args:
         events_df (pandas.DataFrame): whoscored-style dataframe of event data. Events can be from multiple matches.
         interpolate (bool, optional): selection of whether to impose a continous set of xT values. True by default.
         pitch_length (float, optional): extent of pitch x coordinate (based on event data). 100 by default.
         pitch_width (float, optional): extent of pitch y coordinate (based on event data). 100 by default.
+        grid (str, numpy.ndarray or pandas.DataFrame, optional): expected threat grid, or location of json file
+                                                                 containing grid. Karun Singh's 12x8 grid by default.
+        resolution (int, optional): interpolated cells per unit of pitch length and width, if interpolating. 10 by
+                                    default.
 
     Returns:
         pandas.DataFrame: whoscored-style dataframe of events, including expected threat
     """
 
     # Define function to get cell in which an x, y value falls
-    def get_cell_indexes(x_series, y_series, cell_cnt_l, cell_cnt_w, field_length, field_width):
-        xi = x_series.divide(field_length).multiply(cell_cnt_l)
-        yj = y_series.divide(field_width).multiply(cell_cnt_w)
-        xi = xi.astype('int64').clip(0, cell_cnt_l - 1)
-        yj = yj.astype('int64').clip(0, cell_cnt_w - 1)
+    def get_cell_indexes(x_values, y_values, cell_cnt_l, cell_cnt_w, field_length, field_width):
+        xi = np.clip(np.floor(x_values / field_length * cell_cnt_l), 0, cell_cnt_l - 1).astype('int64')
+        yj = np.clip(np.floor(y_values / field_width * cell_cnt_w), 0, cell_cnt_w - 1).astype('int64')
         return xi, yj
 
     # Initialise output
-    events_out = pd.DataFrame()
+    events_out = events_df.reset_index(drop=True)
 
-    # Get Karun Singh expected threat grid
-    path = "https://karun.in/blog/data/open_xt_12x8_v1.json"
-    xt_grid = pd.read_json(path)
-    init_cell_count_w, init_cell_count_l = xt_grid.shape
+    # Get expected threat surface
+    surface = xt_surface(grid, interpolate, pitch_length, pitch_width, resolution)
+    cell_count_w, cell_count_l = surface.shape
 
-    # Isolate actions that involve successfully moving the ball (successful carries and passes)
-    move_actions = events_df[(events_df['eventType'].isin(['Carry', 'Pass'])) &
-                             (events_df['outcomeType'] == 'Successful')]
+    # Isolate actions that involve successfully moving the ball (successful carries and passes) with known locations
+    move_mask = ((events_out['eventType'].isin(['Carry', 'Pass'])) &
+                 (events_out['outcomeType'] == 'Successful')).to_numpy(dtype=bool)
+    locations = events_out.loc[move_mask, ['x', 'y', 'endX', 'endY']].to_numpy(dtype='float64')
+    valid = np.isfinite(locations).all(axis=1)
+    locations = np.nan_to_num(locations)
 
-    # Set-up bilinear interpolator if user chooses to
-    if interpolate:
-        cell_length = pitch_length / init_cell_count_l
-        cell_width = pitch_width / init_cell_count_w
-        x = np.arange(0.0, pitch_length, cell_length) + 0.5 * cell_length
-        y = np.arange(0.0, pitch_width, cell_width) + 0.5 * cell_width
-        interpolator = interp2d(x=x, y=y, z=xt_grid.values, kind='linear', bounds_error=False)
-        interp_cell_count_l = int(pitch_length * 10)
-        interp_cell_count_w = int(pitch_width * 10)
-        xs = np.linspace(0, pitch_length, interp_cell_count_l)
-        ys = np.linspace(0, pitch_width, interp_cell_count_w)
-        grid = interpolator(xs, ys)
-    else:
-        grid = xt_grid.values
+    # Get cell indices of start and end location of events
+    startxc, startyc = get_cell_indexes(locations[:, 0], locations[:, 1], cell_count_l, cell_count_w, pitch_length,
+                                        pitch_width)
+    endxc, endyc = get_cell_indexes(locations[:, 2], locations[:, 3], cell_count_l, cell_count_w, pitch_length,
+                                    pitch_width)
 
-    # Set cell counts based on use of interpolator
-    if interpolate:
-        cell_count_l = interp_cell_count_l
-        cell_count_w = interp_cell_count_w
-    else:
-        cell_count_l = init_cell_count_l
-        cell_count_w = init_cell_count_w
+    # Calculate net xt from start to end of events
+    xt_values = np.full(len(events_out), np.nan)
+    xt_values[move_mask] = np.where(valid, surface[cell_count_w - 1 - endyc, endxc] -
+                                    surface[cell_count_w - 1 - startyc, startxc], np.nan)
 
-    # For each match, apply expected threat grid (we go by match to avoid issues with identical event indicies)
-    for match_id in move_actions['match_id'].unique():
-        match_move_actions = move_actions[move_actions['match_id'] == match_id]
+    events_out['xThreat'] = xt_values
+    events_out['xThreat_gen'] = np.where(np.isnan(xt_values) | (xt_values > 0), xt_values, 0)
 
-        # Get cell indices of start location of event
-        startxc, startyc = get_cell_indexes(match_move_actions['x'], match_move_actions['y'], cell_count_l,
-                                            cell_count_w, pitch_length, pitch_width)
-        endxc, endyc = get_cell_indexes(match_move_actions['endX'], match_move_actions['endY'], cell_count_l,
-                                        cell_count_w, pitch_length, pitch_width)
+    return events_out
 
-        # Calculate xt at start and end of eventa
-        xt_start = grid[startyc.rsub(cell_count_w - 1), startxc]
-        xt_end = grid[endyc.rsub(cell_count_w - 1), endxc]
 
-        # Build dataframe of event index and net xt
-        ratings = pd.DataFrame(data=xt_end-xt_start, index=match_move_actions.index, columns=['xThreat'])
+def _aerials_with_qualifier(events_df, qualifier_id, qualifiers_df=None):
+    """ Return aerial events that carry a qualifier, building a qualifier table for aerials if one is not passed."""
 
-        # Merge ratings dataframe to all match events
-        match_events_and_ratings = pd.merge(left=events_df[events_df['match_id'] == match_id], right=ratings,
-                                            how="left", left_index=True, right_index=True)
-        events_out = pd.concat([events_out, match_events_and_ratings], ignore_index=True, sort=False)
-        events_out['xThreat_gen'] = events_out['xThreat'].apply(lambda xt: xt if (xt > 0 or xt != xt) else 0)
+    aerials = events_df[events_df['eventType'] == 'Aerial']
+    if qualifiers_df is None:
+        _, qualifiers_df = wde.explode_qualifiers(aerials)
 
-    return events_out
+    return aerials[wde.has_qualifier(aerials, qualifiers_df, qualifier_id).values]
 
 
-def find_offensive_actions(events_df):
+def find_offensive_actions(events_df, qualifiers_df=None):
     """ Return dataframe of in-play offensive actions from event data.
 
     Function to find all in-play offensive actions within a whoscored-style events dataframe (single or multiple
-    matches), and return as a new dataframe.
+    matches), and return as a new dataframe. A qualifier table (built with explode_qualifiers) can be passed, in which
+    case the event qualifiers column is not required.
 
     Args:
         events_df (pandas.DataFrame): whoscored-style dataframe of event data. Events can be from multiple matches.
+        qualifiers_df (pandas.DataFrame, optional): qualifier table corresponding to events_df. None by default.
 
     Returns:
         pandas.DataFrame: whoscored-style dataframe of offensive actions.
     """
 
     # Offensive aerials
-    aerials = events_df[events_df['eventType'] == 'Aerial']
-    offensive_aerials = aerials[aerials['qualifiers'].apply(lambda x:
-                                                            {'type': {'value': 286, 'displayName': 'Offensive'}} in x)]
+    offensive_aerials = _aerials_with_qualifier(events_df, 286, qualifiers_df)
 
     # Define and filter offensive events
     offensive_actions = ['BallTouch', 'GoodSkill', 'TakeOn', 'Pass', 'OffsidePass', 'MissedShots', 'SavedShot',
                          'ShotOnPost', 'Goal', 'Carry']
     offensive_action_df = events_df[(events_df['eventType'].isin(offensive_actions)) &
-                                    (events_df['satisfiedEventsTypes'].apply(lambda x: not (5 in x or 6 in x or 31 in x
-                                                                                            or 34 in x or 212 in x)))]
+                                    (~wde.has_any(events_df, [5, 6, 31, 34, 212]))]
     offensive_action_df = pd.concat([offensive_action_df,
                                      offensive_aerials], axis=0).sort_values(['match_id', 'cumulative_mins'])
 
     return offensive_action_df
 
 
-def find_defensive_actions(events_df):
+def find_defensive_actions(events_df, qualifiers_df=None):
     """ Return dataframe of in-play defensive actions from event data.
 
     Function to find all in-play defensive actions within a whoscored-style events dataframe (single or multiple
-    matches), and return as a new dataframe.
+    matches), and return as a new dataframe. A qualifier table (built with explode_qualifiers) can be passed, in which
+    case the event qualifiers column is not required.
 
     Args:
         events_df (pandas.DataFrame): whoscored-style dataframe of event data. Events can be from multiple matches.
+        qualifiers_df (pandas.DataFrame, optional): qualifier table corresponding to events_df. None by default.
 
     Returns:
         pandas.DataFrame: whoscored-style dataframe of defensive actions.
     """
 
     # Defensive Aerials
-    aerials = events_df[events_df['eventType']=='Aerial']
-    defensive_aerials = aerials[aerials['qualifiers'].apply(lambda x:
-                                                            {'type': {'value': 285, 'displayName': 'Defensive'}} in x)]
+    defensive_aerials = _aerials_with_qualifier(events_df, 285, qualifiers_df)
 
     # Define and filter defensive events
     defensive_actions = ['BallRecovery', 'BlockedPass', 'Clearance', 'Foul', 'Interception', 'Tackle',
@@ -663,6 +811,10 @@ def get_pass_outcome(pass_events, contextual_events, t=5):
     pass_events_out = pass_events.reset_index(drop=True).copy()
     pass_events_out['pass_outcome'] = np.nan
 
+    # Identify assists and key passes up front, rather than searching event lists for each pass
+    pass_is_assist = wde.has_any(pass_events_out, 92).values
+    contextual_events = contextual_events.assign(key_pass=wde.has_any(contextual_events, np.arange(39, 47)).values)
+
     # Iterate through passes and look through following actions
     for idx, pass_evt in pass_events_out.iterrows():
 
@@ -679,7 +831,7 @@ def get_pass_outcome(pass_events, contextual_events, t=5):
             pass_events_out.loc[idx, 'pass_outcome'] = 'Unsuccessful'
 
         # Looks for goals in next t seconds
-        elif ('Goal' in team_next_evts['eventType'].tolist()) or (92 in pass_evt['satisfiedEventsTypes']):
+        elif ('Goal' in team_next_evts['eventType'].tolist()) or pass_is_assist[idx]:
             pass_events_out.loc[idx, 'pass_outcome'] = 'Goal'
 
         # Look for shots in next t seconds
@@ -689,8 +841,7 @@ def get_pass_outcome(pass_events, contextual_events, t=5):
             pass_events_out.loc[idx, 'pass_outcome'] = 'Shot'
 
         # Look for key pass events in next t seconds
-        elif bool(set([item for sublist in next_evts['satisfiedEventsTypes'].tolist() for item in sublist]) &
-                  set(np.arange(39, 47))):
+        elif next_evts['key_pass'].any():
             pass_events_out.loc[idx, 'pass_outcome'] = 'Key Pass'
 
         # Otherwise check pass success
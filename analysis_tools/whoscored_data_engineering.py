@@ -14,10 +14,13 @@ cumulative_match_mins(events):
 minutes_played(lineups)
     Add total minutes played to player data.
 
+lineup_segments(players_df):
+    Split each team's match into segments between substitutions, during which the team's lineup is unchanged.
+
 longest_xi(players_df):
     Determine the xi players in each team on the pitch for the longest consistent time.
 
-events_while_playing(events_df, players_df, event_name='Pass', event_team='opposition'):
+events_while_playing(events_df, players_df, event_name='Pass', event_team='opposition', event_specs=None):
     Determine number of times an event type occurs whilst players are on the pitch, and add to player dataframe.
 
 create_player_list(lineups, additional_cols=None):
@@ -25,11 +28,38 @@ create_player_list(lineups, additional_cols=None):
 
 group_player_events(events, player_data, group_type='count', agg_columns=None, primary_event_name='Column Name'):
     Aggregate event types per player, and add to player info
+
+aggregate_players(events, player_data, metrics, per_90=False, per_100=None):
+    Aggregate several event metrics per player in a single pass, and add to player information dataframe
+
+encode_satisfied_events(events_df):
+    Encode satisfiedEventsTypes lists as packed bitmask columns.
+
+has_any(events_df, event_type_ids):
+    Identify events that satisfy any of a list of WhoScored satisfied event types.
+
+has_all(events_df, event_type_ids):
+    Identify events that satisfy all of a list of WhoScored satisfied event types.
+
+explode_qualifiers(events_df, drop_qualifiers=False):
+    Build a long-format table of WhoScored event qualifiers.
+
+has_qualifier(events_df, qualifiers_df, qualifier_ids, value=None):
+    Identify events that carry any of a list of WhoScored qualifiers.
     
 """
 
+from itertools import chain
 import pandas as pd
 import numpy as np
+import analysis_tools.interval_counts as ic
+
+
+# Number of 64-bit words used to encode satisfiedEventsTypes (supports event type ids up to 255)
+SATISFIED_EVENTS_WORDS = 4
+
+# Columns identifying the event that each row of a qualifier table belongs to
+QUALIFIER_EVENT_KEY = ['match_id', 'teamId', 'eventId']
 
 
 def get_recipient(events_df):
@@ -67,23 +97,28 @@ def add_team_name(events_df, players_df):
         pandas.DataFrame: whoscored-style event dataframe with additional 'team_name' and 'opp_team_name' column.
     """
 
-    # Initialise output dataframes
-    events_out = pd.DataFrame()
-
-    # Add cumulative time to events data, resetting for each unique match
-    for match_id in events_df['match_id'].unique():
-        team_name_and_id = players_df[players_df['match_id'] == match_id][['teamId', 'team']].values
-        team_dict = dict.fromkeys([team_name_and_id[0][0], team_name_and_id[-1][0]])
-        team_dict[team_name_and_id[0][0]] = team_name_and_id[0][1]
-        team_dict[team_name_and_id[-1][0]] = team_name_and_id[-1][1]
-
-        match_events = events_df[events_df['match_id'] == match_id].copy()
-        match_events['team_name'] = match_events['teamId'].apply(lambda x: team_dict[x] if x == x else np.nan)
-        match_events['opp_team_name'] = match_events['teamId'].apply(
-            lambda x: "".join(dict((k, v) for k, v in team_dict.items() if k != x).values()) if x == x else np.nan)
+    # Initialise output dataframe
+    events_out = events_df.copy()
 
-        # Rebuild events dataframe
-        events_out = pd.concat([events_out, match_events])
+    # Build (match_id, teamId) lookup of team names, using the first and last team listed for each match
+    match_teams = players_df[['match_id', 'teamId', 'team']].copy()
+    match_teams['teamId'] = match_teams['teamId'].astype(float)
+    match_groups = match_teams.groupby('match_id', sort=False)
+    match_teams = pd.concat([match_groups.head(1), match_groups.tail(1)]).drop_duplicates(['match_id', 'teamId'])
+
+    # Pair each team with the other team in the same match to obtain opposition name
+    team_pairs = match_teams.merge(match_teams, on='match_id', suffixes=('', '_opp'))
+    team_pairs = team_pairs[team_pairs['teamId'] != team_pairs['teamId_opp']]
+    team_lookup = match_teams.merge(team_pairs[['match_id', 'teamId', 'team_opp']], on=['match_id', 'teamId'],
+                                    how='left')
+    team_lookup['team_opp'] = team_lookup['team_opp'].fillna('')
+    team_lookup = team_lookup.set_index(['match_id', 'teamId'])
+
+    # Look up team names of all events at once
+    event_keys = pd.MultiIndex.from_arrays([events_out['match_id'], events_out['teamId'].astype(float)])
+    event_teams = team_lookup.reindex(event_keys)
+    events_out['team_name'] = event_teams['team'].to_numpy()
+    events_out['opp_team_name'] = event_teams['team_opp'].to_numpy()
 
     return events_out
 
@@ -101,27 +136,12 @@ def cumulative_match_mins(events_df):
         pandas.DataFrame: whoscored-style event dataframe with additional 'cumulative_mins' column.
         """
 
-    # Initialise output dataframes
-    events_out = pd.DataFrame()
-
-    # Add cumulative time to events data, resetting for each unique match
-    for match_id in events_df['match_id'].unique():
-        match_events = events_df[events_df['match_id'] == match_id].copy()
-        match_events['cumulative_mins'] = match_events['minute'] + (1/60) * match_events['second']
-
-        # Add time increment to cumulative minutes based on period of game.
-        for period in np.arange(1, match_events['period'].max() + 1, 1):
-            if period > 1:
-                t_delta = match_events[match_events['period'] == period - 1]['cumulative_mins'].max() - \
-                          match_events[match_events['period'] == period]['cumulative_mins'].min()
-            elif period == 1 or period == 5:
-                t_delta = 0
-            else:
-                t_delta = 0
-            match_events.loc[match_events['period'] == period, 'cumulative_mins'] += t_delta
+    # Initialise output dataframe
+    events_out = events_df.copy()
 
-        # Rebuild events dataframe
-        events_out = pd.concat([events_out, match_events])
+    # Add time increment to match minutes based on period of game, resetting for each unique match
+    match_mins = events_out['minute'].astype(float) + (1/60) * events_out['second'].astype(float)
+    events_out['cumulative_mins'] = match_mins + ic.period_offsets(events_out, match_mins)
 
     return events_out
 
@@ -141,52 +161,66 @@ def minutes_played(players_df, events_df=None):
         pandas.DataFrame: WhoScored-style player dataframe with additional time columns.
         """
 
-    # Nested function to calculate and format time played from match duration and line-up dataframe
-    def time_played(player, total_mins):
-        if player['isFirstEleven'] is True:
-            time_on = 0
-            if player['subbedOutExpandedMinute'] != player['subbedOutExpandedMinute']:
-                time_off = total_mins
-            else:
-                time_off = player['subbedOutExpandedMinute']
-        elif player['subbedInExpandedMinute'] == player['subbedInExpandedMinute']:
-            time_on = player['subbedInExpandedMinute']
-            if player['subbedOutExpandedMinute'] != player['subbedOutExpandedMinute']:
-                time_off = total_mins
-            else:
-                time_off = player['subbedOutExpandedMinute']
-        else:
-            time_on = np.nan
-            time_off = np.nan
-        mins_played = time_off - time_on
-        return [time_on, time_off, mins_played]
-
-    # Initialise output dataframes
-    players_df_out = pd.DataFrame()
-
-    # Add cumulative time to events data, resetting for each unique match
-    for match_id in players_df['match_id'].unique():
-        players = players_df[players_df['match_id'] == match_id]
-
-        # Determine total match length from event data, if passed (protect against erroneous mins)
-        if events_df is not None:
-            match_events = events_df[events_df['match_id'] == match_id]
-            match_minutes = match_events['expandedMinute'].max()
-            if match_minutes >= 300:
-                match_minutes = 95
-        else:
-            match_minutes = 95
+    # Initialise output dataframe
+    players_df_out = players_df.copy()
 
-        # Apply time_played function to reformat time on and time off, and calculate minutes played
-        players[['time_on', 'time_off', 'mins_played']] = players.apply(time_played, axis=1, result_type="expand",
-                                                                        total_mins=match_minutes)
+    # Determine total length of each match from event data, if passed (protect against erroneous mins)
+    if events_df is not None:
+        match_minutes = events_df.groupby('match_id')['expandedMinute'].max().astype(float)
+        match_minutes[match_minutes >= 300] = 95
+        total_mins = match_minutes.reindex(players_df_out['match_id']).to_numpy()
+    else:
+        total_mins = np.full(len(players_df_out), 95.0)
 
-        # Rebuild player dataframe
-        players_df_out = pd.concat([players_df_out, players])
+    # Starters are on from the start, and substitutes from when they are subbed on. Players who appear are on until they
+    # are subbed off, or otherwise until the end of the match. Unused substitutes have no time on or off.
+    starter = players_df_out['isFirstEleven'].eq(True).to_numpy(dtype=bool, na_value=False)
+    subbed_on = players_df_out['subbedInExpandedMinute'].astype(float).to_numpy()
+    subbed_off = players_df_out['subbedOutExpandedMinute'].astype(float).to_numpy()
+    appeared = starter | ~np.isnan(subbed_on)
+
+    players_df_out['time_on'] = np.where(starter, 0, subbed_on)
+    players_df_out['time_off'] = np.where(appeared, np.where(np.isnan(subbed_off), total_mins, subbed_off), np.nan)
+    players_df_out['mins_played'] = players_df_out['time_off'] - players_df_out['time_on']
 
     return players_df_out
 
 
+def lineup_segments(players_df):
+    """ Split each team's match into segments between substitutions, during which the team's lineup is unchanged.
+
+    Function to determine the minutes at which each team changes its lineup (when a player is subbed off), and return
+    the intervals between changes. It is intended that this function is used after minutes_played has been called.
+
+    Args:
+        players_df (pandas.DataFrame): WhoScored-style dataframe of player information, can be from multiple matches.
+
+    Returns:
+        pandas.DataFrame: one row per lineup segment, with match_id, teamId, segment number, start_min, end_min and
+                          duration_mins.
+    """
+
+    players = players_df[['match_id', 'teamId', 'time_off']].reset_index(drop=True)
+    match_end = np.floor(players.groupby('match_id', sort=False)['time_off'].transform('max'))
+
+    # Segment boundaries are the match start, each substitution and the match end
+    subs = players[players['time_off'].notna() & (players['time_off'] < match_end)]
+    teams = players.assign(match_end=match_end).drop_duplicates(['match_id', 'teamId'])
+    boundaries = pd.concat([teams[['match_id', 'teamId']].assign(start_min=0.0),
+                            subs[['match_id', 'teamId']].assign(start_min=subs['time_off']),
+                            teams[['match_id', 'teamId']].assign(start_min=teams['match_end'])])
+    boundaries = boundaries.dropna(subset=['start_min']).drop_duplicates()
+    boundaries = boundaries.sort_values(['match_id', 'teamId', 'start_min'], kind='stable')
+
+    # Pair each boundary with the next boundary of the same team
+    boundaries['end_min'] = boundaries.groupby(['match_id', 'teamId'])['start_min'].shift(-1)
+    segments = boundaries.dropna(subset=['end_min']).reset_index(drop=True)
+    segments.insert(2, 'segment', segments.groupby(['match_id', 'teamId']).cumcount())
+    segments['duration_mins'] = segments['end_min'] - segments['start_min']
+
+    return segments
+
+
 def longest_xi(players_df):
     """ Determine the xi players in each team on the pitch for the longest consistent time.
 
@@ -199,112 +233,102 @@ def longest_xi(players_df):
     Returns:
         pandas.DataFrame: WhoScored-style player dataframe with additional longest_xi column."""
 
-    # Initialise output dataframes
-    players_df_out = pd.DataFrame()
-
-    # Add cumulative time to events data, resetting for each unique match
-    for match_id in players_df['match_id'].unique():
-        players = players_df[players_df['match_id'] == match_id]
-        players['longest_xi'] = np.nan
-
-        # Determine match length and initialise list of sub minutes.
-        match_end = max(players_df['time_off'])
-        sub_mins = [[], []]
-
-        # Determine the longest same xi for each team individually
-        for idx, team in enumerate(players['teamId'].unique()):
-            team_player_df = players[players['teamId'] == team]
-
-            # Get minutes players are subbed off
-            for _, player in team_player_df.iterrows():
-                if player['time_off'] != match_end and player['time_off'] == player['time_off']:
-                    sub_mins[idx].append(player['time_off'])
-
-            # Add in match start minute and match end minute, then sort by minute
-            sub_mins[idx].insert(0, 0)
-            sub_mins[idx].append(int(match_end))
-            sub_mins[idx].sort()
-
-            # Longest xi corresponds to the largest time between subs. Get indices of start and end min.
-            max_min_diff = 0
-            same_team_idxx = 1
-            for idxx in np.arange(1, len(sub_mins[idx])):
-                min_diff = sub_mins[idx][idxx] - sub_mins[idx][idxx - 1]
-                if min_diff > max_min_diff:
-                    max_min_diff = min_diff
-                    same_team_idxx = idxx
-            same_team_mins = [sub_mins[idx][same_team_idxx - 1], sub_mins[idx][same_team_idxx]]
-
-            # Check if players game time includes the longest xi times, and mark if they feature in the longest xi
-            for playerid, player in team_player_df.iterrows():
-                if player['time_on'] <= same_team_mins[0] and player['time_off'] >= same_team_mins[1]:
-                    players.loc[playerid, 'longest_xi'] = True
-
-        # Rebuild player dataframe
-        players_df_out = pd.concat([players_df_out, players])
+    # Initialise output dataframe
+    players_df_out = players_df.copy()
+
+    # Longest xi corresponds to the longest lineup segment of each team (the earliest, if tied)
+    segments = lineup_segments(players_df_out)
+    longest_segments = segments.loc[segments.groupby(['match_id', 'teamId'], sort=False)['duration_mins'].idxmax()]
+    longest_segments = longest_segments.set_index(['match_id', 'teamId'])
+    player_keys = pd.MultiIndex.from_arrays([players_df_out['match_id'], players_df_out['teamId']])
+    player_segments = longest_segments.reindex(player_keys)
+
+    # Mark players whose game time includes the whole of their team's longest segment
+    in_longest_xi = (players_df_out['time_on'].to_numpy() <= player_segments['start_min'].to_numpy()) & \
+                    (players_df_out['time_off'].to_numpy() >= player_segments['end_min'].to_numpy())
+    players_df_out['longest_xi'] = np.where(in_longest_xi, True, np.nan)
 
     return players_df_out
 
 
-def events_while_playing(events_df, players_df, event_name='Pass', event_team='opposition'):
+def events_while_playing(events_df, players_df, event_name='Pass', event_team='opposition', event_specs=None):
     """ Determine number of times an event type occurs whilst players are on the pitch, and add to player dataframe.
 
     Function to calculate the total number of specific event-types that a player either faces or own team completes
     in each game, and add the information to a WhoScored-style dataframe. The user must define the event type to
     aggregate using WhoScored convention, and specify whether to aggregate for the player's own team or the
     opposition. For example, this function could be used to calculate the number of passes the opposition team makes,
-    and assign to each player within the lineups dataframe.
+    and assign to each player within the lineups dataframe. Several event types can be counted at once by passing a
+    list of event specifications, each of which is a dictionary containing:
+
+    - event_name (str): WhoScored event type, or 'Touch' for all touches.
+    - event_team (str): 'own' or 'opposition'.
+    - x_range (tuple, optional): minimum and maximum x co-ordinate of events to count, with None for no limit.
+    - y_range (tuple, optional): minimum and maximum y co-ordinate of events to count, with None for no limit.
+    - column (str, optional): name of output column. Defaults to team_ or opp_ followed by the event name.
+
+    Events are counted if they occur strictly between the minutes the player comes on and goes off. Players from
+    matches without event data are assigned a missing count.
 
     Args:
         events_df (pandas.DataFrame): WhoScored-style dataframe of event data. Events can be from multiple matches.
         players_df (pandas.DataFrame): WhoScored-style dataframe of players, can be from multiple matches.
         event_name (str): WhoScored event type to aggregate data on. Requires WhoScored convention. Defaults to 'Pass'
         event_team (str): aggregate on the player's own team or opposition team. Defaults to opposition.
+        event_specs (list, optional): event specifications to count, overriding event_name and event_team. None by
+                                      default.
 
     Returns:
-        pandas.DataFrame: WhoScored-style player dataframe with additional events count column.
+        pandas.DataFrame: WhoScored-style player dataframe with additional events count column(s).
     """
 
     # Initialise output dataframe
-    players_df_out = pd.DataFrame()
-
-    # Add event count to lineup data, resetting for each individual match
-    for match_id in events_df['match_id'].unique():
-        match_events = events_df[events_df['match_id'] == match_id].copy()
-        players = players_df[players_df['match_id'] == match_id].copy()
-
-        # For each team calculate team events, and assign to player
-        for team in set(match_events['teamId']):
-            team_players = players[players['teamId'] == team].copy()
-
-            # Choose whether to include own team or opposition events, and build column name
-            if event_team == 'own':
-                if event_name == 'Touch':
-                    team_events = match_events[(match_events['teamId'] == team) &
-                                               (match_events['isTouch'] == True)]
-                else:
-                    team_events = match_events[(match_events['teamId'] == team) &
-                                               (match_events['eventType'] == event_name)]
-                col_name = 'team_' + event_name.lower()
-
-            else:
-                if event_name == 'Touch':
-                    team_events = match_events[(match_events['teamId'] != team) &
-                                               (match_events['isTouch'] == True)]
-                else:
-                    team_events = match_events[(match_events['teamId'] != team) &
-                                               (match_events['eventType'] == event_name)]
-
-                col_name = 'opp_' + event_name.lower()
-
-            # For each player, count events whilst they were on the pitch
-            for idx, player in team_players.iterrows():
-                event_count = len(team_events[(team_events['expandedMinute'] > player['time_on']) &
-                                              (team_events['expandedMinute'] < player['time_off'])])
-                team_players.loc[idx, col_name] = event_count
-
-            # Rebuild lineups dataframe
-            players_df_out = pd.concat([players_df_out, team_players])
+    players_df_out = players_df.copy()
+
+    if event_specs is None:
+        event_specs = [{'event_name': event_name, 'event_team': event_team}]
+
+    # Group events and players by match, and by team within match
+    match_index = pd.Index(pd.unique(events_df['match_id']))
+    team_index = pd.MultiIndex.from_arrays([players_df['match_id'], players_df['teamId'].astype(float)]).unique()
+    event_matches = match_index.get_indexer(events_df['match_id'])
+    event_teams = team_index.get_indexer(pd.MultiIndex.from_arrays([events_df['match_id'],
+                                                                    events_df['teamId'].astype(float)]))
+    player_matches = match_index.get_indexer(players_df['match_id'])
+    player_teams = np.where(player_matches >= 0, team_index.get_indexer(pd.MultiIndex.from_arrays(
+        [players_df['match_id'], players_df['teamId'].astype(float)])), -1)
+
+    # Select events of each specification
+    event_masks = {}
+    for idx, spec in enumerate(event_specs):
+        if spec['event_name'] == 'Touch':
+            mask = events_df['isTouch'].eq(True).to_numpy(dtype=bool, na_value=False)
+        else:
+            mask = events_df['eventType'].eq(spec['event_name']).to_numpy(dtype=bool, na_value=False)
+        for axis in ['x', 'y']:
+            axis_min, axis_max = spec.get(f"{axis}_range") or (None, None)
+            if axis_min is not None:
+                mask = mask & events_df[axis].ge(axis_min).to_numpy(dtype=bool, na_value=False)
+            if axis_max is not None:
+                mask = mask & events_df[axis].le(axis_max).to_numpy(dtype=bool, na_value=False)
+        event_masks[idx] = mask
+
+    # Count events of each team, and of both teams, whilst each player is on the pitch
+    event_times = events_df['expandedMinute'].astype(float).to_numpy()
+    time_on = players_df['time_on'].astype(float).to_numpy()
+    time_off = players_df['time_off'].astype(float).to_numpy()
+    team_counts = ic.count_events_in_intervals(event_teams, event_times, player_teams, time_on, time_off, event_masks)
+    match_counts = ic.count_events_in_intervals(event_matches, event_times, player_matches, time_on, time_off,
+                                                event_masks)
+
+    # Add counts to player data
+    for idx, spec in enumerate(event_specs):
+        if spec['event_team'] == 'own':
+            col_name = spec.get('column', 'team_' + spec['event_name'].lower())
+            players_df_out[col_name] = team_counts[idx]
+        else:
+            col_name = spec.get('column', 'opp_' + spec['event_name'].lower())
+            players_df_out[col_name] = match_counts[idx] - team_counts[idx]
 
     return players_df_out
 
@@ -326,7 +350,10 @@ def create_player_list(lineups, additional_cols=None, pass_extra=None):
         pandas.DataFrame: players that feature in one or more lineup entries, including most popular position played
     """    
 
-    # Resolve data integrity issues
+    # Resolve data integrity issues on a copy, leaving the caller's dataframe (and its compact dtypes) unchanged. Names
+    # are held as objects, as categorical player names cannot be reassigned
+    lineups = lineups.copy()
+    lineups['name'] = lineups['name'].astype(object)
     lineups.loc[lineups['name'] == 'Vitalii Mykolenko', 'name'] = 'Vitaliy Mykolenko'
     lineups.loc[lineups['name'] == 'Alexander Iwobi', 'name'] = 'Alex Iwobi'
     lineups.loc[lineups['name'] == 'Robert Brady', 'name'] = 'Robbie Brady'
@@ -339,18 +366,18 @@ def create_player_list(lineups, additional_cols=None, pass_extra=None):
 
     # Calculate total playing minutes for each player and add to dataframe
     if additional_cols is None:
-        included_cols = lineups.groupby(['name', 'position', 'team'], axis=0).sum(numeric_only=True)['mins_played']
+        included_cols = lineups.groupby(['name', 'position', 'team'], observed=True).sum(numeric_only=True)['mins_played']
     else:
-        included_cols = lineups.groupby(['name', 'position', 'team'], axis=0).sum(numeric_only=True)[['mins_played']
+        included_cols = lineups.groupby(['name', 'position', 'team'], observed=True).sum(numeric_only=True)[['mins_played']
                                                                                                      + additional_cols]
 
     playerinfo_df = playerinfo_df.merge(included_cols, left_on=['name', 'position', 'team'], right_index=True)
     
     # Sum minutes played in each position
-    playerinfo_df['tot_mins_played'] = playerinfo_df.groupby(['name', 'team'])['mins_played'].transform('sum')
+    playerinfo_df['tot_mins_played'] = playerinfo_df.groupby(['name', 'team'], observed=True)['mins_played'].transform('sum')
     if additional_cols is not None:
         for col in additional_cols:
-            playerinfo_df['tot_' + col] = playerinfo_df.groupby(['name', 'team'])[col].transform('sum')
+            playerinfo_df['tot_' + col] = playerinfo_df.groupby(['name', 'team'], observed=True)[col].transform('sum')
 
     # Order player entries by minutes played, ensuring most popular position is at the top.
     playerinfo_df.sort_values('mins_played', ascending=False, inplace=True)
@@ -406,14 +433,14 @@ def group_player_events(events, player_data, group_type='count', agg_columns=Non
 
     # Perform aggregation based on grouping type input
     if group_type == 'count':
-        grouped_events = events.groupby('playerId', axis=0).count()
+        grouped_events = events.groupby('playerId').count()
         selected_events = grouped_events[agg_columns].copy()
         selected_events.loc[:, col_names] = grouped_events['match_id']
     elif group_type == 'sum':
-        grouped_events = events.groupby('playerId', axis=0).sum(numeric_only=True)
+        grouped_events = events.groupby('playerId').sum(numeric_only=True)
         selected_events = grouped_events[agg_columns].copy()
     elif group_type == 'mean':
-        grouped_events = events.groupby('playerId', axis=0).mean(numeric_only=True)
+        grouped_events = events.groupby('playerId').mean(numeric_only=True)
         selected_events = grouped_events[agg_columns].copy()
     else:
         selected_events = pd.DataFrame()
@@ -432,3 +459,256 @@ def group_player_events(events, player_data, group_type='count', agg_columns=Non
     return player_data_out
 
 
+def aggregate_players(events, player_data, metrics, per_90=False, per_100=None):
+    """ Aggregate several event metrics per player in a single pass, and add to player information dataframe
+
+    Function to compute a set of per-player metrics from whoscored-style event data, with one groupby over the events
+    and one merge into the player information dataframe, rather than one group_player_events call per metric. Each
+    metric is specified by name, as a tuple of:
+
+    - (mask, 'count'): number of events selected by mask.
+    - (column, agg): aggregation of an event column over all events, where agg is 'sum' or 'mean'.
+    - (mask, column, agg): aggregation of an event column over the events selected by mask.
+
+    Masks can be a boolean series or array the same length as events (e.g. events['eventType'] == 'Pass'), a function
+    that takes events and returns such a mask, or None to select all events. Players without selected events are
+    given zero counts and sums, and missing means. Count and sum metrics can also be normalised per 90 minutes played
+    (added as '<metric>_90') and per 100 actions of a team action column within player_data, such as team_pass from
+    events_while_playing (added as '<metric>_100_<column>').
+
+    Args:
+        events (pandas.DataFrame): whoscored-style dataframe of event data. Events can be from multiple matches.
+        player_data (pandas.DataFrame): whoscored-style dataframe of player information, with playerId as a column or
+                                        index level, and mins_played if normalising per 90.
+        metrics (dict): metric specifications, keyed by output column name, e.g. {'prog_passes': (prog_mask, 'count'),
+                        'pass_xt': (pass_mask, 'xThreat', 'sum')}.
+        per_90 (bool, optional): selection of whether to add per 90 minute normalised metrics. False by default.
+        per_100 (str or list, optional): team action column(s) within player_data to normalise metrics per 100
+                                         actions of. None by default.
+
+    Returns:
+        pandas.DataFrame: whoscored-style dataframe of player information, including aggregated metrics.
+    """
+
+    # Specify per_100 as list if not assigned
+    if per_100 is None:
+        per_100 = list()
+    elif isinstance(per_100, str):
+        per_100 = [per_100]
+
+    # Evaluate each metric on the events once, as a column of values to aggregate (NaN for unselected events)
+    metric_values = {}
+    metric_aggs = {}
+    for name, spec in metrics.items():
+        if len(spec) == 2 and isinstance(spec[0], str):
+            mask, column, agg = None, spec[0], spec[1]
+        elif len(spec) == 2:
+            mask, column, agg = spec[0], None, spec[1]
+        else:
+            mask, column, agg = spec
+
+        if callable(mask):
+            mask = mask(events)
+        mask = np.ones(len(events), dtype=bool) if mask is None else \
+            pd.Series(mask).to_numpy(dtype=bool, na_value=False)
+
+        if agg == 'count':
+            metric_values[name] = mask.astype(float)
+            metric_aggs[name] = 'sum'
+        else:
+            metric_values[name] = np.where(mask, events[column].astype(float).to_numpy(), np.nan)
+            metric_aggs[name] = agg
+
+    # Aggregate all metrics per player in one groupby, applying each aggregation to all of its metrics at once
+    grouped_values = pd.DataFrame(metric_values).groupby(events['playerId'].to_numpy())
+    player_metrics = pd.concat([grouped_values[[name for name in metric_aggs if metric_aggs[name] == agg]].agg(agg)
+                                for agg in pd.unique(pd.Series(list(metric_aggs.values())))], axis=1)[list(metrics)]
+    count_sum_metrics = [name for name, agg in metric_aggs.items() if agg == 'sum']
+
+    # Merge into player information dataframe
+    player_data_out = player_data.drop(columns=[name for name in metrics if name in player_data.columns])
+    player_data_out = player_data_out.merge(player_metrics, left_on='playerId', right_index=True, how='left')
+    player_data_out[count_sum_metrics] = player_data_out[count_sum_metrics].fillna(0)
+
+    # Normalise count and sum metrics per 90 minutes and per 100 team actions
+    normalised_metrics = {}
+    for name in count_sum_metrics:
+        if per_90:
+            normalised_metrics[f"{name}_90"] = 90 * player_data_out[name] / player_data_out['mins_played']
+        for col in per_100:
+            normalised_metrics[f"{name}_100_{col}"] = 100 * player_data_out[name] / player_data_out[col]
+
+    return player_data_out.assign(**normalised_metrics)
+
+
+def _satisfied_bit_columns(n_words=SATISFIED_EVENTS_WORDS):
+    """ Get names of the bitmask columns used to encode satisfiedEventsTypes."""
+
+    return [f"satisfied_bits_{word}" for word in np.arange(n_words)]
+
+
+def _satisfied_event_bits(events_df):
+    """ Get array of satisfiedEventsTypes bitmasks, encoding on the fly if events have not already been encoded."""
+
+    # Encode if not already done, or if events have since been added without encoding (e.g. carries)
+    bit_cols = _satisfied_bit_columns()
+    if not set(bit_cols).issubset(events_df.columns) or any(events_df[bit_cols].dtypes != np.uint64):
+        events_df = encode_satisfied_events(events_df)
+
+    return events_df[bit_cols].to_numpy(dtype=np.uint64)
+
+
+def _query_bits(event_type_ids):
+    """ Convert a list of satisfied event type ids to a bitmask query."""
+
+    query = np.zeros(SATISFIED_EVENTS_WORDS, dtype=np.uint64)
+    for event_type_id in np.atleast_1d(event_type_ids).astype(np.int64):
+        query[event_type_id // 64] |= np.uint64(1) << np.uint64(event_type_id % 64)
+
+    return query
+
+
+def encode_satisfied_events(events_df):
+    """ Encode satisfiedEventsTypes lists as packed bitmask columns.
+
+    Function to encode the satisfiedEventsTypes list of each WhoScored event as a fixed-width bitmask, stored across a
+    number of uint64 columns ('satisfied_bits_0', 'satisfied_bits_1', etc.). Once encoded, satisfied event type
+    membership queries (has_any and has_all) are evaluated as vectorised bit operations rather than per event.
+
+    Args:
+        events_df (pandas.DataFrame): WhoScored-style dataframe of event data. Events can be from multiple matches.
+
+    Returns:
+        pandas.DataFrame: WhoScored-style event dataframe with additional satisfied event bitmask columns.
+    """
+
+    # Initialise output dataframe and bitmask array
+    events_out = events_df.copy()
+    bits = np.zeros((len(events_out), SATISFIED_EVENTS_WORDS), dtype=np.uint64)
+
+    # Flatten event type lists alongside the position of the event that each belongs to
+    type_lists = [x if isinstance(x, list) else [] for x in events_out['satisfiedEventsTypes']]
+    rows = np.repeat(np.arange(len(type_lists)), [len(x) for x in type_lists])
+    type_ids = np.fromiter(chain.from_iterable(type_lists), dtype=np.int64, count=len(rows))
+
+    # Set bit corresponding to each event type
+    np.bitwise_or.at(bits, (rows, type_ids // 64), np.left_shift(np.uint64(1), (type_ids % 64).astype(np.uint64)))
+    events_out[_satisfied_bit_columns()] = bits
+
+    return events_out
+
+
+def has_any(events_df, event_type_ids):
+    """ Identify events that satisfy any of a list of WhoScored satisfied event types.
+
+    Function to return a boolean mask of events that satisfy at least one of the satisfied event type ids passed, for
+    example has_any(events_df, [31, 34, 212]) is equivalent to checking 31 in x or 34 in x or 212 in x for each event.
+    Events are encoded using encode_satisfied_events if this has not already been done.
+
+    Args:
+        events_df (pandas.DataFrame): WhoScored-style dataframe of event data. Events can be from multiple matches.
+        event_type_ids (int or list): WhoScored satisfied event type id(s).
+
+    Returns:
+        pandas.Series: boolean mask, True if event satisfies any of the event types.
+    """
+
+    bits = _satisfied_event_bits(events_df)
+    mask = (bits & _query_bits(event_type_ids)).any(axis=1)
+
+    return pd.Series(mask, index=events_df.index)
+
+
+def has_all(events_df, event_type_ids):
+    """ Identify events that satisfy all of a list of WhoScored satisfied event types.
+
+    Function to return a boolean mask of events that satisfy every one of the satisfied event type ids passed. Events
+    are encoded using encode_satisfied_events if this has not already been done.
+
+    Args:
+        events_df (pandas.DataFrame): WhoScored-style dataframe of event data. Events can be from multiple matches.
+        event_type_ids (int or list): WhoScored satisfied event type id(s).
+
+    Returns:
+        pandas.Series: boolean mask, True if event satisfies all of the event types.
+    """
+
+    bits = _satisfied_event_bits(events_df)
+    query = _query_bits(event_type_ids)
+    mask = ((bits & query) == query).all(axis=1)
+
+    return pd.Series(mask, index=events_df.index)
+
+
+def explode_qualifiers(events_df, drop_qualifiers=False):
+    """ Build a long-format table of WhoScored event qualifiers.
+
+    Function to explode the qualifiers list of each WhoScored event into a compact long-format table, with one row per
+    event qualifier. Each row holds the key of the event that the qualifier belongs to (match_id, teamId and eventId),
+    the qualifier id, the qualifier name and the qualifier value (if it has one). The table is sorted and indexed on
+    qualifier id, so that qualifier lookups (see has_qualifier) are vectorised rather than searching the list of each
+    event. As events are identified by key rather than position, the table remains valid if events are filtered,
+    reordered or re-indexed (e.g. after inserting carries). The raw qualifiers column can be dropped from the events
+    dataframe to save memory.
+
+    Args:
+        events_df (pandas.DataFrame): WhoScored-style dataframe of event data.
+        drop_qualifiers (bool, optional): selection of whether to drop qualifiers column from events. False by default.
+
+    Returns:
+        pandas.DataFrame: WhoScored-style event dataframe, with qualifiers column dropped if selected.
+        pandas.DataFrame: qualifier table with 'match_id', 'teamId', 'eventId', 'qualifier_name' and 'value' columns,
+        indexed on 'qualifier_id'.
+    """
+
+    # Flatten qualifier lists alongside the position of the event that each belongs to (carries hold a single dict)
+    qualifier_lists = [x if isinstance(x, list) else ([x] if isinstance(x, dict) else [])
+                       for x in events_df['qualifiers']]
+    event_pos = np.repeat(np.arange(len(events_df)), [len(x) for x in qualifier_lists])
+    qualifiers = list(chain.from_iterable(qualifier_lists))
+
+    # Build compact qualifier table, keyed on event
+    qualifiers_df = events_df[QUALIFIER_EVENT_KEY].iloc[event_pos].reset_index(drop=True)
+    qualifiers_df['qualifier_id'] = np.fromiter((q['type']['value'] for q in qualifiers), dtype=np.int16,
+                                                count=len(qualifiers))
+    qualifiers_df['qualifier_name'] = pd.Categorical([q['type']['displayName'] for q in qualifiers])
+    qualifiers_df['value'] = pd.Categorical([q.get('value', np.nan) for q in qualifiers])
+    qualifiers_df = qualifiers_df.sort_values(['qualifier_id'] + QUALIFIER_EVENT_KEY,
+                                              kind='stable').set_index('qualifier_id')
+
+    # Drop raw qualifiers from events if selected
+    events_out = events_df.drop(columns='qualifiers') if drop_qualifiers else events_df
+
+    return events_out, qualifiers_df
+
+
+def has_qualifier(events_df, qualifiers_df, qualifier_ids, value=None):
+    """ Identify events that carry any of a list of WhoScored qualifiers.
+
+    Function to return a boolean mask of events that carry at least one of the qualifier ids passed, using a qualifier
+    table built with explode_qualifiers. Events are matched to the qualifier table on match_id, teamId and eventId, so
+    events_df can be any selection of the events used to build the table, with any index. A qualifier value can
+    optionally be passed, in which case only qualifiers with this value are considered.
+
+    Args:
+        events_df (pandas.DataFrame): WhoScored-style dataframe of event data.
+        qualifiers_df (pandas.DataFrame): qualifier table, built using explode_qualifiers.
+        qualifier_ids (int or list): WhoScored qualifier id(s), e.g. 286 for offensive aerials.
+        value (str, optional): qualifier value to match. Any value by default.
+
+    Returns:
+        pandas.Series: boolean mask, True if event carries any of the qualifiers.
+    """
+
+    # Look up qualifiers using qualifier id index
+    qualifier_ids = [qualifier_id for qualifier_id in np.atleast_1d(qualifier_ids) if qualifier_id in qualifiers_df.index]
+    matched_qualifiers = qualifiers_df.loc[qualifier_ids]
+    if value is not None:
+        matched_qualifiers = matched_qualifiers[matched_qualifiers['value'] == value]
+
+    # Match events to qualifiers on event key (converted to float, so that compact and standard dtypes are comparable)
+    event_keys = pd.MultiIndex.from_arrays([events_df[col].astype('float64') for col in QUALIFIER_EVENT_KEY])
+    matched_keys = pd.MultiIndex.from_arrays([matched_qualifiers[col].astype('float64')
+                                              for col in QUALIFIER_EVENT_KEY])
+
+    return pd.Series(event_keys.isin(matched_keys), index=events_df.index)
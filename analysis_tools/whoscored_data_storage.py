@@ -0,0 +1,960 @@
+"""Module containing functions to store and load WhoScored-style data as a partitioned columnar dataset
+
+Functions
+---------
+season_folder(year):
+    Get the name of the season folder used within the data directory for a given start year.
+
+convert_whoscored_season(league, year, data_folder="../../data_directory/whoscored_data",
+                         store_folder="../../data_directory/whoscored_store", overwrite=False):
+    Convert a season of WhoScored-style compressed match files into the partitioned columnar season store.
+
+load_season(league, years, columns=None, filters=None, match_teams=None, encode_satisfied=True,
+            qualifier_table=False, compact_dtypes=True, store_folder="../../data_directory/whoscored_store", data_folder="../../data_directory/whoscored_data"):
+    Load one or more seasons of WhoScored-style event and player data from the columnar season store.
+
+load_season_files(league, years, columns=None, filters=None, match_teams=None, encode_satisfied=True,
+                  qualifier_table=False, compact_dtypes=True, data_folder="../../data_directory/whoscored_data",
+                  max_workers=None, use_processes=False):
+    Load one or more seasons of WhoScored-style compressed match files in parallel.
+
+update_match_catalogue(league, year, data_folder="../../data_directory/whoscored_data"):
+    Build or update the persisted catalogue of WhoScored matches for a league and season.
+
+find_matches(leagues, years, teams=None, match_ids=None, data_folder="../../data_directory/whoscored_data"):
+    Find WhoScored matches from the persisted match catalogue, without scanning the data directory.
+
+ingest_matches(league, year, match_ids=None, data_folder="../../data_directory/whoscored_data",
+               store_folder="../../data_directory/whoscored_store"):
+    Append new or changed WhoScored matches to the columnar season store, and update the match catalogue.
+
+stale_matches(artefact, league, year, store_folder="../../data_directory/whoscored_store"):
+    Get the matches ingested into the store since a derived artefact was last refreshed.
+
+mark_artefact_refreshed(artefact, league, year, match_ids=None, store_folder="../../data_directory/whoscored_store"):
+    Record that a derived artefact has been refreshed with ingested matches.
+
+Classes
+---------
+SeasonDataset(league, years, columns=None, filters=None, encode_satisfied=True, compact_dtypes=True,
+              match_transform=None, cache_size=64, data_folder="../../data_directory/whoscored_data"):
+    Lazily loaded WhoScored-style match data for one or more seasons, with a bounded cache of decoded matches.
+"""
+
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import repeat
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import analysis_tools.data_codecs as dcd
+import analysis_tools.data_schema as dsc
+import analysis_tools.team_registry as tr
+import analysis_tools.whoscored_data_engineering as wde
+
+
+# Partition keys used throughout the store (league / season / match)
+PARTITION_SCHEMA = pa.schema([('league', pa.string()), ('season', pa.string()), ('match_id', pa.int64())])
+
+# Arrow types of all-null columns declared in data_schema, so that matches missing a value are stored consistently
+DECLARED_ARROW_TYPES = {'category': pa.string(), 'float32': pa.float32(), 'Int8': pa.int8(), 'Int16': pa.int16(),
+                        'Int32': pa.int32()}
+
+# Name of match catalogue file, stored at top level of WhoScored data directory
+CATALOGUE_FILE = 'match-catalogue.parquet'
+
+# Names of ingestion and derived artefact logs, stored at top level of season store
+INGEST_LOG_FILE = '_ingest_log.json'
+ARTEFACT_LOG_FILE = '_artefact_log.json'
+
+# Columns identifying a unique event or player entry within the store
+EVENT_KEY = ['match_id', 'teamId', 'eventId']
+PLAYER_KEY = ['match_id', 'playerId']
+
+
+def season_folder(year):
+    """ Get the name of the season folder used within the data directory for a given start year.
+
+    Args:
+        year (str or int): start year of season, e.g. '2022'.
+
+    Returns:
+        str: season folder name, e.g. '2022_23'.
+    """
+
+    return f"{int(year)}_{str(int(year) + 1)[-2:]}"
+
+
+def _encode_nested_columns(df):
+    """ Serialise list and dict valued columns to json strings so that they can be stored in columnar format."""
+
+    df_out = df.copy()
+    nested_cols = []
+    for col in df_out.columns[df_out.dtypes == object]:
+        non_null = df_out[col].dropna()
+        if len(non_null) and isinstance(non_null.iloc[0], (list, dict)):
+            df_out[col] = [json.dumps(x) if isinstance(x, (list, dict)) else None for x in df_out[col]]
+            nested_cols.append(col)
+
+    return df_out, nested_cols
+
+
+def _decode_nested_columns(df, nested_cols):
+    """ Restore json string columns to list and dict values, and restore missing values to nan."""
+
+    for col in df.columns:
+        if col in nested_cols:
+            df[col] = pd.Series([json.loads(x) if isinstance(x, str) else np.nan for x in df[col]], index=df.index,
+                                dtype=object)
+        elif df[col].dtype == object:
+            df[col] = df[col].where(df[col].notna(), np.nan)
+
+    return df
+
+
+def _partition_table(df_out):
+    """ Convert an encoded match dataframe to an arrow table, casting all-null columns to their declared type."""
+
+    declared_types = {**dsc.WHOSCORED_PLAYER_SCHEMA, **dsc.WHOSCORED_EVENT_SCHEMA}
+    table = pa.Table.from_pandas(df_out, preserve_index=False)
+
+    # All-null columns are typed from data_schema where declared, and otherwise left untyped (null), so that they can
+    # be combined with the same column of any type in other matches
+    for i, (field, column) in enumerate(zip(table.schema, table.columns)):
+        if len(column) and column.null_count == len(column):
+            null_type = DECLARED_ARROW_TYPES.get(declared_types.get(field.name), pa.null())
+            table = table.set_column(i, field.with_type(null_type), pa.nulls(len(column), null_type))
+
+    return table
+
+
+def _write_partition(df, base_folder, league, season):
+    """ Write a single match dataframe to the store, partitioned by league, season and match."""
+
+    df_out, nested_cols = _encode_nested_columns(df.reset_index(drop=True))
+    df_out['league'] = league
+    df_out['season'] = season
+    df_out['match_id'] = df_out['match_id'].astype('int64')
+
+    table = _partition_table(df_out)
+    ds.write_dataset(table, base_folder, format='parquet',
+                     partitioning=ds.partitioning(PARTITION_SCHEMA, flavor='hive'),
+                     basename_template='part-{i}.parquet', existing_data_behavior='delete_matching')
+
+    # Keep record of json encoded columns (files prefixed with underscore are ignored by the dataset reader)
+    nested_cols_path = f"{base_folder}/_nested_columns.json"
+    if os.path.isfile(nested_cols_path):
+        with open(nested_cols_path) as f:
+            nested_cols = sorted(set(nested_cols) | set(json.load(f)))
+    with open(nested_cols_path, 'w') as f:
+        json.dump(sorted(nested_cols), f)
+
+    # Keep record of the schema of all matches, unified with this match, in original column order
+    schema = table.schema.remove_metadata()
+    schema_path = f"{base_folder}/_schema.arrow"
+    if os.path.isfile(schema_path):
+        schema = pa.unify_schemas([_load_schema(schema_path), schema], promote_options='permissive')
+    with open(f"{schema_path}.tmp", 'wb') as f:
+        f.write(schema.serialize())
+    os.replace(f"{schema_path}.tmp", schema_path)
+
+    return nested_cols
+
+
+def _load_schema(schema_path):
+    """ Load an arrow schema saved with _write_partition."""
+
+    with open(schema_path, 'rb') as f:
+        return pa.ipc.read_schema(pa.py_buffer(f.read()))
+
+
+def _team_mask(team_names, teams):
+    """ Identify entries of any of the teams passed, comparing registry names so that any alias of a team matches."""
+
+    teams = [teams] if isinstance(teams, str) else list(teams)
+    registry_teams = {tr.canonical_team_name(team) for team in teams}
+
+    return tr.normalise_team_names(pd.Series(team_names)).isin(registry_teams).to_numpy()
+
+
+def _resolve_team_filter(filters, players_df):
+    """ Replace a 'team' filter (team names) with the equivalent 'teamId' filter, using player data."""
+
+    if filters is None or 'team' not in filters:
+        return filters
+
+    filters_out = dict(filters)
+    teams = filters_out.pop('team')
+    team_ids = players_df.loc[_team_mask(players_df['team'], teams), 'teamId'].unique().tolist()
+    filters_out['teamId'] = team_ids
+
+    return filters_out
+
+
+def _apply_filters(events_df, filters=None, columns=None):
+    """ Apply a dictionary of column filters and a column projection to a WhoScored-style event dataframe."""
+
+    if filters is not None:
+        mask = np.ones(len(events_df), dtype=bool)
+        for col, value in filters.items():
+            if isinstance(value, (list, tuple, set, np.ndarray, pd.Series)):
+                mask &= events_df[col].isin(list(value)).values
+            else:
+                mask &= (events_df[col] == value).values
+        events_df = events_df[mask]
+
+    if columns is not None:
+        events_df = events_df[list(dict.fromkeys(list(columns) + ['match_id']))]
+
+    return events_df
+
+
+def _build_filter(league, seasons, filters):
+    """ Build a pyarrow filter expression from league, season and a dictionary of column filters."""
+
+    expression = (ds.field('league') == league) & (ds.field('season').isin(seasons))
+    if filters is not None:
+        for col, value in filters.items():
+            if isinstance(value, (list, tuple, set, np.ndarray, pd.Series)):
+                expression = expression & ds.field(col).isin(list(value))
+            else:
+                expression = expression & (ds.field(col) == value)
+
+    return expression
+
+
+def _read_partitions(base_folder, expression, columns=None):
+    """ Read all partitions that satisfy the filter expression in a single pass, returning a dataframe."""
+
+    partitioning = ds.partitioning(PARTITION_SCHEMA, flavor='hive')
+    with open(f"{base_folder}/_nested_columns.json") as f:
+        nested_cols = json.load(f)
+
+    # Read all matches against the unified schema, so that columns missing from some matches are read as null. Stores
+    # written before the schema was recorded are unified over the schemas of all match files
+    schema_path = f"{base_folder}/_schema.arrow"
+    if os.path.isfile(schema_path):
+        schema = _load_schema(schema_path)
+    else:
+        dataset = ds.dataset(base_folder, format='parquet', partitioning=partitioning)
+        schema = pa.unify_schemas([fragment.physical_schema for fragment in dataset.get_fragments()] +
+                                  [PARTITION_SCHEMA], promote_options='permissive')
+    dataset = ds.dataset(base_folder, format='parquet', partitioning=partitioning, schema=schema)
+
+    table = dataset.to_table(columns=columns, filter=expression)
+    df = table.to_pandas()
+
+    return _decode_nested_columns(df, nested_cols)
+
+
+def convert_whoscored_season(league, year, data_folder="../../data_directory/whoscored_data",
+                             store_folder="../../data_directory/whoscored_store", overwrite=False):
+    """ Convert a season of WhoScored-style compressed match files into the partitioned columnar season store.
+
+    Function to read every match-eventdata and match-playerdata file within a league/season folder of the WhoScored
+    data directory, and write each match to a parquet dataset partitioned by league, season and match. List and dict
+    valued columns (e.g. qualifiers, satisfiedEventsTypes) are stored as json strings. Matches that already exist in
+    the store are skipped unless overwrite is selected.
+
+    Args:
+        league (str): league folder to convert, e.g. 'EPL'.
+        year (str): start year of season to convert, e.g. '2022'.
+        data_folder (str, optional): location of WhoScored data, relative to script in which function is called.
+        store_folder (str, optional): location of columnar season store, relative to script in which function is called.
+        overwrite (bool, optional): selection of whether to overwrite matches that already exist in store. False by default.
+
+    Returns:
+        list: match ids written to the store.
+    """
+
+    # Initialise output
+    season = season_folder(year)
+    file_path = f"{data_folder}/{season}/{league}"
+    matches_written = []
+
+    # Determine matches already in store
+    existing_matches = set()
+    existing_folder = f"{store_folder}/events/league={league}/season={season}"
+    if os.path.isdir(existing_folder) and not overwrite:
+        existing_matches = {int(folder.split('=')[1]) for folder in os.listdir(existing_folder)}
+
+    # Convert each match event file, and corresponding player file
+    for file in sorted(os.listdir(file_path)):
+        if '-eventdata-' in file:
+            match_id = int(file.split('-')[2])
+            if match_id in existing_matches:
+                continue
+
+            match_events = dcd.load_object(f"{file_path}/{file}")
+            match_players = dcd.load_object(f"{file_path}/{file.replace('-eventdata-', '-playerdata-')}")
+
+            _write_partition(match_events, f"{store_folder}/events", league, season)
+            _write_partition(match_players, f"{store_folder}/players", league, season)
+            matches_written.append(match_id)
+
+    return matches_written
+
+
+def load_season(league, years, columns=None, filters=None, match_teams=None, encode_satisfied=True,
+                qualifier_table=False, compact_dtypes=True, store_folder="../../data_directory/whoscored_store", data_folder="../../data_directory/whoscored_data"):
+    """ Load one or more seasons of WhoScored-style event and player data from the columnar season store.
+
+    Function to read WhoScored-style event and player data for a league over one or more seasons from the partitioned
+    columnar season store, in a single pass. A column projection and row filters can be passed, which are applied
+    within the parquet reader so that only the required data is materialised. Filters are defined as a dictionary of
+    column names and values (single value or list of values), for example {'eventType': ['Pass', 'Carry'],
+    'outcomeType': 'Successful'}. A 'team' filter of team names may also be passed, which is converted to team ids
+    using player data. Filters on the match_id column are also applied to player data. Matches involving specific teams
+    can be selected using match_teams, which are resolved using the match catalogue where it exists. Team names are
+    compared by their team registry name, so any registered alias of a team can be used (e.g. 'Man City').
+
+    Args:
+        league (str): league to load, e.g. 'EPL'.
+        years (str or list): start year(s) of seasons to load, e.g. ['2021', '2022'].
+        columns (list, optional): event data columns to load. All columns are loaded by default.
+        filters (dict, optional): dictionary of event data column filters. None by default.
+        match_teams (str or list, optional): only load matches involving these team(s). All matches by default.
+        encode_satisfied (bool, optional): selection of whether to encode satisfiedEventsTypes as bitmask columns, for
+                                           use with has_any and has_all. True by default.
+        qualifier_table (bool, optional): selection of whether to explode qualifiers into a qualifier table (replacing
+                                          the qualifiers column), for use with has_qualifier. False by default.
+        compact_dtypes (bool, optional): selection of whether to convert event and player data to the compact dtypes
+                                         defined in data_schema (categorical strings, nullable integer ids and
+                                         float32 coordinates). True by default.
+        store_folder (str, optional): location of columnar season store, relative to script in which function is called.
+        data_folder (str, optional): location of WhoScored data (and match catalogue), relative to calling script.
+
+    Returns:
+        pandas.DataFrame: WhoScored-style event dataframe, containing events from all selected seasons.
+        pandas.DataFrame: WhoScored-style player dataframe, containing players from all selected seasons.
+        pandas.DataFrame: qualifier table, indexed on qualifier id. Only returned if qualifier_table is selected.
+    """
+
+    if isinstance(years, (str, int)):
+        years = [years]
+    seasons = [season_folder(year) for year in years]
+
+    # Ensure partition columns are always returned
+    if columns is not None:
+        columns = list(dict.fromkeys(list(columns) + ['match_id']))
+
+    # Select matches involving teams, using match catalogue where available (otherwise using stored player data)
+    if match_teams is not None:
+        team_matches = _select_matches(load_match_catalogue(data_folder), [league], seasons, teams=match_teams)
+        if len(team_matches):
+            team_match_ids = team_matches['match_id'].tolist()
+        else:
+            team_players = _read_partitions(f"{store_folder}/players", _build_filter(league, seasons, None),
+                                            ['team', 'match_id'])
+            team_match_ids = team_players.loc[_team_mask(team_players['team'], match_teams),
+                                              'match_id'].unique().tolist()
+        if filters is not None and 'match_id' in filters:
+            existing_ids = [filters['match_id']] if np.isscalar(filters['match_id']) else filters['match_id']
+            team_match_ids = [match_id for match_id in team_match_ids if match_id in set(existing_ids)]
+        filters = {**(filters or {}), 'match_id': team_match_ids}
+
+    # Load players, and use to convert team names to team ids
+    player_filters = {'match_id': filters['match_id']} if filters is not None and 'match_id' in filters else None
+    players_df = _read_partitions(f"{store_folder}/players", _build_filter(league, seasons, player_filters))
+    filters = _resolve_team_filter(filters, players_df)
+
+    # Load events, applying filters within the reader
+    events_df = _read_partitions(f"{store_folder}/events", _build_filter(league, seasons, filters), columns)
+    if encode_satisfied and 'satisfiedEventsTypes' in events_df.columns:
+        events_df = wde.encode_satisfied_events(events_df)
+
+    # Convert to compact dtypes
+    if compact_dtypes:
+        events_df = dsc.apply_schema(events_df, dsc.WHOSCORED_EVENT_SCHEMA)
+        players_df = dsc.apply_schema(players_df, dsc.WHOSCORED_PLAYER_SCHEMA)
+
+    # Explode qualifiers into long-format table if selected
+    if qualifier_table:
+        events_df, qualifiers_df = wde.explode_qualifiers(events_df, drop_qualifiers=True)
+        return events_df, players_df, qualifiers_df
+
+    return events_df, players_df
+
+
+def _load_match_files(event_file, player_file, columns=None, filters=None, encode_satisfied=False,
+                      qualifier_table=False, compact_dtypes=False):
+    """ Decompress and unpickle the event and player files of a single match, and filter events before returning."""
+
+    match_events = dcd.load_object(event_file)
+    match_players = dcd.load_object(player_file)
+
+    match_events = _apply_filters(match_events, _resolve_team_filter(filters, match_players), columns)
+    if encode_satisfied and 'satisfiedEventsTypes' in match_events.columns:
+        match_events = wde.encode_satisfied_events(match_events)
+    if compact_dtypes:
+        match_events = dsc.apply_schema(match_events, dsc.WHOSCORED_EVENT_SCHEMA)
+        match_players = dsc.apply_schema(match_players, dsc.WHOSCORED_PLAYER_SCHEMA)
+
+    # Explode qualifiers into long-format table, keyed on event
+    match_qualifiers = None
+    if qualifier_table and 'qualifiers' in match_events.columns:
+        match_events, match_qualifiers = wde.explode_qualifiers(match_events, drop_qualifiers=True)
+
+    return match_events, match_players, match_qualifiers
+
+
+def load_season_files(league, years, columns=None, filters=None, match_teams=None, encode_satisfied=True,
+                      qualifier_table=False, compact_dtypes=True, data_folder="../../data_directory/whoscored_data",
+                      max_workers=None, use_processes=False):
+    """ Load one or more seasons of WhoScored-style compressed match files in parallel.
+
+    Function to decompress and unpickle all match-eventdata and match-playerdata files within the league/season
+    folders of the WhoScored data directory. By default, matches are loaded in parallel across a pool of threads, which
+    is safe to use from `# %%` cell scripts (bz2 decompression releases the GIL, so threads decompress files in
+    parallel). A pool of processes can be used instead with use_processes, which also parallelises unpickling and
+    dtype conversion. Worker processes re-import the calling script on platforms that start processes by spawning
+    (Windows and macOS), so process mode must only be used from code within an `if __name__ == '__main__':` guard. The
+    event and player dataframes are concatenated once all matches have been loaded. The event-types and
+    formation-mapping objects are also returned (taken from the last season passed). A column projection and row
+    filters (defined in the same way as load_season) can be passed, which are applied to each match before
+    concatenation. Matches are selected using the match catalogue where it exists, so match files are not read at all
+    if they are excluded by a match_id filter or do not involve any of the teams passed as match_teams.
+
+    Args:
+        league (str): league folder to load, e.g. 'EPL'.
+        years (str or list): start year(s) of seasons to load, e.g. ['2021', '2022'].
+        columns (list, optional): event data columns to load. All columns are loaded by default.
+        filters (dict, optional): dictionary of event data column filters. None by default.
+        match_teams (str or list, optional): only load matches involving these team(s). All matches by default.
+        encode_satisfied (bool, optional): selection of whether to encode satisfiedEventsTypes as bitmask columns, for
+                                           use with has_any and has_all. True by default.
+        qualifier_table (bool, optional): selection of whether to explode qualifiers into a qualifier table (replacing
+                                          the qualifiers column), for use with has_qualifier. False by default.
+        compact_dtypes (bool, optional): selection of whether to convert event and player data to the compact dtypes
+                                         defined in data_schema (categorical strings, nullable integer ids and
+                                         float32 coordinates). True by default.
+        data_folder (str, optional): location of WhoScored data, relative to script in which function is called.
+        max_workers (int, optional): number of threads (or processes) used to load files. 1 loads files serially within
+                                     the calling thread. Defaults to the executor's default worker count.
+        use_processes (bool, optional): selection of whether to load files across a pool of processes rather than
+                                        threads. Requires an `if __name__ == '__main__':` guard. False by default.
+
+    Returns:
+        pandas.DataFrame: WhoScored-style event dataframe, containing events from all selected seasons.
+        pandas.DataFrame: WhoScored-style player dataframe, containing players from all selected seasons.
+        dict: WhoScored event-types mapping.
+        dict: WhoScored formation-mapping.
+        pandas.DataFrame: qualifier table, indexed on qualifier id. Only returned if qualifier_table is selected.
+    """
+
+    if isinstance(years, (str, int)):
+        years = [years]
+
+    # Initialise outputs
+    event_files = []
+    player_files = []
+    event_types = None
+    formation_mapping = None
+
+    # Determine matches to load, if filtered by match
+    match_ids = filters['match_id'] if filters is not None and 'match_id' in filters else None
+    catalogue = load_match_catalogue(data_folder)
+
+    # Load mappings, and build list of match files from catalogue (or from data directory if season is not catalogued)
+    for year in years:
+        season = season_folder(year)
+        file_path = f"{data_folder}/{season}/{league}"
+        if os.path.isfile(f"{file_path}/event-types.pbz2"):
+            event_types = dcd.load_object(f"{file_path}/event-types.pbz2")
+        if os.path.isfile(f"{file_path}/formation-mapping.pbz2"):
+            formation_mapping = dcd.load_object(f"{file_path}/formation-mapping.pbz2")
+
+        season_files = _select_matches(catalogue, [league], [season])
+        if len(season_files) == 0:
+            season_files = _list_match_files(league, season, data_folder)
+        season_files = _select_matches(season_files, [league], [season], match_teams, match_ids)
+        event_files += season_files['event_file'].tolist()
+        player_files += season_files['player_file'].tolist()
+
+    # Load match files, in parallel across threads (or processes if selected) unless a single worker is selected
+    match_args = (event_files, player_files, repeat(columns), repeat(filters), repeat(encode_satisfied),
+                  repeat(qualifier_table), repeat(compact_dtypes))
+    if max_workers == 1:
+        match_data = list(map(_load_match_files, *match_args))
+    elif use_processes:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            match_data = list(executor.map(_load_match_files, *match_args,
+                                           chunksize=max(1, len(event_files) // (4 * (max_workers or os.cpu_count())))))
+    else:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            match_data = list(executor.map(_load_match_files, *match_args))
+
+    # Concatenate once all matches are loaded, retaining categorical dtypes across matches
+    if compact_dtypes:
+        events_df = dsc.concat_with_schema([match[0] for match in match_data], dsc.WHOSCORED_EVENT_SCHEMA)
+        players_df = dsc.concat_with_schema([match[1] for match in match_data], dsc.WHOSCORED_PLAYER_SCHEMA)
+    else:
+        events_df = pd.concat([match[0] for match in match_data]) if match_data else pd.DataFrame()
+        players_df = pd.concat([match[1] for match in match_data]) if match_data else pd.DataFrame()
+
+    # Combine qualifier tables
+    if qualifier_table:
+        qualifiers_df = pd.concat([match[2] for match in match_data if match[2] is not None])
+        qualifiers_df = qualifiers_df.sort_values(['qualifier_id'] + wde.QUALIFIER_EVENT_KEY, kind='stable')
+        return events_df, players_df, event_types, formation_mapping, qualifiers_df
+
+    return events_df, players_df, event_types, formation_mapping
+
+
+def _file_checksum(file_path):
+    """ Calculate md5 checksum of a file."""
+
+    md5 = hashlib.md5()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            md5.update(chunk)
+
+    return md5.hexdigest()
+
+
+def _catalogue_entry(event_file, player_file, league, season):
+    """ Build a match catalogue entry from the event and player files of a single match."""
+
+    match_events, match_players, _ = _load_match_files(event_file, player_file)
+    _, _, match_id, home_team, away_team = os.path.basename(event_file).replace('.pbz2', '').split('-', 4)
+
+    # Match team names to team ids, falling back on player order if team names differ from file name
+    team_ids = match_players[['team', 'teamId']].drop_duplicates('team').set_index('team')['teamId']
+    home_team_id = team_ids.get(home_team, match_players['teamId'].iloc[0])
+    away_team_id = team_ids.get(away_team, match_players['teamId'].iloc[-1])
+
+    # Use match date if available within data
+    date_cols = [col for col in ['startDate', 'startTime', 'date'] if col in match_events.columns]
+    match_date = pd.to_datetime(match_events[date_cols[0]].iloc[0]) if date_cols else pd.NaT
+
+    return {'match_id': int(match_id), 'league': league, 'season': season, 'home_team': home_team,
+            'away_team': away_team, 'home_team_id': home_team_id, 'away_team_id': away_team_id, 'date': match_date,
+            'event_file': event_file, 'player_file': player_file, 'event_rows': len(match_events),
+            'player_rows': len(match_players), 'event_checksum': _file_checksum(event_file),
+            'player_checksum': _file_checksum(player_file), 'file_mtime': os.path.getmtime(event_file)}
+
+
+def _list_match_files(league, season, data_folder):
+    """ List match files within a league/season folder, returning a minimal catalogue built from file names."""
+
+    file_path = f"{data_folder}/{season}/{league}"
+    entries = []
+    for file in sorted(os.listdir(file_path)):
+        if '-eventdata-' in file:
+            _, _, match_id, home_team, away_team = file.replace('.pbz2', '').split('-', 4)
+            entries.append({'match_id': int(match_id), 'league': league, 'season': season, 'home_team': home_team,
+                            'away_team': away_team, 'event_file': f"{file_path}/{file}",
+                            'player_file': f"{file_path}/{file.replace('-eventdata-', '-playerdata-')}"})
+
+    return pd.DataFrame(entries, columns=['match_id', 'league', 'season', 'home_team', 'away_team', 'event_file',
+                                          'player_file'])
+
+
+def _select_matches(catalogue, leagues, seasons, teams=None, match_ids=None):
+    """ Select catalogue entries by league, season, teams involved and match id."""
+
+    if len(catalogue) == 0:
+        return catalogue
+
+    mask = catalogue['league'].isin(leagues) & catalogue['season'].isin(seasons)
+    if teams is not None:
+        mask &= _team_mask(catalogue['home_team'], teams) | _team_mask(catalogue['away_team'], teams)
+    if match_ids is not None:
+        match_ids = [match_ids] if np.isscalar(match_ids) else list(match_ids)
+        mask &= catalogue['match_id'].isin([int(match_id) for match_id in match_ids])
+
+    return catalogue[mask].reset_index(drop=True)
+
+
+def load_match_catalogue(data_folder="../../data_directory/whoscored_data"):
+    """ Load the persisted catalogue of WhoScored matches.
+
+    Args:
+        data_folder (str, optional): location of WhoScored data, relative to script in which function is called.
+
+    Returns:
+        pandas.DataFrame: match catalogue, one row per match. Empty if no catalogue exists.
+    """
+
+    catalogue_path = f"{data_folder}/{CATALOGUE_FILE}"
+    if os.path.isfile(catalogue_path):
+        return pd.read_parquet(catalogue_path)
+    else:
+        return pd.DataFrame()
+
+
+def update_match_catalogue(league, year, data_folder="../../data_directory/whoscored_data"):
+    """ Build or update the persisted catalogue of WhoScored matches for a league and season.
+
+    Function to index all matches within a league/season folder of the WhoScored data directory, and persist the index
+    to a catalogue file at the top level of the data directory. Each catalogue entry includes match id, league, season,
+    home and away team names and ids, match date (if available within the data), file paths, row counts and file
+    checksums. Only matches that are new, or whose files have changed since the catalogue was last updated, are read.
+    Entries for files that no longer exist are removed. This function is intended to be called as part of data import.
+
+    Args:
+        league (str): league folder to index, e.g. 'EPL'.
+        year (str): start year of season to index, e.g. '2022'.
+        data_folder (str, optional): location of WhoScored data, relative to script in which function is called.
+
+    Returns:
+        pandas.DataFrame: complete match catalogue, including all leagues and seasons.
+    """
+
+    season = season_folder(year)
+    file_path = f"{data_folder}/{season}/{league}"
+    catalogue = load_match_catalogue(data_folder)
+
+    # Retain existing entries from other leagues/seasons, and entries from this season whose files are unchanged
+    if len(catalogue):
+        season_mask = (catalogue['league'] == league) & (catalogue['season'] == season)
+        season_catalogue = catalogue[season_mask].set_index('event_file')
+        catalogue = catalogue[~season_mask]
+    else:
+        season_catalogue = pd.DataFrame()
+
+    # Index match files, reading only those that are new or modified
+    season_entries = []
+    for file in sorted(os.listdir(file_path)):
+        if '-eventdata-' in file:
+            event_file = f"{file_path}/{file}"
+            player_file = f"{file_path}/{file.replace('-eventdata-', '-playerdata-')}"
+            if event_file in season_catalogue.index and \
+                    season_catalogue.loc[event_file, 'file_mtime'] == os.path.getmtime(event_file):
+                season_entries.append(season_catalogue.loc[event_file].to_dict() | {'event_file': event_file})
+            else:
+                season_entries.append(_catalogue_entry(event_file, player_file, league, season))
+
+    # Save updated catalogue
+    catalogue = pd.concat([catalogue, pd.DataFrame(season_entries)], ignore_index=True)
+    catalogue = catalogue.sort_values(['league', 'season', 'match_id']).reset_index(drop=True)
+    catalogue.to_parquet(f"{data_folder}/{CATALOGUE_FILE}", index=False)
+
+    return catalogue
+
+
+def find_matches(leagues, years, teams=None, match_ids=None, data_folder="../../data_directory/whoscored_data"):
+    """ Find WhoScored matches from the persisted match catalogue, without scanning the data directory.
+
+    Function to select matches from the match catalogue by league, season, team and/or match id. When teams are passed,
+    all matches involving at least one of the teams (home or away) are returned. Teams are compared by their team
+    registry name, so any registered alias of a team can be passed.
+
+    Args:
+        leagues (str or list): league(s) to search, e.g. ['EPL', 'EFLC'].
+        years (str or list): start year(s) of seasons to search, e.g. ['2021', '2022'].
+        teams (str or list, optional): team name(s) involved in match. All teams by default.
+        match_ids (int or list, optional): match id(s) to select. All matches by default.
+        data_folder (str, optional): location of WhoScored data, relative to script in which function is called.
+
+    Returns:
+        pandas.DataFrame: match catalogue entries that satisfy the search.
+    """
+
+    if isinstance(leagues, str):
+        leagues = [leagues]
+    if isinstance(years, (str, int)):
+        years = [years]
+
+    catalogue = load_match_catalogue(data_folder)
+
+    return _select_matches(catalogue, leagues, [season_folder(year) for year in years], teams, match_ids)
+
+
+def _read_log(log_path):
+    """ Read a json log file, returning an empty log if it does not exist."""
+
+    if os.path.isfile(log_path):
+        with open(log_path) as f:
+            return json.load(f)
+    else:
+        return {}
+
+
+def _write_log(log, log_path):
+    """ Write a json log file, replacing the existing file only once the new log is fully written."""
+
+    with open(f"{log_path}.tmp", 'w') as f:
+        json.dump(log, f, indent=1, sort_keys=True)
+    os.replace(f"{log_path}.tmp", log_path)
+
+
+def ingest_matches(league, year, match_ids=None, data_folder="../../data_directory/whoscored_data",
+                   store_folder="../../data_directory/whoscored_store"):
+    """ Append new or changed WhoScored matches to the columnar season store, and update the match catalogue.
+
+    Function to bring the columnar season store up to date with the WhoScored data directory for a league and season,
+    intended to be run after new matches are imported. The match catalogue is updated first, and only matches that are
+    not yet within the store, or whose files have changed since they were ingested (determined by file checksum), are
+    written. Events are de-duplicated on match, team and event id, and players on match and player id, and each match
+    partition is replaced in full, so ingesting the same match more than once has no further effect. Ingested matches
+    are recorded in a log at the top level of the store, which is used by stale_matches to determine which derived
+    artefacts (aggregates, caches) require refreshing.
+
+    Args:
+        league (str): league folder to ingest, e.g. 'EPL'.
+        year (str): start year of season to ingest, e.g. '2022'.
+        match_ids (list, optional): only ingest these matches, if new or changed. All matches in season by default.
+        data_folder (str, optional): location of WhoScored data, relative to script in which function is called.
+        store_folder (str, optional): location of columnar season store, relative to script in which function is called.
+
+    Returns:
+        list: match ids written to the store.
+    """
+
+    season = season_folder(year)
+    catalogue = _select_matches(update_match_catalogue(league, year, data_folder), [league], [season],
+                                match_ids=match_ids)
+
+    # Determine matches that are new, or have changed since last ingested
+    os.makedirs(store_folder, exist_ok=True)
+    log_path = f"{store_folder}/{INGEST_LOG_FILE}"
+    ingest_log = _read_log(log_path)
+    season_log = ingest_log.setdefault(f"{league}/{season}", {})
+    to_ingest = catalogue[[season_log.get(str(match['match_id'])) != match['event_checksum'] + match['player_checksum']
+                           for _, match in catalogue.iterrows()]]
+
+    # Initialise output
+    matches_written = []
+
+    for _, match in to_ingest.iterrows():
+        match_events, match_players, _ = _load_match_files(match['event_file'], match['player_file'])
+        match_events = match_events.drop_duplicates(
+            subset=[col for col in EVENT_KEY if col in match_events.columns], keep='last')
+        match_players = match_players.drop_duplicates(
+            subset=[col for col in PLAYER_KEY if col in match_players.columns], keep='last')
+
+        _write_partition(match_events, f"{store_folder}/events", league, season)
+        _write_partition(match_players, f"{store_folder}/players", league, season)
+        matches_written.append(int(match['match_id']))
+
+        # Log each match once written, so an interrupted ingest resumes from the next match
+        season_log[str(match['match_id'])] = match['event_checksum'] + match['player_checksum']
+        _write_log(ingest_log, log_path)
+
+    return matches_written
+
+
+def stale_matches(artefact, league, year, store_folder="../../data_directory/whoscored_store"):
+    """ Get the matches ingested into the store since a derived artefact was last refreshed.
+
+    Function to compare the matches ingested into the store for a league and season (see ingest_matches) with the
+    matches that a derived artefact (for example, a season aggregate or cache, identified by name) was last refreshed
+    with. Matches that have been ingested since, or re-ingested with changed files, are returned, so that the artefact
+    can be updated for only these matches rather than for the full season.
+
+    Args:
+        artefact (str): name of derived artefact, e.g. 'player_aggregates'.
+        league (str): league of season, e.g. 'EPL'.
+        year (str): start year of season, e.g. '2022'.
+        store_folder (str, optional): location of columnar season store, relative to script in which function is called.
+
+    Returns:
+        list: match ids that the artefact is stale for.
+    """
+
+    season_key = f"{league}/{season_folder(year)}"
+    ingested = _read_log(f"{store_folder}/{INGEST_LOG_FILE}").get(season_key, {})
+    refreshed = _read_log(f"{store_folder}/{ARTEFACT_LOG_FILE}").get(artefact, {}).get(season_key, {})
+
+    return sorted(int(match_id) for match_id, checksum in ingested.items() if refreshed.get(match_id) != checksum)
+
+
+def mark_artefact_refreshed(artefact, league, year, match_ids=None, store_folder="../../data_directory/whoscored_store"):
+    """ Record that a derived artefact has been refreshed with ingested matches.
+
+    Args:
+        artefact (str): name of derived artefact, e.g. 'player_aggregates'.
+        league (str): league of season, e.g. 'EPL'.
+        year (str): start year of season, e.g. '2022'.
+        match_ids (list, optional): matches the artefact has been refreshed with. All stale matches by default.
+        store_folder (str, optional): location of columnar season store, relative to script in which function is called.
+
+    Returns:
+        list: match ids that the artefact remains stale for.
+    """
+
+    season_key = f"{league}/{season_folder(year)}"
+    ingested = _read_log(f"{store_folder}/{INGEST_LOG_FILE}").get(season_key, {})
+
+    # Record ingested checksum of each refreshed match against the artefact
+    log_path = f"{store_folder}/{ARTEFACT_LOG_FILE}"
+    artefact_log = _read_log(log_path)
+    season_log = artefact_log.setdefault(artefact, {}).setdefault(season_key, {})
+    if match_ids is None:
+        match_ids = stale_matches(artefact, league, year, store_folder)
+    for match_id in match_ids:
+        if str(match_id) in ingested:
+            season_log[str(match_id)] = ingested[str(match_id)]
+    _write_log(artefact_log, log_path)
+
+    return stale_matches(artefact, league, year, store_folder)
+
+
+class SeasonDataset:
+    """ Lazily loaded WhoScored-style match data for one or more seasons, with a bounded cache of decoded matches.
+
+    Matches are indexed from the match catalogue (or from file names where a season is not catalogued) when the
+    dataset is created, but match files are only decompressed when a match is first accessed. Decoded matches are
+    held in a least recently used cache of fixed size, so that repeated access to a match is a dictionary lookup and
+    the memory used when sweeping through many seasons is bounded. An optional match_transform function (taking and
+    returning the event and player dataframes of a single match) is applied once when each match is decoded, so that
+    derived columns (e.g. pass recipient or cumulative minutes) are also held within the cache.
+
+    Args:
+        league (str): league folder to load, e.g. 'EPL'.
+        years (str or list): start year(s) of seasons to load, e.g. ['2021', '2022'].
+        columns (list, optional): event data columns to load. All columns are loaded by default.
+        filters (dict, optional): dictionary of event data column filters, as used by load_season. None by default.
+        encode_satisfied (bool, optional): selection of whether to encode satisfiedEventsTypes as bitmask columns, for
+                                           use with has_any and has_all. True by default.
+        compact_dtypes (bool, optional): selection of whether to convert event and player data to the compact dtypes
+                                         defined in data_schema. True by default.
+        match_transform (function, optional): function applied to the event and player dataframes of each match when
+                                              decoded, returning the transformed event and player dataframes.
+        cache_size (int, optional): maximum number of decoded matches held in memory. Defaults to 64.
+        data_folder (str, optional): location of WhoScored data, relative to script in which class is used.
+    """
+
+    def __init__(self, league, years, columns=None, filters=None, encode_satisfied=True, compact_dtypes=True,
+                 match_transform=None, cache_size=64, data_folder="../../data_directory/whoscored_data"):
+
+        if isinstance(years, (str, int)):
+            years = [years]
+
+        self.columns = columns
+        self.filters = filters
+        self.encode_satisfied = encode_satisfied
+        self.compact_dtypes = compact_dtypes
+        self.match_transform = match_transform
+        self.cache_size = cache_size
+        self.event_types = None
+        self.formation_mapping = None
+        self._cache = OrderedDict()
+        self._players = None
+
+        # Index match files from catalogue (or from data directory if season is not catalogued)
+        catalogue = load_match_catalogue(data_folder)
+        match_ids = filters['match_id'] if filters is not None and 'match_id' in filters else None
+        season_files = []
+        for year in years:
+            season = season_folder(year)
+            file_path = f"{data_folder}/{season}/{league}"
+            if os.path.isfile(f"{file_path}/event-types.pbz2"):
+                self.event_types = dcd.load_object(f"{file_path}/event-types.pbz2")
+            if os.path.isfile(f"{file_path}/formation-mapping.pbz2"):
+                self.formation_mapping = dcd.load_object(f"{file_path}/formation-mapping.pbz2")
+
+            files = _select_matches(catalogue, [league], [season])
+            if len(files) == 0:
+                files = _list_match_files(league, season, data_folder)
+            season_files.append(_select_matches(files, [league], [season], match_ids=match_ids))
+
+        self.matches = pd.concat(season_files, ignore_index=True).drop_duplicates('match_id').set_index('match_id')
+
+    @property
+    def match_ids(self):
+        """ list: ids of all matches within the dataset."""
+        return self.matches.index.tolist()
+
+    @property
+    def teams(self):
+        """ list: names of all teams within the dataset, as used within match file names."""
+        return sorted(set(self.matches['home_team']) | set(self.matches['away_team']))
+
+    def __len__(self):
+        return len(self.matches)
+
+    def __contains__(self, match_id):
+        return match_id in self.matches.index
+
+    def match(self, match_id):
+        """ Get the event and player data of a single match, decoding the match files if not already cached.
+
+        Args:
+            match_id (int): WhoScored match id.
+
+        Returns:
+            pandas.DataFrame: WhoScored-style event dataframe of match.
+            pandas.DataFrame: WhoScored-style player dataframe of match.
+        """
+
+        match_id = int(match_id)
+
+        # Return cached match, marking it as most recently used
+        if match_id in self._cache:
+            self._cache.move_to_end(match_id)
+            return self._cache[match_id]
+
+        if match_id not in self.matches.index:
+            raise KeyError(f"Match {match_id} is not within the dataset")
+
+        match_files = self.matches.loc[match_id]
+        match_events, match_players, _ = _load_match_files(match_files['event_file'], match_files['player_file'],
+                                                           self.columns, self.filters, self.encode_satisfied,
+                                                           compact_dtypes=self.compact_dtypes)
+        if self.match_transform is not None:
+            match_events, match_players = self.match_transform(match_events, match_players)
+
+        # Cache match, removing least recently used match if cache is full
+        self._cache[match_id] = (match_events, match_players)
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+        return match_events, match_players
+
+    def iter_matches(self, match_ids=None):
+        """ Iterate through matches within the dataset, decoding each match when it is reached.
+
+        Args:
+            match_ids (list, optional): ids of matches to iterate through. All matches by default.
+
+        Yields:
+            int: WhoScored match id.
+            pandas.DataFrame: WhoScored-style event dataframe of match.
+            pandas.DataFrame: WhoScored-style player dataframe of match.
+        """
+
+        for match_id in (self.match_ids if match_ids is None else match_ids):
+            match_events, match_players = self.match(match_id)
+            yield match_id, match_events, match_players
+
+    def team_matches(self, team):
+        """ Iterate through the matches of a single team, decoding each match when it is reached.
+
+        Args:
+            team (str): team name, as used within match file names or any other alias within the team registry (e.g.
+                        'Man City').
+
+        Yields:
+            int: WhoScored match id.
+            pandas.DataFrame: WhoScored-style event dataframe of match.
+            pandas.DataFrame: WhoScored-style player dataframe of match.
+        """
+
+        team_mask = _team_mask(self.matches['home_team'], team) | _team_mask(self.matches['away_team'], team)
+        yield from self.iter_matches(self.matches.index[team_mask].tolist())
+
+    def players(self):
+        """ Get the player data of all matches within the dataset.
+
+        Player files are small relative to event files, so are read in full (without being added to the match cache)
+        the first time this method is called. The match_transform function is not applied.
+
+        Returns:
+            pandas.DataFrame: WhoScored-style player dataframe, containing players from all matches.
+        """
+
+        if self._players is None:
+            match_players = [dcd.load_object(player_file) for player_file in self.matches['player_file']]
+            if self.compact_dtypes:
+                self._players = dsc.concat_with_schema([dsc.apply_schema(players, dsc.WHOSCORED_PLAYER_SCHEMA)
+                                                        for players in match_players], dsc.WHOSCORED_PLAYER_SCHEMA)
+            else:
+                self._players = pd.concat(match_players) if match_players else pd.DataFrame()
+
+        return self._players
@@ -2,28 +2,139 @@
 
 Functions
 ---------
-format_wyscout_data(tournament='England', data_folder="../../data_directory/wyscout_data")
-    Load Wyscout json files with matches, events, players and competitions."""
+format_wyscout_data(tournament='England', data_folder="../../data_directory/wyscout_data", use_cache=True)
+    Load Wyscout json files with matches, events, players and competitions.
 
-import bz2
-import pickle
-from collections import defaultdict
+load_wyscout_events(tournament='England', data_folder="../../data_directory/wyscout_data", use_cache=True)
+    Load Wyscout event data as a typed dataframe, using a cached columnar copy of each tournament where available.
+
+Classes
+---------
+MatchEvents(events)
+    Per-match views of a Wyscout-style event dataframe, sorted by match.
+"""
+
+import os
+from collections.abc import Mapping
+import numpy as np
 import pandas as pd
+import analysis_tools.data_codecs as dcd
+
+
+# Dtypes of cached Wyscout event columns
+WYSCOUT_EVENT_DTYPES = {'id': 'int64', 'matchId': 'int32', 'teamId': 'int32', 'playerId': 'int32',
+                        'eventId': 'int16', 'subEventId': 'Int16', 'eventName': 'category',
+                        'subEventName': 'category', 'matchPeriod': 'category', 'eventSec': 'float32',
+                        'x': 'float32', 'y': 'float32', 'end_x': 'float32', 'end_y': 'float32'}
+
+
+class MatchEvents(Mapping):
+    """ Per-match views of a Wyscout-style event dataframe, sorted by match.
+
+    Mapping of match id to the events of that match. The event dataframe is sorted by matchId (retaining event order
+    within each match), and the start and end row of each match are held as offsets, so that each match is returned
+    as a positional slice of the event dataframe rather than a copy.
+
+    Args:
+        events (pandas.DataFrame): wyscout-style event dataframe, sorted by matchId.
+    """
+
+    def __init__(self, events):
+        self.events = events
+        match_ids, starts = np.unique(events['matchId'].to_numpy(), return_index=True)
+        self.offsets = pd.DataFrame({'start': starts, 'stop': np.append(starts[1:], len(events))}, index=match_ids)
+
+    def __getitem__(self, match_id):
+        start, stop = self.offsets.loc[match_id]
+        return self.events.iloc[start:stop]
+
+    def __iter__(self):
+        return iter(self.offsets.index)
+
+    def __len__(self):
+        return len(self.offsets)
+
+
+def _flatten_events(raw_events):
+    """ Convert a list of Wyscout event dictionaries into a typed dataframe, flattening positions and tags."""
+
+    events = pd.DataFrame.from_records(raw_events, exclude=['positions', 'tags'])
+
+    # Start and end location of each event (end location is missing for single position events)
+    positions = [event['positions'] for event in raw_events]
+    events['x'] = [pos[0]['x'] if pos else np.nan for pos in positions]
+    events['y'] = [pos[0]['y'] if pos else np.nan for pos in positions]
+    events['end_x'] = [pos[1]['x'] if len(pos) > 1 else np.nan for pos in positions]
+    events['end_y'] = [pos[1]['y'] if len(pos) > 1 else np.nan for pos in positions]
+
+    # Tag ids of each event
+    events['tag_ids'] = [[tag['id'] for tag in event['tags']] for event in raw_events]
+
+    events['subEventId'] = pd.to_numeric(events['subEventId'], errors='coerce')
+
+    return events.astype({col: dtype for col, dtype in WYSCOUT_EVENT_DTYPES.items() if col in events.columns})
 
 
-def format_wyscout_data(tournament='England', data_folder="../../data_directory/wyscout_data"):
+def load_wyscout_events(tournament='England', data_folder="../../data_directory/wyscout_data", use_cache=True):
+    """ Load Wyscout event data as a typed dataframe, using a cached columnar copy of each tournament where available.
+
+    Function to load Wyscout event data for one or more tournaments. Event positions are flattened into x, y, end_x
+    and end_y columns, and event tags into a tag_ids column containing a list of tag ids. On first load, each
+    tournament is written to a parquet file within the events folder, which is read on subsequent loads in place of
+    the compressed source file (unless the source file has since been modified). The returned events are sorted by matchId, retaining
+    the order of events within each match.
+
+    Args:
+        tournament (str or list, optional): tournament(s) to load. Defaults to 'England'.
+        data_folder (str, optional): location of data, relative to script in which function is called.
+        use_cache (bool, optional): selection of whether to read and write cached parquet files. True by default.
+
+    Returns:
+        pandas.DataFrame: wyscout-style event dataframe, containing all events from selected competitions.
+    """
+
+    if isinstance(tournament, str):
+        tournament = [tournament]
+
+    # Initialise output
+    events = []
+
+    for data_selection in tournament:
+        source_file = f"{data_folder}/events/events_{data_selection}.pbz2"
+        cache_file = f"{data_folder}/events/events_{data_selection}.parquet"
+
+        # Use cache if it is more recent than the source file
+        if use_cache and os.path.isfile(cache_file) and os.path.getmtime(cache_file) >= os.path.getmtime(source_file):
+            events.append(pd.read_parquet(cache_file))
+        else:
+            events_temp = _flatten_events(dcd.load_object(source_file))
+            if use_cache:
+                events_temp.to_parquet(cache_file, index=False)
+            events.append(events_temp)
+
+    events = pd.concat(events, ignore_index=True)
+    for col in ['eventName', 'subEventName', 'matchPeriod']:
+        events[col] = events[col].astype('category')
+
+    return events.sort_values('matchId', kind='stable').reset_index(drop=True)
+
+
+def format_wyscout_data(tournament='England', data_folder="../../data_directory/wyscout_data", use_cache=True):
     """ Load Wyscout json files with matches, events, players and competitions.
 
     Function to load and format Wyscout json files (location defined by folder input) for a user-defined tournament.
+    Event data is loaded using load_wyscout_events, so is cached as parquet files on first load.
 
     Args:
         tournament (list, optional): List of tournaments to load.
         data_folder (str, optional): Location of data, relative to script in which function is called..
+        use_cache (bool, optional): selection of whether to read and write cached event files. True by default.
 
     Returns:
-        pandas.DataFrame: wyscout-style event dataframe, containing all events from selected competition.
         pandas.DataFrame: wyscout-style matches dataframe, containing all match information from selected competition.
-        defaultdict: wyscout-style event dictionary, containing events per match.
+        pandas.DataFrame: wyscout-style event dataframe, containing all events from selected competition, sorted by
+                          match.
+        MatchEvents: mapping of match id to a slice of the event dataframe, containing events per match.
         pandas.DataFrame: wyscout-style player dataframe, containing player info for all players in av. Wyscout data.
         pandas.DataFrame: wyscout-style competition dataframe, containing comp info for all comps in av. Wyscout data.
         pandas.DataFrame: wyscout-style team dataframe, containing team info for all teams in av. Wyscout data.
@@ -32,69 +143,26 @@ def format_wyscout_data(tournament='England', data_folder="../../data_directory/
     if isinstance(tournament, str):
         tournament = [tournament]
 
-    events, matches = pd.DataFrame(), pd.DataFrame()
+    # Load in the Wyscout event data, and produce per-match views of events
+    events = load_wyscout_events(tournament, data_folder=data_folder, use_cache=use_cache)
+    match_id2events = MatchEvents(events)
 
-    for idx, data_selection in enumerate(tournament):
-        
-        # Load in the Wyscout matches and event data
-        events_temp = bz2.BZ2File(f"{data_folder}/events/events_{data_selection}.pbz2", 'rb')
-        events_temp = pd.DataFrame(pickle.load(events_temp))
-        matches_temp = bz2.BZ2File(f"{data_folder}/matches/matches_{data_selection}.pbz2", 'rb')
-        matches_temp = pd.DataFrame(pickle.load(matches_temp))
+    # Load in the Wyscout matches, and index on match id
+    matches = []
+    for data_selection in tournament:
+        matches.append(pd.DataFrame(dcd.load_object(f"{data_folder}/matches/matches_{data_selection}.pbz2")))
+    match_id2match = _index_on_wyid(pd.concat(matches, ignore_index=True))
 
-        if idx == 0:
-            events = events_temp
-            matches = matches_temp
-        else:
-            events = events.append(events_temp)
-            matches = matches.append(matches_temp)
-
-    # Produce a dictionary of lists: top level dictionary of matches with sub-list of events
-    match_id2events = defaultdict(list)
-    for _, event in events.iterrows():
-        match_id = event['matchId']
-        match_id2events[match_id].append(event)
-
-    # Produce a dictionary of dictionaries: top level dictionary of matches with sub-dictionary of match info
-    match_id2match = defaultdict(dict)
-    for _, match in matches.iterrows():
-        match_id = match['wyId']
-        match_id2match[match_id] = match
-
-    # Load in the Wyscout player data
-    players = bz2.BZ2File(f"{data_folder}/players.pbz2", 'rb')
-    players = pickle.load(players)
-
-    # Produce a dictionary of dictionaries: top level dictionary of players with sub-dictionary of player info
-    player_id2player = defaultdict(dict)
-    for player in players:
-        player_id = player['wyId']
-        player_id2player[player_id] = player
-
-    # Load in the Wyscout competition data
-    competitions = bz2.BZ2File(f"{data_folder}/competitions.pbz2", 'rb')
-    competitions = pickle.load(competitions)
-
-    # Produce a dictionary: top level dictionary of competitions with sub-dictionary of competition info
-    competition_id2competition = defaultdict(dict)
-    for competition in competitions:
-        competition_id = competition['wyId']
-        competition_id2competition[competition_id] = competition
-
-    # Load in the Wyscout teams data
-    teams = bz2.BZ2File(f"{data_folder}/teams.pbz2", 'rb')
-    teams = pickle.load(teams)
-
-    # Produce a list of dictionaries: top level dictionary of teams with sub-dictionary of team info
-    team_id2team = defaultdict(dict)
-    for team in teams:
-        team_id = team['wyId']
-        team_id2team[team_id] = team
-
-    # Convert to dataframes
-    match_id2match = pd.DataFrame(match_id2match).transpose()
-    player_id2player = pd.DataFrame(player_id2player).transpose()
-    competition_id2competition = pd.DataFrame(competition_id2competition).transpose()
-    team_id2team = pd.DataFrame(team_id2team).transpose()
+    # Load in the Wyscout player, competition and team data, and index on id
+    player_id2player = _index_on_wyid(pd.DataFrame(dcd.load_object(f"{data_folder}/players.pbz2")))
+    competition_id2competition = _index_on_wyid(pd.DataFrame(dcd.load_object(f"{data_folder}/competitions.pbz2")))
+    team_id2team = _index_on_wyid(pd.DataFrame(dcd.load_object(f"{data_folder}/teams.pbz2")))
 
     return match_id2match, events, match_id2events, player_id2player, competition_id2competition, team_id2team
+
+
+def _index_on_wyid(df):
+    """ Index a Wyscout-style dataframe on wyId, keeping the last entry of any duplicated id."""
+
+    df = df[~df['wyId'].duplicated(keep='last')]
+    return df.set_index('wyId', drop=False).rename_axis(None)
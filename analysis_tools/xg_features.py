@@ -0,0 +1,228 @@
+"""Module containing functions to calculate expected goals (xG) model features for shots
+
+Features are calculated in yards from the centre of the goal, with x measured towards the halfway line and c measured
+across the pitch, so that shots from Wyscout, WhoScored and StatsBomb data share the same feature definitions.
+
+Functions
+---------
+shot_geometry(x_yards, c_yards, goal_width=GOAL_WIDTH_Y):
+    Calculate the distance to goal and the angle of the goal mouth for shots.
+
+wyscout_shot_features(events, players=None, teams=None, competitions=None, matches=None):
+    Calculate xG model features for all shots within Wyscout-style event data.
+
+whoscored_shot_features(events, players=None, qualifiers_df=None, competition=None):
+    Calculate xG model features for all shots within WhoScored-style event data.
+
+statsbomb_shot_features(events):
+    Calculate xG model features for all shots within StatsBomb-style event data.
+
+shot_feature_grid():
+    Calculate xG model features for a grid of shot locations, covering half of the pitch.
+"""
+
+import numpy as np
+import pandas as pd
+import analysis_tools.whoscored_data_engineering as wde
+
+
+# Pitch and goal dimensions used for xG features (yards)
+PITCH_LENGTH_X = 120
+PITCH_WIDTH_Y = 80
+GOAL_WIDTH_Y = 8
+
+# Model feature columns, in the order used to train xG models
+FEATURE_COLUMNS = ['x_yards', 'c_yards', 'distance_yards', 'angle', 'header_tag']
+
+# Lookup name columns, excluded from model features
+NAME_COLUMNS = ['player_name', 'team_name', 'competition_name']
+
+
+def shot_geometry(x_yards, c_yards, goal_width=GOAL_WIDTH_Y):
+    """ Calculate the distance to goal and the angle of the goal mouth for shots.
+
+    Args:
+        x_yards (numpy.ndarray): distance of shots from the goal line, in yards.
+        c_yards (numpy.ndarray): distance of shots from the centre of the pitch (across the pitch), in yards.
+        goal_width (float, optional): width of goal, in yards. Defaults to 8 yards.
+
+    Returns:
+        numpy.ndarray: distance of shots from the centre of the goal, in yards.
+        numpy.ndarray: angle of goal mouth from shot location, in radians.
+    """
+
+    x_yards = np.asarray(x_yards, dtype='float64')
+    c_yards = np.asarray(c_yards, dtype='float64')
+
+    distance = np.sqrt(x_yards ** 2 + c_yards ** 2)
+
+    # Angle subtended by goal mouth, which is a right angle where the denominator is zero
+    angle_denominator = x_yards ** 2 + c_yards ** 2 - (goal_width / 2) ** 2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        angle = np.arctan((2 * (goal_width / 2) * x_yards) / angle_denominator)
+    angle = np.where(angle_denominator == 0, np.pi / 2, angle)
+    angle = np.where(angle < 0, np.pi + angle, angle)
+
+    return distance, angle
+
+
+def _feature_frame(x_yards, c_yards, header_tag, goal, index, names=None):
+    """ Assemble xG feature dataframe, with lookup names first and goal outcome last."""
+
+    distance, angle = shot_geometry(x_yards, c_yards)
+
+    # Initialise output
+    features = pd.DataFrame(names, index=index) if names is not None else pd.DataFrame(index=index)
+    features['x_yards'] = np.asarray(x_yards, dtype='float64')
+    features['c_yards'] = np.asarray(c_yards, dtype='float64')
+    features['distance_yards'] = distance
+    features['angle'] = angle
+    features['header_tag'] = np.asarray(header_tag, dtype='int64')
+    features['goal'] = np.asarray(goal, dtype='int64')
+
+    return features
+
+
+def _decode_names(names):
+    """ Decode unicode-escaped Wyscout names."""
+
+    return names.map(lambda name: name.encode('ascii', 'strict').decode('unicode-escape')
+                     if isinstance(name, str) else name)
+
+
+def wyscout_shot_features(events, players=None, teams=None, competitions=None, matches=None):
+    """ Calculate xG model features for all shots within Wyscout-style event data.
+
+    Function to calculate xG model features (position, distance, angle and header tag) and the goal outcome of all
+    shots within Wyscout-style event data, as loaded by wyscout_data_engineering.format_wyscout_data. Player, team and
+    competition names are added where the corresponding Wyscout dataframes are passed.
+
+    Args:
+        events (pandas.DataFrame): wyscout-style event dataframe, with flattened x, y and tag_ids columns.
+        players (pandas.DataFrame, optional): wyscout-style player dataframe, indexed on player id. None by default.
+        teams (pandas.DataFrame, optional): wyscout-style team dataframe, indexed on team id. None by default.
+        competitions (pandas.DataFrame, optional): wyscout-style competition dataframe, indexed on competition id.
+                                                   Requires matches to be passed. None by default.
+        matches (pandas.DataFrame, optional): wyscout-style match dataframe, indexed on match id. None by default.
+
+    Returns:
+        pandas.DataFrame: dataframe of shots, containing lookup names, xG model features and goal outcome.
+    """
+
+    shots = events[events['eventName'] == 'Shot']
+
+    # Lookup names
+    names = pd.DataFrame(index=shots.index)
+    names['player_name'] = (shots['playerId'].map(_decode_names(players['shortName'])).where(shots['playerId'] != 0)
+                            if players is not None else np.nan)
+    names['team_name'] = shots['teamId'].map(_decode_names(teams['name'])) if teams is not None else np.nan
+    names['competition_name'] = (shots['matchId'].map(matches['competitionId']).map(competitions['name'])
+                                 if competitions is not None and matches is not None else np.nan)
+
+    # Tags: 403 is a header, 101 is a goal
+    tag_ids = shots['tag_ids'].tolist()
+    header_tag = [403 in tags for tags in tag_ids]
+    goal = [101 in tags for tags in tag_ids]
+
+    # Wyscout co-ordinates are percentages of pitch, with x towards goal
+    x_yards = (PITCH_LENGTH_X / 100) * (100 - shots['x'].to_numpy(dtype='float64'))
+    c_yards = (PITCH_WIDTH_Y / 100) * (shots['y'].to_numpy(dtype='float64') - 50)
+
+    return _feature_frame(x_yards, c_yards, header_tag, goal, shots.index, names)
+
+
+def whoscored_shot_features(events, players=None, qualifiers_df=None, competition=None):
+    """ Calculate xG model features for all shots within WhoScored-style event data.
+
+    Function to calculate xG model features (position, distance, angle and header tag) and the goal outcome of all
+    shots within WhoScored-style event data. Headers are identified from the qualifier table if passed (see
+    whoscored_data_engineering.explode_qualifiers), otherwise from the qualifiers column.
+
+    Args:
+        events (pandas.DataFrame): WhoScored-style event dataframe.
+        players (pandas.DataFrame, optional): WhoScored-style player dataframe, used to add player names. None by
+                                              default.
+        qualifiers_df (pandas.DataFrame, optional): qualifier table corresponding to events. None by default.
+        competition (str, optional): competition name to assign to all shots. None by default.
+
+    Returns:
+        pandas.DataFrame: dataframe of shots, containing lookup names, xG model features and goal outcome.
+    """
+
+    shot_mask = (events['isShot'] == True).to_numpy(dtype=bool)
+    shots = events[shot_mask]
+
+    # Lookup names
+    names = pd.DataFrame(index=shots.index)
+    if players is not None:
+        player_names = players.drop_duplicates('playerId').set_index('playerId')['name']
+        names['player_name'] = shots['playerId'].map(player_names)
+    else:
+        names['player_name'] = np.nan
+    names['team_name'] = shots['team_name'] if 'team_name' in shots.columns else np.nan
+    names['competition_name'] = competition if competition is not None else np.nan
+
+    # Qualifier 15 identifies a header
+    if qualifiers_df is not None:
+        header_tag = wde.has_qualifier(shots, qualifiers_df, 15).to_numpy()
+    else:
+        header_tag = [any(qualifier['type']['value'] == 15 for qualifier in qualifiers)
+                      for qualifiers in shots['qualifiers']]
+    goal = (shots['eventType'] == 'Goal').to_numpy()
+
+    # WhoScored co-ordinates are percentages of pitch, with x towards goal and y measured from the right touchline
+    x_yards = (PITCH_LENGTH_X / 100) * (100 - shots['x'].to_numpy(dtype='float64'))
+    c_yards = (PITCH_WIDTH_Y / 100) * (50 - shots['y'].to_numpy(dtype='float64'))
+
+    return _feature_frame(x_yards, c_yards, header_tag, goal, shots.index, names)
+
+
+def statsbomb_shot_features(events):
+    """ Calculate xG model features for all shots within StatsBomb-style event data.
+
+    Args:
+        events (pandas.DataFrame): StatsBomb-style event dataframe, with x and y location columns.
+
+    Returns:
+        pandas.DataFrame: dataframe of shots, containing lookup names, xG model features and goal outcome.
+    """
+
+    shots = events[events['type_name'] == 'Shot']
+
+    # Lookup names
+    names = pd.DataFrame(index=shots.index)
+    names['player_name'] = shots['player_name'] if 'player_name' in shots.columns else np.nan
+    names['team_name'] = shots['team_name'] if 'team_name' in shots.columns else np.nan
+    names['competition_name'] = shots['competition'] if 'competition' in shots.columns else np.nan
+
+    header_tag = (shots['body_part_name'] == 'Head').to_numpy()
+    goal = (shots['outcome_name'] == 'Goal').to_numpy()
+
+    # StatsBomb co-ordinates are in yards, with x towards goal
+    x_yards = PITCH_LENGTH_X - shots['x'].to_numpy(dtype='float64')
+    c_yards = shots['y'].to_numpy(dtype='float64') - PITCH_WIDTH_Y / 2
+
+    return _feature_frame(x_yards, c_yards, header_tag, goal, shots.index, names)
+
+
+def shot_feature_grid():
+    """ Calculate xG model features for a grid of shot locations, covering half of the pitch.
+
+    Function to calculate xG model features at every whole yard of the attacking half of the pitch, for both foot
+    shots and headers. Features are ordered by distance from goal line, then position across the pitch, so that model
+    predictions can be reshaped into a (61, 81) array.
+
+    Returns:
+        pandas.DataFrame: xG model features for foot shots at each grid location.
+        pandas.DataFrame: xG model features for headers at each grid location.
+    """
+
+    x_pos, y_pos = np.meshgrid(np.arange(0, int(PITCH_LENGTH_X / 2 + 1)), np.arange(0, int(PITCH_WIDTH_Y + 1)),
+                               indexing='ij')
+    x_yards = x_pos.ravel()
+    c_yards = y_pos.ravel() - PITCH_WIDTH_Y / 2
+
+    grid_grnd = _feature_frame(x_yards, c_yards, 0, 0, pd.RangeIndex(len(x_yards)))[FEATURE_COLUMNS]
+    grid_head = grid_grnd.assign(header_tag=1)
+
+    return grid_grnd, grid_head
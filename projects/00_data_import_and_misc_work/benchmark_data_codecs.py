@@ -0,0 +1,36 @@
+# Benchmark compressed size and decode throughput of each data file compression codec on a sample of data files
+
+#%% Imports
+
+import os
+import sys
+
+# %% Add custom tools to path
+
+root_folder = os.path.abspath(os.path.dirname((os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+sys.path.append(root_folder)
+
+import analysis_tools.data_codecs as dcd
+
+# %% User inputs
+
+# Input year folder
+year = '2023'
+
+# Input league folder
+league = 'EPL'
+
+# Input number of matches to sample
+sample_size = 20
+
+# %% Select sample of match files
+
+folderpath = f"../../data_directory/whoscored_data/{year}_{str(int(year.replace('20','',1)) + 1)}/{league}"
+event_files = sorted(file for file in os.listdir(folderpath) if '-eventdata-' in file)[:sample_size]
+file_paths = [f"{folderpath}/{file}" for event_file in event_files
+              for file in [event_file, event_file.replace('-eventdata-', '-playerdata-')]]
+
+# %% Benchmark codecs
+
+results = dcd.benchmark_codecs(file_paths)
+print(results.round(2).to_string(index=False))
@@ -0,0 +1,104 @@
+# Check the import orchestrator (rate limiting, retries, response cache and resumable progress) against a local
+# stand-in HTTP server, without contacting any data provider
+
+#%% Imports
+
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# %% Add custom tools to path
+
+root_folder = os.path.abspath(os.path.dirname((os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+sys.path.append(root_folder)
+
+import analysis_tools.import_orchestrator as iorc
+
+# %% User inputs
+
+# Input minimum time between requests to the stand-in server (seconds), and number of requests to time
+request_interval = 0.2
+timed_requests = 5
+
+# %% Start stand-in server
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """ Serve each path with its own name as content, failing the first request to /flaky with a 503 response."""
+
+    request_times = []
+    flaky_failures = 1
+
+    def do_GET(self):
+        StandInHandler.request_times.append(time.monotonic())
+        if self.path == '/flaky' and StandInHandler.flaky_failures > 0:
+            StandInHandler.flaky_failures -= 1
+            self.send_response(503)
+            self.end_headers()
+            return
+        content = self.path.encode()
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *args):
+        pass
+
+
+server = ThreadingHTTPServer(('127.0.0.1', 0), StandInHandler)
+threading.Thread(target=server.serve_forever, daemon=True).start()
+base_url = f"http://127.0.0.1:{server.server_address[1]}"
+work_folder = tempfile.mkdtemp()
+cache_folder = f"{work_folder}/response_cache"
+
+# %% Check response cache
+
+content = iorc.fetch_url(f"{base_url}/cached", cache_folder=cache_folder)
+requests_made = len(StandInHandler.request_times)
+assert iorc.fetch_url(f"{base_url}/cached", cache_folder=cache_folder) == content == b'/cached'
+assert len(StandInHandler.request_times) == requests_made, "Cached response was requested again"
+iorc.fetch_url(f"{base_url}/cached", cache_folder=cache_folder, refresh=True)
+assert len(StandInHandler.request_times) == requests_made + 1, "Refresh did not request again"
+print("Response cache: repeated request served from cache, refresh requested again")
+
+# %% Check retry of temporary failure status codes
+
+assert iorc.fetch_url(f"{base_url}/flaky", cache_folder=cache_folder, backoff=0.01) == b'/flaky'
+print("Retries: 503 response retried and succeeded")
+
+# %% Check rate limiting of concurrent requests to the same host
+
+rate_limiter = iorc.HostRateLimiter(request_interval)
+StandInHandler.request_times = []
+iorc.run_tasks(range(timed_requests), lambda task: iorc.fetch_url(f"{base_url}/limited-{task}",
+                                                                  cache_folder=cache_folder,
+                                                                  rate_limiter=rate_limiter),
+               max_workers=timed_requests)
+request_times = sorted(StandInHandler.request_times)
+min_gap = min(later - earlier for earlier, later in zip(request_times[:-1], request_times[1:]))
+assert min_gap >= 0.9 * request_interval, f"Requests only {min_gap:.3f}s apart"
+print(f"Rate limiting: {timed_requests} concurrent requests at least {min_gap:.3f}s apart")
+
+# %% Check resumption of interrupted imports
+
+progress_file = f"{work_folder}/import_progress.json"
+failing_tasks = {2}
+
+def import_task(task):
+    """ Fetch a single page from the stand-in server, failing for selected tasks."""
+    if task in failing_tasks:
+        raise RuntimeError(f"Task {task} failed")
+    iorc.fetch_url(f"{base_url}/task-{task}", cache_folder=cache_folder)
+
+first_run = iorc.run_tasks(range(4), import_task, progress_file=progress_file, retries=1, backoff=0.01)
+failing_tasks = set()
+second_run = iorc.run_tasks(range(4), import_task, progress_file=progress_file, retries=1, backoff=0.01)
+assert first_run.set_index('task')['status'].to_dict() == {0: 'complete', 1: 'complete', 2: 'failed', 3: 'complete'}
+assert second_run.set_index('task')['status'].to_dict() == {0: 'skipped', 1: 'skipped', 2: 'complete', 3: 'skipped'}
+print("Resumption: only the failed task was run again")
+
+server.shutdown()
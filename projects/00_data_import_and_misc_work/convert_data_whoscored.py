@@ -0,0 +1,33 @@
+# Convert user-specified WhoScored data into the partitioned columnar season store
+
+#%% Imports
+
+import os
+import sys
+
+# %% Add custom tools to path
+
+root_folder = os.path.abspath(os.path.dirname((os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+sys.path.append(root_folder)
+
+import analysis_tools.whoscored_data_storage as wds
+
+# %% User inputs
+
+# Input league folder and start years of seasons to convert
+data_grab = [['EFLC', '2018'],
+             ['EFLC', '2019'],
+             ['EFLC', '2020'],
+             ['EFLC', '2021'],
+             ['EFLC', '2022']]
+
+# Choose whether to overwrite matches already within the store
+overwrite = False
+
+# %% Convert data
+
+for league, year in data_grab:
+    matches_written = wds.convert_whoscored_season(league, year, data_folder="../../data_directory/whoscored_data",
+                                                   store_folder="../../data_directory/whoscored_store",
+                                                   overwrite=overwrite)
+    print(f"{league} {year}: {len(matches_written)} matches written to store")
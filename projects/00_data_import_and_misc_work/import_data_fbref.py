@@ -2,9 +2,17 @@
 
 # %% Imports
 
+import os
+import sys
 import ScraperFC as sfc
 import traceback
-import pandas as pd
+
+# %% Add custom tools to path
+
+root_folder = os.path.abspath(os.path.dirname((os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+sys.path.append(root_folder)
+
+import analysis_tools.fbref_data_engineering as fde
 
 # %% User inputs
 
@@ -45,78 +53,24 @@ finally:
 
 # %% Format scraped data
 
-playerinfo_df = pd.DataFrame()
-teaminfo_for_df = pd.DataFrame()
-teaminfo_against_df = pd.DataFrame()
-
-# Iterate over statistic type
-for idx, statistic_group in enumerate(list(fbref_dict.keys())):
-    
-    # Team stats for
-    temp_team_stat_for_df = fbref_dict[statistic_group][0].copy()
-    new_col_names = []
-    for col_name in temp_team_stat_for_df.columns:
-        col_name_1 = '' if 'Unnamed' in col_name[0] else col_name[0]
-        col_name_2 = col_name[1] if 'Unnamed' in col_name[0] else ' ' + col_name[1]
-        new_col_names.append((col_name_1 + col_name_2).strip())
-    temp_team_stat_for_df.columns = new_col_names
-    if idx != 0:
-        teaminfo_for_df = teaminfo_for_df.merge(temp_team_stat_for_df, left_on='Team ID', right_on='Team ID', suffixes=('', '_duplicate'), how = "outer") 
-    else:
-        teaminfo_for_df = temp_team_stat_for_df
-    
-    # Team stats against
-    temp_team_stat_against_df = fbref_dict[statistic_group][1].copy()
-    new_col_names = []
-    for col_name in temp_team_stat_against_df.columns:
-        col_name_1 = '' if 'Unnamed' in col_name[0] else col_name[0]
-        col_name_2 = col_name[1] if 'Unnamed' in col_name[0] else ' ' + col_name[1]
-        new_col_names.append((col_name_1 + col_name_2).strip())
-    temp_team_stat_against_df.columns = new_col_names
-    if idx != 0:
-        teaminfo_against_df = teaminfo_against_df.merge(temp_team_stat_against_df, left_on='Team ID', right_on='Team ID', suffixes=('', '_duplicate'), how = "outer") 
-    else:
-        teaminfo_against_df = temp_team_stat_against_df
-
-    # Player stats
-    temp_player_stat_df = fbref_dict[statistic_group][2].copy()
-    new_col_names = []
-    for col_name in temp_player_stat_df.columns:
-        col_name_1 = '' if 'Unnamed' in col_name[0] else col_name[0]
-        col_name_2 = col_name[1] if 'Unnamed' in col_name[0] else ' ' + col_name[1]
-        new_col_names.append((col_name_1 + col_name_2).strip())
-    temp_player_stat_df.columns = new_col_names
-    if idx != 0:
-        playerinfo_df = playerinfo_df.merge(temp_player_stat_df, left_on=['Player', 'Player ID', 'Squad'], right_on=['Player', 'Player ID', 'Squad'], suffixes=('', '_duplicate'), how = "outer") 
-    else:
-        playerinfo_df = temp_player_stat_df
-
-# Remove duplicate columns
-teaminfo_for_df = teaminfo_for_df.loc[:,[False if '_duplicate' in x else True for x in teaminfo_for_df.columns]]
-teaminfo_against_df = teaminfo_against_df.loc[:,[False if '_duplicate' in x else True for x in teaminfo_against_df.columns]]
-playerinfo_df = playerinfo_df.loc[:,[False if '_duplicate' in x else True for x in playerinfo_df.columns]]
-       
-# Adjust data types
-for col_name in playerinfo_df.columns:
-    try:
-        playerinfo_df[col_name] = playerinfo_df[col_name].astype(float)
-    except:
-        pass
+# Combine statistic groups into team, vs team and player tables, with numeric columns converted to float
+teaminfo_for_df, teaminfo_against_df, playerinfo_df = fde.normalise_fbref_stats(fbref_dict)
 
 # %% Save scraped data
 
 file_extension_name = COMPETITION.lower() + ' ' + str(COMPETITION_END_YEAR)
+os.makedirs(DIRECTORY, exist_ok=True)
 
 if STORAGE_MODE.lower().replace('_',' ') == 'player only':
-    playerinfo_df.to_json(DIRECTORY + file_extension_name + ' player data.json')
+    playerinfo_df.to_parquet(DIRECTORY + file_extension_name + ' player data.parquet')
 
 elif STORAGE_MODE.lower().replace('_',' ') == 'team only':
-    teaminfo_for_df.to_json(DIRECTORY + file_extension_name + ' team data.json')
+    teaminfo_for_df.to_parquet(DIRECTORY + file_extension_name + ' team data.parquet')
     
 elif STORAGE_MODE.lower().replace('_',' ') == 'vs team only':
-    teaminfo_against_df.to_json(DIRECTORY + file_extension_name + ' vs team data.json')
+    teaminfo_against_df.to_parquet(DIRECTORY + file_extension_name + ' vs team data.parquet')
     
 else:
-    playerinfo_df.to_json(DIRECTORY + file_extension_name + ' player data.json')
-    teaminfo_for_df.to_json(DIRECTORY + file_extension_name + ' team data.json')
-    teaminfo_against_df.to_json(DIRECTORY + file_extension_name + ' vs team data.json')
\ No newline at end of file
+    playerinfo_df.to_parquet(DIRECTORY + file_extension_name + ' player data.parquet')
+    teaminfo_for_df.to_parquet(DIRECTORY + file_extension_name + ' team data.parquet')
+    teaminfo_against_df.to_parquet(DIRECTORY + file_extension_name + ' vs team data.parquet')
@@ -12,21 +12,26 @@ root_folder = os.path.abspath(os.path.dirname((os.path.dirname(os.path.dirname(o
 sys.path.append(root_folder)
 
 import analysis_tools.get_football_data as gfd
+import analysis_tools.import_orchestrator as iorc
 
 # %% User inputs
 
-# Input league identifier and starting year of season
+# Input league identifier and starting years of seasons
 league = "EFLC"
-start_year = '2018'
+start_years = ['2018']
 
-# Set up folder path
-folder_path = f"../../data_directory/leaguetable_data/{start_year}_{str(int(start_year.replace('20','', 1)) + 1)}"
+# Input number of seasons to import concurrently, and minimum time between the start of each season import (seconds)
+max_workers = 4
+request_interval = 2
 
 # %% Get data
 
-league_table = gfd.get_league_table(league, start_year, folderpath=folder_path)
-
-
-
-
+def import_league_table(start_year):
+    """ Obtain and save league table of a single season using custom function."""
+    folder_path = f"../../data_directory/leaguetable_data/{start_year}_{str(int(start_year.replace('20','', 1)) + 1)}"
+    gfd.get_league_table(league, start_year, folderpath=folder_path)
 
+import_summary = iorc.run_tasks(start_years, import_league_table, max_workers=max_workers,
+                                progress_file=f"../../data_directory/leaguetable_data/{league}_import_progress.json",
+                                rate_limiter=iorc.HostRateLimiter(request_interval), host='www.skysports.com')
+print(import_summary.to_string(index=False))
@@ -0,0 +1,28 @@
+# Import user-specified data from StatsBomb using custom football data module, and store in local database
+
+#%% Imports
+
+import os
+import sys
+
+# %% Add custom tools to path
+
+root_folder = os.path.abspath(os.path.dirname((os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+sys.path.append(root_folder)
+
+import analysis_tools.get_football_data as gfd
+import analysis_tools.statsbomb_data_storage as sds
+
+# %% User inputs
+
+# Input country, competition and start year of seasons to import
+data_grab = [['England', 'Premier League', '2023']]
+
+# %% Get data and store in local database
+
+for country, competition, season in data_grab:
+    data_dict = gfd.load_statsbomb_sql([[country, competition, season]], events=True, matches=True, lineups=True,
+                                       player_stats=True)
+    rows_written = sds.store_statsbomb_data(data_dict, country, competition, season,
+                                            db_path="../../data_directory/statsbomb_data/statsbomb.db")
+    print(f"{competition} {season}: {rows_written}")
@@ -5,6 +5,7 @@
 import os
 import sys
 import numpy as np
+import pandas as pd
 
 # %% Add custom tools to path
 
@@ -12,6 +13,8 @@ root_folder = os.path.abspath(os.path.dirname((os.path.dirname(os.path.dirname(o
 sys.path.append(root_folder)
 
 import analysis_tools.get_football_data as gfd
+import analysis_tools.import_orchestrator as iorc
+import analysis_tools.whoscored_data_storage as wds
 
 # %% User inputs
 
@@ -25,13 +28,39 @@ year = '2023'
 # Input league folder
 league = 'EPL'
 
+# Input number of matches to import concurrently, and minimum time between the start of each match import (seconds)
+max_workers = 4
+request_interval = 3
+
 # %% Set-up file path and match ids
 match_ids = np.arange(match_id_start, match_id_end+1)
 folderpath = f"../../data_directory/whoscored_data/{year}_{str(int(year.replace('20','',1)) + 1)}/{league}"
 
 # %% Get data
-for match_id in match_ids:
-    match_id = str(match_id)
-    
-    # Obtain and save data using custom function
-    events, players, mappings = gfd.get_whoscored_data(match_id, get_mappings=True, save_to_file=True, folderpath=folderpath)
\ No newline at end of file
+
+def import_match(match_id, get_mappings=False):
+    """ Obtain and save data of a single match using custom function."""
+    gfd.get_whoscored_data(str(match_id), get_mappings=get_mappings, save_to_file=True, folderpath=folderpath)
+
+progress_file = f"{folderpath}/import_progress.json"
+rate_limiter = iorc.HostRateLimiter(request_interval)
+
+# Import the first match on its own, alongside the event-type and formation mappings. Mappings are common to all
+# matches, so are obtained once here rather than by every concurrent worker
+mapping_summary = iorc.run_tasks(match_ids[:1].tolist(), lambda match_id: import_match(match_id, get_mappings=True),
+                                 max_workers=1, progress_file=progress_file, rate_limiter=rate_limiter,
+                                 host='www.whoscored.com')
+
+# Import remaining matches concurrently. Progress is recorded per match, so re-running after an interruption only
+# imports matches that were not completed
+import_summary = iorc.run_tasks(match_ids[1:].tolist(), import_match, max_workers=max_workers,
+                                progress_file=progress_file, rate_limiter=rate_limiter, host='www.whoscored.com')
+import_summary = pd.concat([mapping_summary, import_summary], ignore_index=True)
+print(import_summary['status'].value_counts().to_string())
+if (import_summary['status'] == 'failed').any():
+    print(import_summary.loc[import_summary['status'] == 'failed', ['task', 'error']].to_string(index=False))
+
+# %% Ingest new matches into season store (also updates match catalogue)
+matches_written = wds.ingest_matches(league, year, data_folder="../../data_directory/whoscored_data",
+                                     store_folder="../../data_directory/whoscored_store")
+print(f"{league} {year}: {len(matches_written)} new or changed matches ingested into store")
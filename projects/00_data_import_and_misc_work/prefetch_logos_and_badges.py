@@ -0,0 +1,37 @@
+# Download and cache competition logos and team badges, so that reports can be produced in offline mode
+
+#%% Imports
+
+import os
+import sys
+
+# %% Add custom tools to path
+
+root_folder = os.path.abspath(os.path.dirname((os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+sys.path.append(root_folder)
+
+import analysis_tools.logos_and_badges as lab
+import analysis_tools.whoscored_data_storage as wds
+
+# %% User inputs
+
+# Input leagues and start years of seasons to cache images for (teams are taken from the WhoScored match catalogue)
+leagues = ['EPL', 'La_Liga', 'Bundesliga', 'Serie_A', 'Ligue_1']
+years = ['2022', '2023']
+
+# Input any additional competitions and teams to cache images for
+extra_competitions = ['UEFA Champions League', 'World Cup']
+extra_teams = []
+
+# %% Get teams from match catalogue
+
+matches = wds.find_matches(leagues, years, data_folder="../../data_directory/whoscored_data")
+teams = sorted(set(matches['home_team']) | set(matches['away_team'])) if len(matches) else []
+
+# %% Cache images
+
+failed = lab.prefetch_images(competitions=leagues + extra_competitions, teams=teams + extra_teams, years=years,
+                             cache_folder="../../data_directory/image_cache")
+print(f"Cached images for {len(leagues + extra_competitions)} competitions and {len(teams + extra_teams)} teams")
+if failed:
+    print(f"Images could not be cached for: {', '.join(failed)}")
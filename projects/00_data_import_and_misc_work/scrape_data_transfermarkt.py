@@ -11,14 +11,13 @@ root_folder = os.path.abspath(os.path.dirname((os.path.dirname(os.path.dirname(o
 sys.path.append(root_folder)
 
 import analysis_tools.get_football_data as gfd
+import analysis_tools.import_orchestrator as iorc
 
 # %% User Inputs
 
-# Input league country (England = GB, Spain = ES, Germany = L, Italy = IT, France = FR, Scotland = SC)
-country_code = 'FR'
-
-# Input league number (for example Premier League = 1, Championship = 2, League One = 3, etc.)
-division_num = '2'
+# Input league country (England = GB, Spain = ES, Germany = L, Italy = IT, France = FR, Scotland = SC) and league
+# number (for example Premier League = 1, Championship = 2, League One = 3, etc.) of each league to scrape
+leagues = [['FR', '2']]
 
 # Input year that season started
 start_year = '2022'
@@ -26,5 +25,22 @@ start_year = '2022'
 # Choose whether to obtains stats from all competitions (False = League comp. only, True = All comps.)
 all_comps = False
 
-# Obtain and save data using custom function
-player_info = gfd.get_transfermarkt_data(country_code, division_num, start_year, all_comps, save_to_file=True, folderpath=f"../../data_directory/transfermarkt_data/{start_year}_{str(int(start_year.replace('20','')) + 1)}")
\ No newline at end of file
+# Input number of leagues to scrape concurrently, and minimum time between the start of each league scrape (seconds)
+max_workers = 2
+request_interval = 3
+
+# %% Get data
+
+folder_path = f"../../data_directory/transfermarkt_data/{start_year}_{str(int(start_year.replace('20','')) + 1)}"
+
+def scrape_league(league):
+    """ Obtain and save data of a single league using custom function."""
+    country_code, division_num = league.split('-')
+    gfd.get_transfermarkt_data(country_code, division_num, start_year, all_comps, save_to_file=True,
+                               folderpath=folder_path)
+
+import_summary = iorc.run_tasks([f"{country_code}-{division_num}" for country_code, division_num in leagues],
+                                scrape_league, max_workers=max_workers,
+                                progress_file=f"{folder_path}/scrape_progress.json",
+                                rate_limiter=iorc.HostRateLimiter(request_interval), host='www.transfermarkt.com')
+print(import_summary.to_string(index=False))
@@ -0,0 +1,32 @@
+# Rewrite compressed pickle data files within the data directory using a selected compression codec
+
+#%% Imports
+
+import os
+import sys
+
+# %% Add custom tools to path
+
+root_folder = os.path.abspath(os.path.dirname((os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+sys.path.append(root_folder)
+
+import analysis_tools.data_codecs as dcd
+
+# %% User inputs
+
+# Input folders to transcode (all sub-folders are included)
+folders = ["../../data_directory/whoscored_data", "../../data_directory/wyscout_data",
+           "../../data_directory/leaguetable_data"]
+
+# Input codec ('zstd', 'lz4', 'bz2' or 'none'). zstd and lz4 require the optional zstandard and lz4 packages
+codec = 'zstd'
+
+# %% Transcode files
+
+for folder in folders:
+    transcoded = dcd.transcode_folder(folder, codec=codec)
+    if len(transcoded):
+        print(f"{folder}: {len(transcoded)} files transcoded to {codec}, "
+              f"{transcoded['original_size'].sum() / 1024 ** 2:.1f} MB to {transcoded['new_size'].sum() / 1024 ** 2:.1f} MB")
+    else:
+        print(f"{folder}: no files to transcode")
@@ -19,8 +19,6 @@
 
 import os
 import sys
-import pickle
-import bz2
 import pandas as pd
 import numpy as np
 from sklearn.preprocessing import MinMaxScaler
@@ -42,14 +40,13 @@ sys.path.append(root_folder)
 
 import analysis_tools.statsbomb_data_engineering as sde
 import analysis_tools.statsbomb_custom_events as sce
+import analysis_tools.data_codecs as dcd
 
 # %% Read in data
 
 # Statsbomb data
-events = bz2.BZ2File('../../data_directory/statsbomb_data/2017_18/FIFA World Cup/fifa-world-cup-2018-eventdata.pbz2', 'rb')
-events = pickle.load(events)
-lineups = bz2.BZ2File('../../data_directory/statsbomb_data/2017_18/FIFA World Cup/fifa-world-cup-2018-lineupdata.pbz2', 'rb')
-lineups = pickle.load(lineups)
+events = dcd.load_object('../../data_directory/statsbomb_data/2017_18/FIFA World Cup/fifa-world-cup-2018-eventdata.pbz2')
+lineups = dcd.load_object('../../data_directory/statsbomb_data/2017_18/FIFA World Cup/fifa-world-cup-2018-lineupdata.pbz2')
 
 # Misc data
 dist_covered = pd.read_excel('../../data_directory/misc_data/worldcup_2010_to_2018_distcovered.xlsx',
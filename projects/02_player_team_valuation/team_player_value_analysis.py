@@ -27,8 +27,6 @@ from sklearn.linear_model import LinearRegression
 from sklearn import model_selection
 from sklearn.preprocessing import StandardScaler
 from sklearn import metrics
-import pickle
-import bz2
 import adjustText
 import os
 import sys
@@ -43,8 +41,7 @@ league = "EFL Championship"
 
 # CSV file name corresponding to chosen league
 filename = f'transfermarkt_{league_code}_{league_year}-{1+int(league_year)}.pbz2'
-playerinfo_df = bz2.BZ2File(f"../../data_directory/transfermarkt_data/{league_year}_{int(league_year.replace('20','', 1)) + 1}/{filename}", 'rb')
-playerinfo_df = pickle.load(playerinfo_df)
+playerinfo_df = dcd.load_object(f"../../data_directory/transfermarkt_data/{league_year}_{int(league_year.replace('20','', 1)) + 1}/{filename}")
 
 # Turn on or off manual player tags on plots (default off=False)
 player_tags = True
@@ -68,6 +65,7 @@ root_folder = os.path.abspath(os.path.dirname(
 sys.path.append(root_folder)
 
 import analysis_tools.logos_and_badges as lab
+import analysis_tools.data_codecs as dcd
 
 # %% Get logo
 
@@ -5,8 +5,16 @@
 import pandas as pd
 import numpy as np
 import os
-import bz2
-import pickle
+import sys
+
+# %% Add custom tools to path
+
+root_folder = os.path.abspath(os.path.dirname((os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+sys.path.append(root_folder)
+
+import analysis_tools.whoscored_data_engineering as wde
+import analysis_tools.whoscored_data_storage as wds
+import analysis_tools.data_codecs as dcd
 
 # %% Select data to load
 
@@ -36,25 +44,11 @@ passes_df = pd.DataFrame()
 for data in data_to_load:
     league = data[0]
     year = data[1]
-    league_passes = pd.DataFrame()
-        
-    file_path_evts = f"../../data_directory/whoscored_data/{data[1]}_{str(int(data[1].replace('20','', 1)) + 1)}/{data[0]}"
-    files = os.listdir(file_path_evts)
-    
-    # Load event data match by match
-    for file in files:
-        if file == 'event-types.pbz2':
-            event_types = bz2.BZ2File(f"{file_path_evts}/{file}", 'rb')
-            event_types = pickle.load(event_types)
-        elif '-eventdata-' in file:
-            match_events = bz2.BZ2File(f"{file_path_evts}/{file}", 'rb')
-            match_events = pickle.load(match_events)
-            match_passes = match_events[(match_events['outcomeType'] == 'Successful') &
-                                        (match_events['eventType'] == 'Pass') & 
-                                        (match_events['satisfiedEventsTypes'].apply(lambda x: not (31 in x or 34 in x or 212 in x)))]
-            
-            
-            league_passes = pd.concat([league_passes, match_passes])
+
+    # Load successful passes only, filtering each match before concatenation
+    league_passes, _, event_types, _ = wds.load_season_files(league, year, filters={'eventType': 'Pass',
+                                                                                   'outcomeType': 'Successful'})
+    league_passes = league_passes[~wde.has_any(league_passes, [31, 34, 212])]
 
     # Append league data to combined dataset
     passes_df = pd.concat([passes_df, league_passes])
@@ -71,6 +65,5 @@ for idx in np.arange(0,num_files):
     print(f"Isolating sample {idx}")
     pass_sample_df = passes_df_out.iloc[sample_size*idx:sample_size*(idx+1)]
     print(f"Saving sample {idx}")
-    with bz2.BZ2File(f"pass_data_{idx}.pbz2", "wb") as f:
-        pickle.dump(pass_sample_df, f)
+    dcd.save_object(pass_sample_df, f"pass_data_{idx}.pbz2")
     print("Save complete")
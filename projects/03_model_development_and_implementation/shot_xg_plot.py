@@ -8,8 +8,8 @@
 
 # %% Imports
 
-import bz2
-import pickle
+import os
+import sys
 from PIL import Image
 import requests
 from io import BytesIO
@@ -18,6 +18,13 @@ import matplotlib.pyplot as plt
 import matplotlib as mpl
 from mplsoccer.pitch import VerticalPitch
 
+# %% Add custom tools to path
+
+root_folder = os.path.abspath(os.path.dirname((os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+sys.path.append(root_folder)
+
+import analysis_tools.data_codecs as dcd
+
 # %% User inputs
 
 # Select player, team or competition to plot shots for
@@ -34,8 +41,7 @@ PITCH_LENGTH_X = 120
 
 # %% Load xG model and data
 
-shots_model_df = bz2.BZ2File("../../data_directory/misc_data/log_regression_xg_data.pbz2", 'rb')
-shots_model_df = pickle.load(shots_model_df)
+shots_model_df = dcd.load_object("../../data_directory/misc_data/log_regression_xg_data.pbz2")
 
 # %% Isolate shots for selected player or team
 
@@ -17,8 +17,6 @@ import numpy as np
 import pandas as pd
 import tensorflow as tf
 from mplsoccer.pitch import VerticalPitch
-import pickle
-import bz2
 
 # %% Add custom tools to path
 
@@ -26,6 +24,8 @@ root_folder = os.path.abspath(os.path.dirname((os.path.dirname(os.path.dirname(o
 sys.path.append(root_folder)
 
 import analysis_tools.wyscout_data_engineering as wde
+import analysis_tools.xg_features as xgf
+import analysis_tools.data_codecs as dcd
 
 # %% User inputs
 
@@ -44,47 +44,9 @@ match_data, event_data, event_data_by_match, player_data, competition_data, team
 
 # %% Define dataframe of all shots in event data
 
-# Initialise shot model dataframe
-shots_model_df = pd.DataFrame()
-i = 0
-
-# Loop through shots and obtain/calculate shot information
-for _, shot in event_data[event_data['eventName']=='Shot'].iterrows():
-    
-    # Player, team and competition
-    if shot['playerId'] != 0:
-        shots_model_df.loc[i, 'player_name'] = player_data.loc[shot['playerId']]['shortName'].encode('ascii', 'strict').decode('unicode-escape')
-    else:
-        shots_model_df.loc[i, 'player_name'] = np.nan
-    shots_model_df.loc[i, 'team_name'] = team_data.loc[shot['teamId']]['name'].encode('ascii', 'strict').decode('unicode-escape')
-    shots_model_df.loc[i, 'competition_name'] = competition_data.loc[match_data.loc[shot['matchId']]['competitionId']]['name']
-    
-    # Position and distance info
-    shots_model_df.loc[i, 'x_yards'] = (PITCH_LENGTH_X/100)*(100 - shot['positions'][0]['x'])
-    shots_model_df.loc[i, 'c_yards'] = (PITCH_WIDTH_Y/100)*(shot['positions'][0]['y'] - 50)
-    shots_model_df.loc[i,'distance_yards'] = np.sqrt(shots_model_df.loc[i, 'x_yards']**2 + shots_model_df.loc[i, 'c_yards']**2)
-    
-    # Angle info
-    angle_denominator = (shots_model_df.loc[i, 'x_yards']**2 + shots_model_df.loc[i, 'c_yards']**2 - (GOAL_WIDTH_Y/2)**2)
-    if angle_denominator == 0:
-        angle = np.pi/2
-    else:
-        angle = np.arctan((2*(GOAL_WIDTH_Y/2)*shots_model_df.loc[i, 'x_yards'])/angle_denominator)
-    if angle<0:
-        angle = np.pi + angle
-    shots_model_df.loc[i, 'angle'] = angle
-    
-    # Header info
-    shots_model_df.loc[i, 'header_tag'] = 0
-    if {'id': 403} in shot['tags']:
-        shots_model_df.loc[i, 'header_tag'] = 1
-        
-    # Outcome
-    shots_model_df.loc[i, 'goal'] = 0
-    if {'id': 101} in shot['tags']:
-        shots_model_df.loc[i, 'goal'] = 1        
-    
-    i += 1
+# Calculate shot features (position, distance, angle and header tag), goal outcome and lookup names
+shots_model_df = xgf.wyscout_shot_features(event_data, player_data, team_data, competition_data,
+                                           match_data).reset_index(drop=True)
 
 
 #%% Train a neural network
@@ -115,31 +77,12 @@ shots_model_df['xG'] = neural_net.predict([X])[:,1]
 
 # %% Save xG data
 
-with bz2.BZ2File("../../data_directory/misc_data/neural_net_xg_data.pbz2", "wb") as f:
-    pickle.dump(shots_model_df, f)
+dcd.save_object(shots_model_df, "../../data_directory/misc_data/neural_net_xg_data.pbz2")
 
 #%% Create an xG test-set, and predict on test set
 
-# Initialise dataframes for ground and header test sets
-X_test_grnd = pd.DataFrame(columns = ['xpos','cpos','distance','angle','header_tag'], dtype='float64')
-X_test_head = pd.DataFrame(columns = ['xpos','cpos','distance','angle','header_tag'], dtype='float64')
-i = 0
-
-# Create array of shots
-for x_pos in range(0,int(PITCH_LENGTH_X/2 + 1)):
-    for y_pos in range(0, int(PITCH_WIDTH_Y + 1)):
-        c_pos = y_pos - PITCH_WIDTH_Y/2
-        angle_denominator = (x_pos**2 + c_pos**2 - (GOAL_WIDTH_Y/2)**2)
-        if angle_denominator == 0:
-            angle = np.pi/2
-        else:
-            angle = np.arctan(2*(GOAL_WIDTH_Y/2)*x_pos/angle_denominator)
-        if angle < 0:
-            angle = np.pi + angle
-        distance = np.sqrt(x_pos**2 + c_pos**2)
-        X_test_grnd.loc[i,:] = [x_pos, c_pos, distance, angle, 0]
-        X_test_head.loc[i,:] = [x_pos, c_pos, distance, angle, 1]
-        i += 1
+# Calculate features for a grid of ground and header shots across the attacking half
+X_test_grnd, X_test_head = xgf.shot_feature_grid()
 
 prob_goal_grnd = neural_net.predict([X_test_grnd])[:,1].reshape(int(1+PITCH_LENGTH_X/2),int(1+PITCH_WIDTH_Y))
 prob_goal_head = neural_net.predict([X_test_head])[:,1].reshape(int(1+PITCH_LENGTH_X/2),int(1+PITCH_WIDTH_Y))
@@ -9,8 +9,6 @@ from PIL import Image
 from mplsoccer.pitch import VerticalPitch
 import os
 import sys
-import bz2
-import pickle
 import numpy as np
 from collections import Counter
 
@@ -29,6 +27,7 @@ sys.path.append(root_folder)
 import analysis_tools.whoscored_custom_events as wce
 import analysis_tools.pitch_zones as pz
 import analysis_tools.whoscored_data_engineering as wde
+import analysis_tools.whoscored_data_storage as wds
 import analysis_tools.logos_and_badges as lab
 
 # %% User inputs
@@ -78,10 +77,8 @@ leagues = {'EPL': 'Premier League', 'La_Liga': 'La Liga', 'Bundesliga': 'Bundesl
 
 # Opta data
 
-events_df = bz2.BZ2File(f"../../data_directory/whoscored_data/{year}_{str(int(year.replace('20','')) + 1)}/{league}/match-eventdata-{match_id}-{home_team}-{away_team}.pbz2", 'rb')
-events_df = pickle.load(events_df)
-players_df = bz2.BZ2File(f"../../data_directory/whoscored_data/{year}_{str(int(year.replace('20','')) + 1)}/{league}/match-playerdata-{match_id}-{home_team}-{away_team}.pbz2", 'rb')
-players_df = pickle.load(players_df)
+events_df, players_df, event_types, formation_mapping = wds.load_season_files(league, year,
+                                                                                filters={'match_id': int(match_id)})
 
 # %% Calculate Scoreline (special accounting for own goals)
 
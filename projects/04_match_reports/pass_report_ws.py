@@ -20,8 +20,6 @@ from PIL import Image
 from mplsoccer.pitch import VerticalPitch
 import os
 import sys
-import bz2
-import pickle
 import numpy as np
 from collections import Counter
 
@@ -40,6 +38,7 @@ sys.path.append(root_folder)
 import analysis_tools.whoscored_custom_events as wce
 import analysis_tools.pitch_zones as pz
 import analysis_tools.whoscored_data_engineering as wde
+import analysis_tools.whoscored_data_storage as wds
 import analysis_tools.logos_and_badges as lab
 
 # %% User inputs
@@ -84,12 +83,8 @@ cmaps = [home_colourmap, away_colourmap]
 
 # Opta data
 
-events_df = bz2.BZ2File(f"../../data_directory/whoscored_data/{year}_{str(int(year.replace('20','')) + 1)}/{league}/match-eventdata-{match_id}-{home_team}-{away_team}.pbz2", 'rb')
-events_df = pickle.load(events_df)
-players_df = bz2.BZ2File(f"../../data_directory/whoscored_data/{year}_{str(int(year.replace('20','')) + 1)}/{league}/match-playerdata-{match_id}-{home_team}-{away_team}.pbz2", 'rb')
-players_df = pickle.load(players_df)
-#event_types = bz2.BZ2File(f"../../data_directory/whoscored_data/{year}_{str(int(year.replace('20','')) + 1)}/{league}/event-types.pbz2", 'rb')
-#event_types = pickle.load(event_types)
+events_df, players_df, event_types, formation_mapping = wds.load_season_files(league, year,
+                                                                                filters={'match_id': int(match_id)})
 
 # %% Calculate Scoreline (special accounting for own goals)
 
@@ -899,70 +894,70 @@ ax2.set_ylim(0, 1)
 ax2.axis("off")
 
 # Calculate stats
-h_pass_pct = round(100*protected_divide(playerinfo_df.groupby(by='team', axis=0).sum().loc[home_team,:]['suc_passes'], playerinfo_df.groupby(by='team', axis=0).sum().loc[home_team,:]['passes']), 1)
-h_fwd_pct = round(100*protected_divide(playerinfo_df.groupby(by='team', axis=0).sum().loc[home_team,:]['suc_fwd_passes'], playerinfo_df.groupby(by='team', axis=0).sum().loc[home_team,:]['fwd_passes']), 1)
-h_prog_pct = round(100*protected_divide(playerinfo_df.groupby(by='team', axis=0).sum().loc[home_team,:]['suc_prog_passes'], playerinfo_df.groupby(by='team', axis=0).sum().loc[home_team,:]['prog_passes']), 1)
-h_cross_pct = round(100*protected_divide(playerinfo_df.groupby(by='team', axis=0).sum().loc[home_team,:]['suc_crosses'], playerinfo_df.groupby(by='team', axis=0).sum().loc[home_team,:]['crosses']), 1)
-h_long_ball_pct = round(100*protected_divide(playerinfo_df.groupby(by='team', axis=0).sum().loc[home_team,:]['suc_long_balls'], playerinfo_df.groupby(by='team', axis=0).sum().loc[home_team,:]['long_balls']), 1)
-h_through_ball_pct = round(100*protected_divide(playerinfo_df.groupby(by='team', axis=0).sum().loc[home_team,:]['suc_through_balls'], playerinfo_df.groupby(by='team', axis=0).sum().loc[home_team,:]['through_balls']), 1)
-a_pass_pct = round(100*protected_divide(playerinfo_df.groupby(by='team', axis=0).sum().loc[away_team,:]['suc_passes'], playerinfo_df.groupby(by='team', axis=0).sum().loc[away_team,:]['passes']), 1)
-a_fwd_pct = round(100*protected_divide(playerinfo_df.groupby(by='team', axis=0).sum().loc[away_team,:]['suc_fwd_passes'], playerinfo_df.groupby(by='team', axis=0).sum().loc[away_team,:]['fwd_passes']), 1)
-a_prog_pct = round(100*protected_divide(playerinfo_df.groupby(by='team', axis=0).sum().loc[away_team,:]['suc_prog_passes'], playerinfo_df.groupby(by='team', axis=0).sum().loc[away_team,:]['prog_passes']), 1)
-a_cross_pct = round(100*protected_divide(playerinfo_df.groupby(by='team', axis=0).sum().loc[away_team,:]['suc_crosses'], playerinfo_df.groupby(by='team', axis=0).sum().loc[away_team,:]['crosses']), 1)
-a_long_ball_pct = round(100*protected_divide(playerinfo_df.groupby(by='team', axis=0).sum().loc[away_team,:]['suc_long_balls'], playerinfo_df.groupby(by='team', axis=0).sum().loc[away_team,:]['long_balls']), 1)
-a_through_ball_pct = round(100*protected_divide(playerinfo_df.groupby(by='team', axis=0).sum().loc[away_team,:]['suc_through_balls'], playerinfo_df.groupby(by='team', axis=0).sum().loc[away_team,:]['through_balls']), 1)
+h_pass_pct = round(100*protected_divide(playerinfo_df.groupby(by='team').sum().loc[home_team,:]['suc_passes'], playerinfo_df.groupby(by='team').sum().loc[home_team,:]['passes']), 1)
+h_fwd_pct = round(100*protected_divide(playerinfo_df.groupby(by='team').sum().loc[home_team,:]['suc_fwd_passes'], playerinfo_df.groupby(by='team').sum().loc[home_team,:]['fwd_passes']), 1)
+h_prog_pct = round(100*protected_divide(playerinfo_df.groupby(by='team').sum().loc[home_team,:]['suc_prog_passes'], playerinfo_df.groupby(by='team').sum().loc[home_team,:]['prog_passes']), 1)
+h_cross_pct = round(100*protected_divide(playerinfo_df.groupby(by='team').sum().loc[home_team,:]['suc_crosses'], playerinfo_df.groupby(by='team').sum().loc[home_team,:]['crosses']), 1)
+h_long_ball_pct = round(100*protected_divide(playerinfo_df.groupby(by='team').sum().loc[home_team,:]['suc_long_balls'], playerinfo_df.groupby(by='team').sum().loc[home_team,:]['long_balls']), 1)
+h_through_ball_pct = round(100*protected_divide(playerinfo_df.groupby(by='team').sum().loc[home_team,:]['suc_through_balls'], playerinfo_df.groupby(by='team').sum().loc[home_team,:]['through_balls']), 1)
+a_pass_pct = round(100*protected_divide(playerinfo_df.groupby(by='team').sum().loc[away_team,:]['suc_passes'], playerinfo_df.groupby(by='team').sum().loc[away_team,:]['passes']), 1)
+a_fwd_pct = round(100*protected_divide(playerinfo_df.groupby(by='team').sum().loc[away_team,:]['suc_fwd_passes'], playerinfo_df.groupby(by='team').sum().loc[away_team,:]['fwd_passes']), 1)
+a_prog_pct = round(100*protected_divide(playerinfo_df.groupby(by='team').sum().loc[away_team,:]['suc_prog_passes'], playerinfo_df.groupby(by='team').sum().loc[away_team,:]['prog_passes']), 1)
+a_cross_pct = round(100*protected_divide(playerinfo_df.groupby(by='team').sum().loc[away_team,:]['suc_crosses'], playerinfo_df.groupby(by='team').sum().loc[away_team,:]['crosses']), 1)
+a_long_ball_pct = round(100*protected_divide(playerinfo_df.groupby(by='team').sum().loc[away_team,:]['suc_long_balls'], playerinfo_df.groupby(by='team').sum().loc[away_team,:]['long_balls']), 1)
+a_through_ball_pct = round(100*protected_divide(playerinfo_df.groupby(by='team').sum().loc[away_team,:]['suc_through_balls'], playerinfo_df.groupby(by='team').sum().loc[away_team,:]['through_balls']), 1)
 
 # Overall stats
 ax1.text(0.56, 0.85, "Tot.     Suc.   %Acc", fontweight = "bold", color="white")
 ax1.text(0.04, 0.65, "All Passes:", fontsize=10, color="white")
-ax1.text(0.6, 0.65, int(playerinfo_df.groupby(by='team', axis=0).sum().loc[home_team,:]['passes']), fontsize=10, color="white", ha = "center")
-ax1.text(0.775, 0.65, int(playerinfo_df.groupby(by='team', axis=0).sum().loc[home_team,:]['suc_passes']), fontsize=10, color="white", ha = "center")
+ax1.text(0.6, 0.65, int(playerinfo_df.groupby(by='team').sum().loc[home_team,:]['passes']), fontsize=10, color="white", ha = "center")
+ax1.text(0.775, 0.65, int(playerinfo_df.groupby(by='team').sum().loc[home_team,:]['suc_passes']), fontsize=10, color="white", ha = "center")
 ax1.text(0.95, 0.65, str(h_pass_pct) + "%", fontsize=10, color="white", ha = "center")
 ax1.text(0.04, 0.52, "Forward Passes:", fontsize=10,  color="white")
-ax1.text(0.6, 0.52, int(playerinfo_df.groupby(by='team', axis=0).sum().loc[home_team,:]['fwd_passes']), fontsize=10, color="white", ha = "center")
-ax1.text(0.775, 0.52, int(playerinfo_df.groupby(by='team', axis=0).sum().loc[home_team,:]['suc_fwd_passes']), fontsize=10, color="white", ha = "center")
+ax1.text(0.6, 0.52, int(playerinfo_df.groupby(by='team').sum().loc[home_team,:]['fwd_passes']), fontsize=10, color="white", ha = "center")
+ax1.text(0.775, 0.52, int(playerinfo_df.groupby(by='team').sum().loc[home_team,:]['suc_fwd_passes']), fontsize=10, color="white", ha = "center")
 ax1.text(0.95, 0.52, str(h_fwd_pct) + "%", fontsize=10, color="white", ha = "center")
 ax1.text(0.04, 0.39, "Progressive Passes:", fontsize=10,  color="white")
-ax1.text(0.6, 0.39, int(playerinfo_df.groupby(by='team', axis=0).sum().loc[home_team,:]['prog_passes']), fontsize=10, color="white", ha = "center")
-ax1.text(0.775, 0.39, int(playerinfo_df.groupby(by='team', axis=0).sum().loc[home_team,:]['suc_prog_passes']), fontsize=10, color="white", ha = "center")
+ax1.text(0.6, 0.39, int(playerinfo_df.groupby(by='team').sum().loc[home_team,:]['prog_passes']), fontsize=10, color="white", ha = "center")
+ax1.text(0.775, 0.39, int(playerinfo_df.groupby(by='team').sum().loc[home_team,:]['suc_prog_passes']), fontsize=10, color="white", ha = "center")
 ax1.text(0.95, 0.39, str(h_prog_pct) + "%", fontsize=10, color="white", ha = "center")
 ax1.text(0.04, 0.26, "Crosses:", fontsize=10,  color="white")
-ax1.text(0.6, 0.26, int(playerinfo_df.groupby(by='team', axis=0).sum().loc[home_team,:]['crosses']), fontsize=10, color="white", ha = "center")
-ax1.text(0.775, 0.26, int(playerinfo_df.groupby(by='team', axis=0).sum().loc[home_team,:]['suc_crosses']), fontsize=10, color="white", ha = "center")
+ax1.text(0.6, 0.26, int(playerinfo_df.groupby(by='team').sum().loc[home_team,:]['crosses']), fontsize=10, color="white", ha = "center")
+ax1.text(0.775, 0.26, int(playerinfo_df.groupby(by='team').sum().loc[home_team,:]['suc_crosses']), fontsize=10, color="white", ha = "center")
 ax1.text(0.95, 0.26, str(h_cross_pct) + "%", fontsize=10, color="white", ha = "center")
 ax1.text(0.04, 0.13, "Long Balls:", fontsize=10,  color="white")
-ax1.text(0.6, 0.13, int(playerinfo_df.groupby(by='team', axis=0).sum().loc[home_team,:]['long_balls']), fontsize=10, color="white", ha = "center")
-ax1.text(0.775, 0.13, int(playerinfo_df.groupby(by='team', axis=0).sum().loc[home_team,:]['suc_long_balls']), fontsize=10, color="white", ha = "center")
+ax1.text(0.6, 0.13, int(playerinfo_df.groupby(by='team').sum().loc[home_team,:]['long_balls']), fontsize=10, color="white", ha = "center")
+ax1.text(0.775, 0.13, int(playerinfo_df.groupby(by='team').sum().loc[home_team,:]['suc_long_balls']), fontsize=10, color="white", ha = "center")
 ax1.text(0.95, 0.13, str(h_long_ball_pct) + "%", fontsize=10, color="white", ha = "center")
 ax1.text(0.04, 0, "Through Balls:", fontsize=10,  color="white")
-ax1.text(0.6, 0, int(playerinfo_df.groupby(by='team', axis=0).sum().loc[home_team,:]['through_balls']), fontsize=10, color="white", ha = "center")
-ax1.text(0.775, 0, int(playerinfo_df.groupby(by='team', axis=0).sum().loc[home_team,:]['suc_through_balls']), fontsize=10, color="white", ha = "center")
+ax1.text(0.6, 0, int(playerinfo_df.groupby(by='team').sum().loc[home_team,:]['through_balls']), fontsize=10, color="white", ha = "center")
+ax1.text(0.775, 0, int(playerinfo_df.groupby(by='team').sum().loc[home_team,:]['suc_through_balls']), fontsize=10, color="white", ha = "center")
 ax1.text(0.95, 0, str(h_through_ball_pct) + "%", fontsize=10, color="white", ha = "center")
 ax1.plot([0.56, 1], [0.8, 0.8], color = "w", lw=1)
 ax2.text(0.56, 0.85, "Tot.     Suc.   %Acc.", fontweight = "bold", color="white")
 ax2.text(0.04, 0.65, "All Passes:", fontsize=10,  color="white")
-ax2.text(0.6, 0.65, int(playerinfo_df.groupby(by='team', axis=0).sum().loc[away_team,:]['passes']), fontsize=10, color="white", ha = "center")
-ax2.text(0.775, 0.65, int(playerinfo_df.groupby(by='team', axis=0).sum().loc[away_team,:]['suc_passes']), fontsize=10, color="white", ha = "center")
+ax2.text(0.6, 0.65, int(playerinfo_df.groupby(by='team').sum().loc[away_team,:]['passes']), fontsize=10, color="white", ha = "center")
+ax2.text(0.775, 0.65, int(playerinfo_df.groupby(by='team').sum().loc[away_team,:]['suc_passes']), fontsize=10, color="white", ha = "center")
 ax2.text(0.95, 0.65, str(a_pass_pct) + "%", fontsize=10, color="white", ha = "center")
 ax2.text(0.04, 0.52, "Forward Passes:", fontsize=10,  color="white")
-ax2.text(0.6, 0.52, int(playerinfo_df.groupby(by='team', axis=0).sum().loc[away_team,:]['fwd_passes']), fontsize=10, color="white", ha = "center")
-ax2.text(0.775, 0.52, int(playerinfo_df.groupby(by='team', axis=0).sum().loc[away_team,:]['suc_fwd_passes']), fontsize=10, color="white", ha = "center")
+ax2.text(0.6, 0.52, int(playerinfo_df.groupby(by='team').sum().loc[away_team,:]['fwd_passes']), fontsize=10, color="white", ha = "center")
+ax2.text(0.775, 0.52, int(playerinfo_df.groupby(by='team').sum().loc[away_team,:]['suc_fwd_passes']), fontsize=10, color="white", ha = "center")
 ax2.text(0.95, 0.52, str(a_fwd_pct) + "%", fontsize=10, color="white", ha = "center")
 ax2.text(0.04, 0.39, "Progressive Passes:", fontsize=10,  color="white")
-ax2.text(0.6, 0.39, int(playerinfo_df.groupby(by='team', axis=0).sum().loc[away_team,:]['prog_passes']), fontsize=10, color="white", ha = "center")
-ax2.text(0.775, 0.39, int(playerinfo_df.groupby(by='team', axis=0).sum().loc[away_team,:]['suc_prog_passes']), fontsize=10, color="white", ha = "center")
+ax2.text(0.6, 0.39, int(playerinfo_df.groupby(by='team').sum().loc[away_team,:]['prog_passes']), fontsize=10, color="white", ha = "center")
+ax2.text(0.775, 0.39, int(playerinfo_df.groupby(by='team').sum().loc[away_team,:]['suc_prog_passes']), fontsize=10, color="white", ha = "center")
 ax2.text(0.95, 0.39, str(a_prog_pct) + "%", fontsize=10, color="white", ha = "center")
 ax2.text(0.04, 0.26, "Crosses:", fontsize=10,  color="white")
-ax2.text(0.6, 0.26, int(playerinfo_df.groupby(by='team', axis=0).sum().loc[away_team,:]['crosses']), fontsize=10, color="white", ha = "center")
-ax2.text(0.775, 0.26, int(playerinfo_df.groupby(by='team', axis=0).sum().loc[away_team,:]['suc_crosses']), fontsize=10, color="white", ha = "center")
+ax2.text(0.6, 0.26, int(playerinfo_df.groupby(by='team').sum().loc[away_team,:]['crosses']), fontsize=10, color="white", ha = "center")
+ax2.text(0.775, 0.26, int(playerinfo_df.groupby(by='team').sum().loc[away_team,:]['suc_crosses']), fontsize=10, color="white", ha = "center")
 ax2.text(0.95, 0.26, str(a_cross_pct) + "%", fontsize=10, color="white", ha = "center")
 ax2.text(0.04, 0.13, "Long Balls:", fontsize=10,  color="white")
-ax2.text(0.6, 0.13, int(playerinfo_df.groupby(by='team', axis=0).sum().loc[away_team,:]['long_balls']), fontsize=10, color="white", ha = "center")
-ax2.text(0.775, 0.13, int(playerinfo_df.groupby(by='team', axis=0).sum().loc[away_team,:]['suc_long_balls']), fontsize=10, color="white", ha = "center")
+ax2.text(0.6, 0.13, int(playerinfo_df.groupby(by='team').sum().loc[away_team,:]['long_balls']), fontsize=10, color="white", ha = "center")
+ax2.text(0.775, 0.13, int(playerinfo_df.groupby(by='team').sum().loc[away_team,:]['suc_long_balls']), fontsize=10, color="white", ha = "center")
 ax2.text(0.95, 0.13, str(a_long_ball_pct) + "%", fontsize=10, color="white", ha = "center")
 ax2.text(0.04, 0, "Through Balls:", fontsize=10,  color="white")
-ax2.text(0.6, 0, int(playerinfo_df.groupby(by='team', axis=0).sum().loc[away_team,:]['through_balls']), fontsize=10, color="white", ha = "center")
-ax2.text(0.775, 0, int(playerinfo_df.groupby(by='team', axis=0).sum().loc[away_team,:]['suc_through_balls']), fontsize=10, color="white", ha = "center")
+ax2.text(0.6, 0, int(playerinfo_df.groupby(by='team').sum().loc[away_team,:]['through_balls']), fontsize=10, color="white", ha = "center")
+ax2.text(0.775, 0, int(playerinfo_df.groupby(by='team').sum().loc[away_team,:]['suc_through_balls']), fontsize=10, color="white", ha = "center")
 ax2.text(0.95, 0, str(a_through_ball_pct) + "%", fontsize=10, color="white", ha = "center")
 ax2.plot([0.56, 1], [0.8, 0.8], color = "w", lw=1)
 
@@ -27,8 +27,6 @@ from PIL import Image, ImageEnhance
 import adjustText
 import os
 import sys
-import bz2
-import pickle
 import numpy as np
 import highlight_text as htext
 import glob
@@ -42,6 +40,7 @@ sys.path.append(root_folder)
 
 import analysis_tools.whoscored_custom_events as wce
 import analysis_tools.whoscored_data_engineering as wde
+import analysis_tools.whoscored_data_storage as wds
 import analysis_tools.logos_and_badges as lab
 
 # %% User inputs
@@ -81,31 +80,7 @@ leagues = {'EPL': 'Premier League', 'La_Liga': 'La Liga', 'Bundesliga': 'Bundesl
 
 # %% Get data
 
-file_path = f"../../data_directory/whoscored_data/{year}_{str(int(year.replace('20','')) + 1)}/{league}"
-files = os.listdir(file_path)
-
-# Initialise storage dataframes
-events_df = pd.DataFrame()
-players_df = pd.DataFrame()
-
-# Load data
-for file in files:
-    if file == 'event-types.pbz2':
-        event_types = bz2.BZ2File(f"{file_path}/{file}", 'rb')
-        event_types = pickle.load(event_types)
-    elif file == 'formation-mapping.pbz2':
-        formation_mapping = bz2.BZ2File(f"{file_path}/{file}", 'rb')
-        formation_mapping = pickle.load(formation_mapping)
-    elif '-eventdata-' in file:
-        match_events = bz2.BZ2File(f"{file_path}/{file}", 'rb')
-        match_events = pickle.load(match_events)
-        events_df = pd.concat([events_df, match_events])
-    elif '-playerdata-' in file:
-        match_players = bz2.BZ2File(f"{file_path}/{file}", 'rb')
-        match_players = pickle.load(match_players)
-        players_df = pd.concat([players_df, match_players])
-    else:
-        pass
+events_df, players_df, event_types, formation_mapping = wds.load_season_files(league, year)
 
 # %% Pre-process data
 
@@ -125,8 +100,8 @@ players_df = wde.longest_xi(players_df)
 players_df = wde.events_while_playing(events_df, players_df, event_name = 'Pass', event_team = 'own')
 
 # Add progressive pass and box entry information to event dataframe
-events_df['progressive_action'] = events_df.apply(wce.progressive_action, axis=1, inplay = True, successful_only = False)
-events_df['into_box'] = events_df.apply(wce.box_entry, axis=1, inplay = True, successful_only = False)
+events_df['progressive_action'] = wce.progressive_actions(events_df, inplay=True, successful_only=False)
+events_df['into_box'] = wce.box_entries(events_df, inplay=True, successful_only=False)
 
 # Determine substitute positions (TBC)
 #for idx, player in players_df.iterrows():
@@ -138,71 +113,53 @@ events_df['into_box'] = events_df.apply(wce.box_entry, axis=1, inplay = True, su
 
 playerinfo_df = wde.create_player_list(players_df, additional_cols = ['team_pass'])
 
-# Passes and total xT
-all_passes = events_df[(events_df['eventType']=='Pass') & (~events_df['satisfiedEventsTypes'].apply(lambda x: 31 in x or 32 in x or 33 in x or 34 in x or 212 in x))]
-playerinfo_df = wde.group_player_events(all_passes, playerinfo_df, primary_event_name='passes')
-playerinfo_df = wde.group_player_events(all_passes, playerinfo_df, group_type='sum', event_types = ['xThreat', 'xThreat_gen'])
-
-# Successful passes
-suc_passes = all_passes[all_passes['outcomeType']=='Successful']
-playerinfo_df = wde.group_player_events(suc_passes, playerinfo_df, primary_event_name='suc_passes')
-
-# Progressive passes
-prog_passes = all_passes[all_passes['progressive_action']==True]
-playerinfo_df = wde.group_player_events(prog_passes, playerinfo_df, primary_event_name='prog_passes')
-suc_prog_passes = prog_passes[prog_passes['outcomeType']=='Successful']
-playerinfo_df = wde.group_player_events(suc_prog_passes, playerinfo_df, primary_event_name='suc_prog_passes')
-
-# Successful progressive passes in opposition half
-opphalf_prog_pass = suc_prog_passes[suc_prog_passes['x'] > 50]
-playerinfo_df = wde.group_player_events(opphalf_prog_pass, playerinfo_df, primary_event_name='opphalf_prog_passes')
-
-# Forward passes
-forward_passes = all_passes[all_passes['endX'] > all_passes['x']]
-playerinfo_df = wde.group_player_events(forward_passes, playerinfo_df, primary_event_name='fwd_passes')
-suc_forward_passes = forward_passes[forward_passes['outcomeType']=='Successful']
-playerinfo_df = wde.group_player_events(suc_forward_passes, playerinfo_df, primary_event_name='suc_fwd_passes')
-
-# Crosses
-crosses = all_passes[all_passes['satisfiedEventsTypes'].apply(lambda x: 125 in x or 126 in x)]
-playerinfo_df = wde.group_player_events(crosses, playerinfo_df, primary_event_name='crosses')
-suc_crosses = all_passes[all_passes['satisfiedEventsTypes'].apply(lambda x: 125 in x)]
-playerinfo_df = wde.group_player_events(suc_crosses, playerinfo_df, primary_event_name='suc_crosses')
-
-# Through balls
-through_balls = all_passes[all_passes['satisfiedEventsTypes'].apply(lambda x: 129 in x or 130 in x or 131 in x)]
-playerinfo_df = wde.group_player_events(through_balls, playerinfo_df, primary_event_name='through_balls')
-suc_through_balls = all_passes[all_passes['satisfiedEventsTypes'].apply(lambda x: 129 in x)]
-playerinfo_df = wde.group_player_events(suc_through_balls, playerinfo_df, primary_event_name='suc_through_balls')
-
-# Long balls
-long_balls = all_passes[all_passes['satisfiedEventsTypes'].apply(lambda x: 127 in x or 128 in x)]
-playerinfo_df = wde.group_player_events(long_balls, playerinfo_df, primary_event_name='long_balls')
-suc_long_balls = all_passes[all_passes['satisfiedEventsTypes'].apply(lambda x: 127 in x)]
-playerinfo_df = wde.group_player_events(suc_long_balls, playerinfo_df, primary_event_name='suc_long_balls')
-
-# Key passes
-key_passes = all_passes[all_passes['satisfiedEventsTypes'].apply(lambda x: 123 in x)]
-playerinfo_df = wde.group_player_events(key_passes, playerinfo_df, primary_event_name='key_passes')
-
-# Key progressive passes
-key_prog_passes = suc_prog_passes[suc_prog_passes['satisfiedEventsTypes'].apply(lambda x: 123 in x)]
-playerinfo_df = wde.group_player_events(key_prog_passes, playerinfo_df, primary_event_name='key_prog_passes')
-
-# Assists
-assists = all_passes[all_passes['satisfiedEventsTypes'].apply(lambda x: 92 in x)]
-touch_assists = events_df[(events_df['eventType']!='Pass') & (events_df['satisfiedEventsTypes'].apply(lambda x: 92 in x))]
-playerinfo_df = wde.group_player_events(assists, playerinfo_df, primary_event_name='assists')
-
-# Pre assists
-pre_assists = all_passes[all_passes['pre_assist']==True]
-playerinfo_df = wde.group_player_events(pre_assists, playerinfo_df, primary_event_name='pre_assists')
-
-# Passes into opposition box
-box_passes = all_passes[all_passes['into_box'] == True]
-playerinfo_df = wde.group_player_events(box_passes, playerinfo_df, primary_event_name='box_passes')
-suc_box_passes = box_passes[box_passes['outcomeType']=='Successful']
-playerinfo_df = wde.group_player_events(suc_box_passes, playerinfo_df, primary_event_name='suc_box_passes')
+# Pass selections (excluding set pieces)
+pass_mask = (events_df['eventType'] == 'Pass') & ~wde.has_any(events_df, [31, 32, 33, 34, 212])
+suc_pass_mask = pass_mask & (events_df['outcomeType'] == 'Successful')
+prog_pass_mask = pass_mask & (events_df['progressive_action'] == True)
+suc_prog_pass_mask = prog_pass_mask & (events_df['outcomeType'] == 'Successful')
+fwd_pass_mask = pass_mask & (events_df['endX'] > events_df['x'])
+box_pass_mask = pass_mask & (events_df['into_box'] == True)
+
+playerinfo_df = wde.aggregate_players(events_df, playerinfo_df, {
+    # Passes and total xT
+    'passes': (pass_mask, 'count'),
+    'xThreat': (pass_mask, 'xThreat', 'sum'),
+    'xThreat_gen': (pass_mask, 'xThreat_gen', 'sum'),
+    # Successful passes
+    'suc_passes': (suc_pass_mask, 'count'),
+    # Progressive passes, and successful progressive passes in opposition half
+    'prog_passes': (prog_pass_mask, 'count'),
+    'suc_prog_passes': (suc_prog_pass_mask, 'count'),
+    'opphalf_prog_passes': (suc_prog_pass_mask & (events_df['x'] > 50), 'count'),
+    # Forward passes
+    'fwd_passes': (fwd_pass_mask, 'count'),
+    'suc_fwd_passes': (fwd_pass_mask & (events_df['outcomeType'] == 'Successful'), 'count'),
+    # Crosses
+    'crosses': (pass_mask & wde.has_any(events_df, [125, 126]), 'count'),
+    'suc_crosses': (pass_mask & wde.has_any(events_df, 125), 'count'),
+    # Through balls
+    'through_balls': (pass_mask & wde.has_any(events_df, [129, 130, 131]), 'count'),
+    'suc_through_balls': (pass_mask & wde.has_any(events_df, 129), 'count'),
+    # Long balls
+    'long_balls': (pass_mask & wde.has_any(events_df, [127, 128]), 'count'),
+    'suc_long_balls': (pass_mask & wde.has_any(events_df, 127), 'count'),
+    # Key passes and key progressive passes
+    'key_passes': (pass_mask & wde.has_any(events_df, 123), 'count'),
+    'key_prog_passes': (suc_prog_pass_mask & wde.has_any(events_df, 123), 'count'),
+    # Assists and pre assists
+    'assists': (pass_mask & wde.has_any(events_df, 92), 'count'),
+    'pre_assists': (pass_mask & (events_df['pre_assist'] == True), 'count'),
+    # Passes into opposition box
+    'box_passes': (box_pass_mask, 'count'),
+    'suc_box_passes': (box_pass_mask & (events_df['outcomeType'] == 'Successful'), 'count')})
+
+# Pass events used within plots
+suc_passes = events_df[suc_pass_mask]
+suc_prog_passes = events_df[suc_prog_pass_mask]
+key_prog_passes = events_df[suc_prog_pass_mask & wde.has_any(events_df, 123)]
+assists = events_df[pass_mask & wde.has_any(events_df, 92)]
+touch_assists = events_df[(events_df['eventType'] != 'Pass') & wde.has_any(events_df, 92)]
 
 # %% Calculate statistics as percentages and per 90 mins
 
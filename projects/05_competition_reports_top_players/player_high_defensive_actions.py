@@ -19,8 +19,6 @@ from PIL import Image, ImageEnhance
 from mplsoccer.pitch import VerticalPitch, Pitch
 import os
 import sys
-import bz2
-import pickle
 import numpy as np
 from collections import Counter
 import highlight_text as htext
@@ -41,6 +39,7 @@ sys.path.append(root_folder)
 import analysis_tools.whoscored_custom_events as wce
 import analysis_tools.pitch_zones as pz
 import analysis_tools.whoscored_data_engineering as wde
+import analysis_tools.whoscored_data_storage as wds
 import analysis_tools.logos_and_badges as lab
 
 # %% User inputs
@@ -76,31 +75,7 @@ comp_logo = lab.get_competition_logo(league, year=year, logo_brighten=logo_brigh
 
 # %% Get data
 
-file_path = f"../../data_directory/whoscored_data/{year}_{str(int(year.replace('20','')) + 1)}/{league}"
-files = os.listdir(file_path)
-
-# Initialise storage dataframes
-events_df = pd.DataFrame()
-players_df = pd.DataFrame()
-
-# Load data
-for file in files:
-    if file == 'event-types.pbz2':
-        event_types = bz2.BZ2File(f"{file_path}/{file}", 'rb')
-        event_types = pickle.load(event_types)
-    elif file == 'formation-mapping.pbz2':
-        formation_mapping = bz2.BZ2File(f"{file_path}/{file}", 'rb')
-        formation_mapping = pickle.load(formation_mapping)
-    elif '-eventdata-' in file:
-        match_events = bz2.BZ2File(f"{file_path}/{file}", 'rb')
-        match_events = pickle.load(match_events)
-        events_df = pd.concat([events_df, match_events])
-    elif '-playerdata-' in file:
-        match_players = bz2.BZ2File(f"{file_path}/{file}", 'rb')
-        match_players = pickle.load(match_players)
-        players_df = pd.concat([players_df, match_players])
-    else:
-        pass
+events_df, players_df, event_types, formation_mapping = wds.load_season_files(league, year)
 
 # %% Pre-process data
 
@@ -113,12 +88,11 @@ players_df = wde.minutes_played(players_df, events_df)
 # Calculate longest consistent xi
 players_df = wde.longest_xi(players_df)
 
-# Calculate opposition half pass events that each player faces per game
-players_df =  wde.events_while_playing(events_df[events_df['x']<= 34], players_df, event_name = 'Pass', event_team = 'opposition')#['opp_pass']
-players_df['oppthird_opp_pass'] = players_df['opp_pass']
-
-# Calculate pass events that each player faces per game
-players_df = wde.events_while_playing(events_df, players_df, event_name = 'Pass', event_team = 'opposition')
+# Calculate pass events, and opposition third pass events, that each player faces per game
+players_df = wde.events_while_playing(events_df, players_df,
+                                      event_specs=[{'event_name': 'Pass', 'event_team': 'opposition',
+                                                    'x_range': (None, 34), 'column': 'oppthird_opp_pass'},
+                                                   {'event_name': 'Pass', 'event_team': 'opposition'}])
 
 # %% Aggregate data per player
 
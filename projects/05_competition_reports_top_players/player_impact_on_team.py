@@ -15,8 +15,6 @@ from PIL import Image, ImageEnhance
 import adjustText
 import os
 import sys
-import bz2
-import pickle
 import numpy as np
 import highlight_text as htext
 import glob
@@ -34,6 +32,7 @@ sys.path.append(root_folder)
 import analysis_tools.whoscored_custom_events as wce
 import analysis_tools.whoscored_data_engineering as wde
 import analysis_tools.logos_and_badges as lab
+import analysis_tools.whoscored_data_storage as wds
 
 # %% User inputs
 
@@ -67,32 +66,17 @@ leagues = {'EPL': 'Premier League', 'La_Liga': 'La Liga', 'Bundesliga': 'Bundesl
 
 # %% Get data
 
-file_path = f"../../data_directory/whoscored_data/{year}_{str(int(year.replace('20','')) + 1)}/{league}"
-files = os.listdir(file_path)
-
-# Initialise storage dataframes
-events_df = pd.DataFrame()
-players_df = pd.DataFrame()
-
-# Load data
-for file in files:
-    if file == 'event-types.pbz2':
-        event_types = bz2.BZ2File(f"{file_path}/{file}", 'rb')
-        event_types = pickle.load(event_types)
-    elif file == 'formation-mapping.pbz2':
-        formation_mapping = bz2.BZ2File(f"{file_path}/{file}", 'rb')
-        formation_mapping = pickle.load(formation_mapping)
-    elif '-eventdata-' in file:
-        match_events = bz2.BZ2File(f"{file_path}/{file}", 'rb')
-        match_events = pickle.load(match_events)
-        events_df = pd.concat([events_df, match_events])
-    elif '-playerdata-' in file:
-        match_players = bz2.BZ2File(f"{file_path}/{file}", 'rb')
-        match_players = pickle.load(match_players)
-        players_df = pd.concat([players_df, match_players])
-    else:
-        pass
+# Flag in-play events once per match, when match is first loaded
+def flag_in_play(match_events, match_players):
+    match_events['in_play'] = ~wde.has_any(match_events, [48, 50, 51, 42, 44, 45, 31, 34, 212])
+    return match_events, match_players
 
+# Matches are loaded lazily and cached, while player data is loaded for all matches
+dataset = wds.SeasonDataset(league, year, match_transform=flag_in_play,
+                            data_folder="../../data_directory/whoscored_data")
+players_df = dataset.players()
+event_types = dataset.event_types
+formation_mapping = dataset.formation_mapping
 
 # %% Build dictionary of players that have been in the matchday squad for each team
 
@@ -109,43 +93,42 @@ for team_id in playerinfo_df['teamId'].unique():
 playerinfo_list = list()
 playerid_list = list()
 
-for match in players_df['match_id'].unique():
+player_names = players_df[~players_df.index.duplicated()]['name']
+
+for (match, team_id), team_players_in_squad in players_df.groupby(['match_id', 'teamId'], sort=False, observed=True):
+    match_mins = team_players_in_squad['time_off'].max()
     
-    for team_id in players_df[players_df['match_id']==match]['teamId'].unique(): 
-        team_players_in_squad = players_df[(players_df['match_id']==match) & (players_df['teamId']==team_id)]
-        match_mins = team_players_in_squad['time_off'].max()
+    for player_id in team_players_dict[team_id]:
         
-        for player_id in team_players_dict[team_id]:
+        if player_id in team_players_in_squad.index.tolist():
+            player = team_players_in_squad[team_players_in_squad.index == player_id]
+            playerinfo_list.append([player['name'].values[0],
+                                    player['position'].values[0],
+                                    player['isFirstEleven'].values[0],
+                                    True,
+                                    team_id,
+                                    player['team'].values[0],
+                                    match,
+                                    player['time_on'].values[0] if player['time_on'].values[0] == player['time_on'].values[0] else 0,
+                                    player['time_off'].values[0] if player['time_off'].values[0] == player['time_off'].values[0] else 0,
+                                    player['mins_played'].values[0] if player['mins_played'].values[0] == player['mins_played'].values[0] else 0,
+                                    match_mins - player['mins_played'].values[0] if player['mins_played'].values[0] == player['mins_played'].values[0] else match_mins
+                                    ])                
+        else:
             
-            if player_id in team_players_in_squad.index.tolist():
-                player = team_players_in_squad[team_players_in_squad.index == player_id]
-                playerinfo_list.append([player['name'].values[0],
-                                        player['position'].values[0],
-                                        player['isFirstEleven'].values[0],
-                                        True,
-                                        team_id,
-                                        player['team'].values[0],
-                                        match,
-                                        player['time_on'].values[0] if player['time_on'].values[0] == player['time_on'].values[0] else 0,
-                                        player['time_off'].values[0] if player['time_off'].values[0] == player['time_off'].values[0] else 0,
-                                        player['mins_played'].values[0] if player['mins_played'].values[0] == player['mins_played'].values[0] else 0,
-                                        match_mins - player['mins_played'].values[0] if player['mins_played'].values[0] == player['mins_played'].values[0] else match_mins
-                                        ])                
-            else:
-                
-                playerinfo_list.append([players_df[players_df.index==player_id]['name'].values[0],
-                                        'Out',
-                                        np.nan,
-                                        False,
-                                        team_id,
-                                        players_df[players_df['teamId'] == team_id]['team'].values[0],
-                                        match,
-                                        0,
-                                        0,
-                                        0,
-                                        match_mins
-                                        ])
-            playerid_list.append(player_id)  
+            playerinfo_list.append([player_names[player_id],
+                                    'Out',
+                                    np.nan,
+                                    False,
+                                    team_id,
+                                    team_players_in_squad['team'].values[0],
+                                    match,
+                                    0,
+                                    0,
+                                    0,
+                                    match_mins
+                                    ])
+        playerid_list.append(player_id)  
 
 full_players_df = pd.DataFrame(data = playerinfo_list,
                                columns = ['name', 'position', 'isFirstEleven', 'isSquad', 'teamId', 'team', 'match_id', 'time_on', 'time_off', 'mins_played', 'mins_not_played'],
@@ -164,15 +147,15 @@ shots_for_list_off = list()
 shots_against_list_off = list()
 
 for idx, lineup_player in full_players_df.iterrows():
-    match_events = events_df[events_df['match_id']==lineup_player['match_id']]
+    match_events, _ = dataset.match(lineup_player['match_id'])
 
     ip_events_when_on = match_events[(match_events['cumulative_mins'] >= lineup_player['time_on']) &
                                      (match_events['cumulative_mins'] <= lineup_player['time_off']) &
-                                     (match_events['satisfiedEventsTypes'].apply(lambda x: not any(item in x for item in [48, 50, 51, 42, 44, 45, 31, 34, 212])))
+                                     (match_events['in_play'])
                                      ]
     ip_events_when_off = match_events[((match_events['cumulative_mins'] < lineup_player['time_on']) |
                                        (match_events['cumulative_mins'] > lineup_player['time_off'])) &
-                                      (match_events['satisfiedEventsTypes'].apply(lambda x: not any(item in x for item in [48, 50, 51, 42, 44, 45, 31, 34, 212])))
+                                      (match_events['in_play'])
                                       ]
     match_mins = match_events['expandedMinute'].max()
     
@@ -18,8 +18,6 @@ from mplsoccer.pitch import VerticalPitch, Pitch
 import matplotlib.patheffects as path_effects
 import os
 import sys
-import bz2
-import pickle
 import numpy as np
 import highlight_text as htext
 import glob
@@ -32,6 +30,7 @@ sys.path.append(root_folder)
 import analysis_tools.whoscored_custom_events as wce
 import analysis_tools.pitch_zones as pz
 import analysis_tools.whoscored_data_engineering as wde
+import analysis_tools.whoscored_data_storage as wds
 import analysis_tools.logos_and_badges as lab
 
 # %% User inputs
@@ -108,32 +107,13 @@ for data in data_grab:
     league = data[0]
     year = data[1]
         
-    file_path = f"../../data_directory/whoscored_data/{data[1]}_{str(int(data[1].replace('20','')) + 1)}/{data[0]}"
-    files = os.listdir(file_path)
-    
-    # Load data
-    for file in files:
-        if file == 'event-types.pbz2':
-            event_types = bz2.BZ2File(f"{file_path}/{file}", 'rb')
-            event_types = pickle.load(event_types)
-        elif file == 'formation-mapping.pbz2':
-            formation_mapping = bz2.BZ2File(f"{file_path}/{file}", 'rb')
-            formation_mapping = pickle.load(formation_mapping)
-        elif '-eventdata-' in file:
-            match_events = bz2.BZ2File(f"{file_path}/{file}", 'rb')
-            match_events = pickle.load(match_events)
-            events_df = pd.concat([events_df, match_events])
-        elif '-playerdata-' in file:
-            match_players = bz2.BZ2File(f"{file_path}/{file}", 'rb')
-            match_players = pickle.load(match_players)
-            players_df = pd.concat([players_df, match_players])
-        else:
-            pass
-            
-    print(f"{league}, {year} data import complete")
+    league_events, league_players, event_types, _ = wds.load_season_files(league, year)
 
-event_types = bz2.BZ2File(f"../../data_directory/whoscored_data/{year}_{str(int(year.replace('20','', 1)) + 1)}/{league}/event-types.pbz2", 'rb')
-event_types = pickle.load(event_types)
+    # Append league data to combined dataset
+    events_df = pd.concat([events_df, league_events])
+    players_df = pd.concat([players_df, league_players])
+
+    print(f"{league}, {year} data import complete")
 
 # %% Create player list
 
@@ -28,8 +28,6 @@ from PIL import Image, ImageEnhance
 import adjustText
 import os
 import sys
-import bz2
-import pickle
 import numpy as np
 import highlight_text as htext
 import glob
@@ -46,6 +44,8 @@ sys.path.append(root_folder)
 
 import analysis_tools.whoscored_custom_events as wce
 import analysis_tools.whoscored_data_engineering as wde
+import analysis_tools.whoscored_data_storage as wds
+import analysis_tools.match_cache as mc
 import analysis_tools.logos_and_badges as lab
 
 # %% User inputs
@@ -89,43 +89,25 @@ leagues = {'EPL': 'Premier League', 'La_Liga': 'La Liga', 'Bundesliga': 'Bundesl
 
 # %% Get data
 
-file_path = f"../../data_directory/whoscored_data/{year}_{str(int(year.replace('20','')) + 1)}/{league}"
-files = os.listdir(file_path)
-
-# Initialise storage dataframes
-events_df = pd.DataFrame()
-players_df = pd.DataFrame()
-
-# Load data
-for file in files:
-    if file == 'event-types.pbz2':
-        event_types = bz2.BZ2File(f"{file_path}/{file}", 'rb')
-        event_types = pickle.load(event_types)
-    elif file == 'formation-mapping.pbz2':
-        formation_mapping = bz2.BZ2File(f"{file_path}/{file}", 'rb')
-        formation_mapping = pickle.load(formation_mapping)
-    elif '-eventdata-' in file:
-        match_events = bz2.BZ2File(f"{file_path}/{file}", 'rb')
-        match_events = pickle.load(match_events)
-        events_df = pd.concat([events_df, match_events])
-    elif '-playerdata-' in file:
-        match_players = bz2.BZ2File(f"{file_path}/{file}", 'rb')
-        match_players = pickle.load(match_players)
-        players_df = pd.concat([players_df, match_players])
-    else:
-        pass
+events_df, players_df, event_types, formation_mapping = wds.load_season_files(league, year)
+
+# %% Add carries and expected threat where not already within data (cached per match, so shared with other reports)
+
+if 'Carry' not in events_df['eventType'].values:
+    events_df = mc.cached_apply(wce.insert_ball_carries, events_df, ignore_index=True)
+    events_df = mc.cached_apply(wce.get_xthreat, events_df, ignore_index=True)
 
 # %% Tag in-play successful box entries and progressive acions
 
-events_df['progressive'] = events_df.apply(wce.progressive_action, axis=1, inplay = True, successful_only = True)
-events_df['box_entry'] = events_df.apply(wce.box_entry, axis=1, inplay = True, successful_only = True)
+events_df['progressive'] = wce.progressive_actions(events_df, inplay=True, successful_only=True)
+events_df['box_entry'] = wce.box_entries(events_df, inplay=True, successful_only=True)
 
 # %% Create player dataframe and account for players that have played for multiple teams
 
 playerinfo_df = wde.create_player_list(players_df)
 
 # Sum mins played for each player, into new dataframe
-playerinfo_mp = playerinfo_df.groupby(by='playerId', axis=0).sum(numeric_only=True)
+playerinfo_mp = playerinfo_df.groupby(by='playerId').sum(numeric_only=True)
 
 # Retain the player entry against the club he's played the most minutes for
 playerinfo_df = playerinfo_df.sort_values('mins_played', ascending = False)
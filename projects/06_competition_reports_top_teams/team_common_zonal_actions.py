@@ -10,8 +10,6 @@ from mplsoccer.pitch import VerticalPitch, Pitch
 import matplotlib.patheffects as path_effects
 import os
 import sys
-import bz2
-import pickle
 import numpy as np
 from collections import Counter
 import highlight_text as htext
@@ -27,7 +25,9 @@ sys.path.append(root_folder)
 import analysis_tools.whoscored_custom_events as wce
 import analysis_tools.pitch_zones as pz
 import analysis_tools.whoscored_data_engineering as wde
+import analysis_tools.whoscored_data_storage as wds
 import analysis_tools.logos_and_badges as lab
+import analysis_tools.data_codecs as dcd
 
 # %% Team name processing
 
@@ -74,31 +74,7 @@ comp_logo = lab.get_competition_logo(league, year, logo_brighten=logo_brighten)
 
 # %% Get event data for current year
 
-file_path = f"../../data_directory/whoscored_data/{year}_{str(int(year.replace('20','')) + 1)}/{league}"
-files = os.listdir(file_path)
-
-# Initialise storage dataframes
-events_df = pd.DataFrame()
-players_df = pd.DataFrame()
-
-# Load data
-for file in files:
-    if file == 'event-types.pbz2':
-        event_types = bz2.BZ2File(f"{file_path}/{file}", 'rb')
-        event_types = pickle.load(event_types)
-    elif file == 'formation-mapping.pbz2':
-        formation_mapping = bz2.BZ2File(f"{file_path}/{file}", 'rb')
-        formation_mapping = pickle.load(formation_mapping)
-    elif '-eventdata-' in file:
-        match_events = bz2.BZ2File(f"{file_path}/{file}", 'rb')
-        match_events = pickle.load(match_events)
-        events_df = pd.concat([events_df, match_events])
-    elif '-playerdata-' in file:
-        match_players = bz2.BZ2File(f"{file_path}/{file}", 'rb')
-        match_players = pickle.load(match_players)
-        players_df = pd.concat([players_df, match_players])
-    else:
-        pass
+events_df, players_df, event_types, formation_mapping = wds.load_season_files(league, year)
 
 events_df = wde.add_team_name(events_df, players_df)
 
@@ -106,8 +82,7 @@ events_df = wde.add_team_name(events_df, players_df)
 
 file_path_league = f"../../data_directory/leaguetable_data/{year}_{str(int(year.replace('20','', 1)) + 1)}"
 file = f"{league}-table-{year}.pbz2"
-league_table = bz2.BZ2File(f"{file_path_league}/{file}", 'rb')
-league_table = pickle.load(league_table)
+league_table = dcd.load_object(f"{file_path_league}/{file}")
 league_table['team'] = league_table['team'].apply(team_name_clean)
 
 # %% Isolate different event types that will be counted
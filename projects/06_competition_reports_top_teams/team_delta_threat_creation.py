@@ -19,8 +19,6 @@ import matplotlib.patheffects as path_effects
 import matplotlib.cm as cm
 import os
 import sys
-import bz2
-import pickle
 import numpy as np
 from collections import Counter
 import highlight_text as htext
@@ -35,6 +33,7 @@ sys.path.append(root_folder)
 import analysis_tools.whoscored_custom_events as wce
 import analysis_tools.pitch_zones as pz
 import analysis_tools.whoscored_data_engineering as wde
+import analysis_tools.whoscored_data_storage as wds
 import analysis_tools.logos_and_badges as lab
 
 
@@ -63,31 +62,7 @@ comp_logo = lab.get_competition_logo(league, year, logo_brighten=logo_brighten)
 
 # %% Get data for current year, selected league
 
-file_path = f"../../data_directory/whoscored_data/{year}_{str(int(year.replace('20','',1)) + 1)}/{league}"
-files = os.listdir(file_path)
-
-# Initialise storage dataframes
-events_df = pd.DataFrame()
-players_df = pd.DataFrame()
-
-# Load data
-for file in files:
-    if file == 'event-types.pbz2':
-        event_types = bz2.BZ2File(f"{file_path}/{file}", 'rb')
-        event_types = pickle.load(event_types)
-    elif file == 'formation-mapping.pbz2':
-        formation_mapping = bz2.BZ2File(f"{file_path}/{file}", 'rb')
-        formation_mapping = pickle.load(formation_mapping)
-    elif '-eventdata-' in file:
-        match_events = bz2.BZ2File(f"{file_path}/{file}", 'rb')
-        match_events = pickle.load(match_events)
-        events_df = pd.concat([events_df, match_events])
-    elif '-playerdata-' in file:
-        match_players = bz2.BZ2File(f"{file_path}/{file}", 'rb')
-        match_players = pickle.load(match_players)
-        players_df = pd.concat([players_df, match_players])
-    else:
-        pass
+events_df, players_df, event_types, formation_mapping = wds.load_season_files(league, year)
 
 # %% Identify all teams in selected league, current year
 
@@ -96,51 +71,14 @@ all_teams = set(players_df['team'])
 # %% Get data for year before, selected league
 
 year_before = int(year)-1
-file_path = f"../../data_directory/whoscored_data/{year_before}_{str(int(str(year_before).replace('20','')) + 1)}/{league}"
-files = os.listdir(file_path)
-
-# Initialise storage dataframes
-events_prev_df = pd.DataFrame()
-players_prev_df = pd.DataFrame()
-
-# Load data
-for file in files:
-    if '-eventdata-' in file:
-        if (file.split('-')[3] in all_teams) or (file.split('-')[4].replace('.pbz2','') in all_teams):
-            match_events = bz2.BZ2File(f"{file_path}/{file}", 'rb')
-            match_events = pickle.load(match_events)
-            events_prev_df = pd.concat([events_prev_df, match_events])
-    elif '-playerdata-' in file:
-        if (file.split('-')[3] in all_teams) or (file.split('-')[4].replace('.pbz2','') in all_teams):
-            match_players = bz2.BZ2File(f"{file_path}/{file}", 'rb')
-            match_players = pickle.load(match_players)
-            players_prev_df = pd.concat([players_prev_df, match_players])
-    else:
-        pass
+
+# Load only matches involving teams in the selected league, current year
+events_prev_df, players_prev_df, _, _ = wds.load_season_files(league, year_before, match_teams=all_teams)
 
 # %% Get data for current year, league below selected league
 
-file_path = f"../../data_directory/whoscored_data/{year_before}_{str(int(str(year_before).replace('20','')) + 1)}/{league_below}"
-files = os.listdir(file_path)
-
-# Initialise storage dataframes
-events_prev_below_df = pd.DataFrame()
-players_prev_below_df = pd.DataFrame()
-
-# Load data
-for file in files:
-    if '-eventdata-' in file:
-        if (file.split('-')[3] in all_teams) or (file.split('-')[4].replace('.pbz2','') in all_teams):
-            match_events = bz2.BZ2File(f"{file_path}/{file}", 'rb')
-            match_events = pickle.load(match_events)
-            events_prev_below_df = pd.concat([events_prev_below_df, match_events])
-    elif '-playerdata-' in file:
-        if (file.split('-')[3] in all_teams) or (file.split('-')[4].replace('.pbz2','') in all_teams):
-            match_players = bz2.BZ2File(f"{file_path}/{file}", 'rb')
-            match_players = pickle.load(match_players)
-            players_prev_below_df = pd.concat([players_prev_below_df, match_players])
-    else:
-        pass
+events_prev_below_df, players_prev_below_df, _, _ = wds.load_season_files(league_below, year_before,
+                                                                          match_teams=all_teams)
     
 # %% Get data for current year, league above selected league
 
@@ -148,24 +86,8 @@ events_prev_above_df = pd.DataFrame()
 players_prev_above_df = pd.DataFrame()
 
 if league_above != None:
-    
-    file_path = f"../../data_directory/whoscored_data/{year_before}_{str(int(str(year_before).replace('20','')) + 1)}/{league_above}"
-    files = os.listdir(file_path)
-    
-    # Load data
-    for file in files:
-        if '-eventdata-' in file:
-            if (file.split('-')[3] in all_teams) or (file.split('-')[4].replace('.pbz2','') in all_teams):
-                match_events = bz2.BZ2File(f"{file_path}/{file}", 'rb')
-                match_events = pickle.load(match_events)
-                events_prev_above_df = pd.concat([events_prev_above_df, match_events])
-        elif '-playerdata-' in file:
-            if (file.split('-')[3] in all_teams) or (file.split('-')[4].replace('.pbz2','') in all_teams):
-                match_players = bz2.BZ2File(f"{file_path}/{file}", 'rb')
-                match_players = pickle.load(match_players)
-                players_prev_above_df = pd.concat([players_prev_above_df, match_players])
-        else:
-            pass
+    events_prev_above_df, players_prev_above_df, _, _ = wds.load_season_files(league_above, year_before,
+                                                                              match_teams=all_teams)
 
 # %% Function to process data
 
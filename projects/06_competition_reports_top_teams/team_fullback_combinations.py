@@ -16,8 +16,6 @@ from mplsoccer.pitch import VerticalPitch, Pitch
 import matplotlib.patheffects as path_effects
 import os
 import sys
-import bz2
-import pickle
 import numpy as np
 from collections import Counter
 import highlight_text as htext
@@ -33,6 +31,7 @@ import analysis_tools.whoscored_custom_events as wce
 import analysis_tools.pitch_zones as pz
 import analysis_tools.whoscored_data_engineering as wde
 import analysis_tools.logos_and_badges as lab
+import analysis_tools.whoscored_data_storage as wds
 
 # %% User Inputs
 
@@ -57,70 +56,41 @@ comp_logo = lab.get_competition_logo(league, year, logo_brighten=logo_brighten)
 
 # %% Get data
 
-file_path = f"../../data_directory/whoscored_data/{year}_{str(int(year.replace('20','')) + 1)}/{league}"
-files = os.listdir(file_path)
-
-# Initialise storage dataframes
-events_df = pd.DataFrame()
-players_df = pd.DataFrame()
-
-# Load data
-for file in files:
-    if file == 'event-types.pbz2':
-        event_types = bz2.BZ2File(f"{file_path}/{file}", 'rb')
-        event_types = pickle.load(event_types)
-    elif file == 'formation-mapping.pbz2':
-        formation_mapping = bz2.BZ2File(f"{file_path}/{file}", 'rb')
-        formation_mapping = pickle.load(formation_mapping)
-    elif '-eventdata-' in file:
-        match_events = bz2.BZ2File(f"{file_path}/{file}", 'rb')
-        match_events = pickle.load(match_events)
-        events_df = pd.concat([events_df, match_events])
-    elif '-playerdata-' in file:
-        match_players = bz2.BZ2File(f"{file_path}/{file}", 'rb')
-        match_players = pickle.load(match_players)
-        players_df = pd.concat([players_df, match_players])
-    else:
-        pass
-
-# %% Synthesise additional info
+# Synthesise pass recipient and cumulative minutes played information once per match, when match is first loaded
+def add_match_info(match_events, match_players):
+    match_events = wde.get_recipient(match_events)
+    match_players = wde.minutes_played(match_players, match_events)
+    match_events = wde.cumulative_match_mins(match_events)
+    return match_events, match_players
 
-# Pass recipient
-events_df = wde.get_recipient(events_df)
-
-# Add cumulative minutes played information
-players_df = wde.minutes_played(players_df, events_df)
-events_df = wde.cumulative_match_mins(events_df)
+# Matches are loaded lazily and cached, while player data is loaded for all matches
+dataset = wds.SeasonDataset(league, year, match_transform=add_match_info,
+                            data_folder="../../data_directory/whoscored_data")
+players_df = dataset.players()
 
 # %% Create dictionary of teams, and store full back pass combinations against each team
 
 # Get all team names
 teams = sorted(set(players_df['team']))
 
-# Initialise dictionary to store full-back combos per team
-team_fb_combos = dict.fromkeys(teams, 0)
+# Initialise dictionaries to store full-back combos and number of matches played per team
+team_fb_combos = {team: pd.DataFrame() for team in teams}
+team_match_count = dict.fromkeys(teams, 0)
 
 # Initialise dictionary to store xT generated per 90 from full-back combos
 team_fb_combo_xt = dict.fromkeys(teams, 0)
 
-# Loop through each team
-for team in teams:
-    
-    # Get team id and all matches team have played
-    team_id = players_df[players_df['team']==team]['teamId'].values[0]
-    match_ids = set(players_df[players_df['team']==team]['match_id'])
-    fb_pass_combos = pd.DataFrame()
-    
-    # Loop through each match
-    for match_id in match_ids:
-        
+# Loop through each match, and each team within the match
+for match_id, match_events, match_players in dataset.iter_matches():
+    for (team_id, team), team_match_players in match_players.groupby(['teamId', 'team'], sort=False, observed=True):
+        team_match_count[team] += 1
+
         # Get ids of full backs that started in match for team
-        team_match_players = players_df[(players_df['teamId']==team_id) & (players_df['match_id']==match_id)]
         starting_rb_id = team_match_players[team_match_players['position'].isin(['DMR','DR'])].index.values.tolist()
         starting_lb_id = team_match_players[team_match_players['position'].isin(['DML','DL'])].index.values.tolist()
         
         # Get all events completed by team within match
-        team_match_events = events_df[(events_df['teamId']==team_id) & (events_df['match_id']==match_id)]
+        team_match_events = match_events[match_events['teamId']==team_id]
 
         # If both a LB/LWB and RB/RWB start, then look for passes between
         if (len(starting_rb_id)>0) & (len(starting_lb_id)>0): 
@@ -128,29 +98,26 @@ for team in teams:
             # Get in-play successful passes between
             fb_pass_combos_match = team_match_events[(team_match_events['eventType']=='Pass') &
                                                      (team_match_events['outcomeType']=='Successful') &
-                                                     (~team_match_events['satisfiedEventsTypes'].apply(lambda x: 31 in x or 32 in x or 33 in x or 34 in x or 212 in x)) &
+                                                     (~wde.has_any(team_match_events, [31, 32, 33, 34, 212])) &
                                                      (((team_match_events['playerId'] == starting_rb_id[0]) & (team_match_events['pass_recipient'] == starting_lb_id[0])) |
-                                                      ((team_match_events['playerId'] == starting_lb_id[0]) & (team_match_events['pass_recipient'] == starting_rb_id[0])))]
+                                                      ((team_match_events['playerId'] == starting_lb_id[0]) & (team_match_events['pass_recipient'] == starting_rb_id[0])))].copy()
             
             # Add column to store whether a shot happens within certain time of pass being made
             fb_pass_combos_match['leads_to_shot'] = False
             
             # Loop through full-back combos, find next sequence of events and check whether shot occured
             for idx, fb_pass in fb_pass_combos_match.iterrows():
-                following_evts = team_match_events[(team_match_events['match_id']==fb_pass['match_id']) &
-                                                   (team_match_events['period']==fb_pass['period']) &
+                following_evts = team_match_events[(team_match_events['period']==fb_pass['period']) &
                                                    (team_match_events['cumulative_mins']>fb_pass['cumulative_mins']) &
                                                    (team_match_events['cumulative_mins']<=fb_pass['cumulative_mins']+min_delta)]
                 fb_pass_combos_match.loc[idx,'leads_to_shot'] = True if True in following_evts['isShot'].tolist() else False
         
             # Build up dataframe of full back combos for team across multiple matches
-            fb_pass_combos = pd.concat([fb_pass_combos, fb_pass_combos_match])
-    
-    # Store full back combo in dictionary
-    team_fb_combos[team] = fb_pass_combos
-    
-    # Calculate xT generated from full back combos per 90 and store in dictionary
-    team_fb_combo_xt[team] = fb_pass_combos['xThreat_gen'].sum()/len(match_ids)
+            team_fb_combos[team] = pd.concat([team_fb_combos[team], fb_pass_combos_match])
+
+# Calculate xT generated from full back combos per 90 and store in dictionary
+for team in teams:
+    team_fb_combo_xt[team] = team_fb_combos[team]['xThreat_gen'].sum()/team_match_count[team] if len(team_fb_combos[team]) else 0
 
 # Order teams by xT generated per 90
 team_order_xt_90 = sorted(team_fb_combo_xt, key=team_fb_combo_xt.get, reverse=True)
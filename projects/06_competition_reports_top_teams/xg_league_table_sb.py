@@ -25,7 +25,7 @@ from matplotlib.offsetbox import OffsetImage, AnnotationBbox
 root_folder = os.path.abspath(os.path.dirname((os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
 sys.path.append(root_folder)
 
-import analysis_tools.get_football_data as gfd
+import analysis_tools.statsbomb_data_storage as sds
 import analysis_tools.statsbomb_custom_events as sce
 import analysis_tools.statsbomb_data_engineering as sde
 import analysis_tools.logos_and_badges as lab
@@ -38,7 +38,7 @@ data_grab =[['England', 'Premier League', '2023']]
 # %% Load data
 
 # Statsbomb
-data_dict = gfd.load_statsbomb_sql(data_grab, events=True, matches = True, lineups = True, player_stats=True)
+data_dict = sds.load_statsbomb_sql(data_grab, events=True, matches = True, lineups = True, player_stats=True)
 events_df = data_dict['events']
 matches_df = data_dict['matches']
 lineups_df = data_dict['lineups']
@@ -18,11 +18,8 @@ import seaborn as sns
 import mplsoccer.pitch
 import os
 import sys
-import bz2
-import pickle
 import textwrap as tw
 from scipy.spatial import ConvexHull
-from scipy.interpolate import interp2d
 from scipy.spatial import Delaunay
 from shapely.geometry.polygon import Polygon
 from mpl_toolkits.axes_grid1 import Divider
@@ -40,6 +37,7 @@ sys.path.append(root_folder)
 
 import analysis_tools.whoscored_custom_events as wce
 import analysis_tools.whoscored_data_engineering as wde
+import analysis_tools.whoscored_data_storage as wds
 import analysis_tools.pitch_zones as pz
 import analysis_tools.logos_and_badges as lab
 
@@ -79,32 +77,8 @@ players_df = pd.DataFrame()
 
 for idx, data in enumerate(all_data_download):
     
-    # Determine file path
-    file_path = f"../../data_directory/whoscored_data/{data[1]}_{str(int(data[1].replace('20','', 1)) + 1)}/{data[0]}"
-    files = os.listdir(file_path)
-    
-    # Initialise storage dataframes
-    comp_events_df = pd.DataFrame()
-    comp_players_df = pd.DataFrame()
-    
     # Load data
-    for file in files:
-        if file == 'event-types.pbz2':
-            event_types = bz2.BZ2File(f"{file_path}/{file}", 'rb')
-            event_types = pickle.load(event_types)
-        elif file == 'formation-mapping.pbz2':
-            formation_mapping = bz2.BZ2File(f"{file_path}/{file}", 'rb')
-            formation_mapping = pickle.load(formation_mapping)
-        elif '-eventdata-' in file:
-            match_events = bz2.BZ2File(f"{file_path}/{file}", 'rb')
-            match_events = pickle.load(match_events)
-            comp_events_df = pd.concat([comp_events_df, match_events])
-        elif '-playerdata-' in file:
-            match_players = bz2.BZ2File(f"{file_path}/{file}", 'rb')
-            match_players = pickle.load(match_players)
-            comp_players_df = pd.concat([comp_players_df, match_players])
-        else:
-            pass
+    comp_events_df, comp_players_df, event_types, formation_mapping = wds.load_season_files(data[0], data[1])
 
     # Add competition data to player dataframe 
     comp_players_df['competition'] = data[0]
@@ -120,13 +94,15 @@ for idx, data in enumerate(all_data_download):
     
 # %% Add to players and events dataframe    
 
-players_df = wde.events_while_playing(events_df, players_df, event_name='Pass', event_team='own')
-players_df = wde.events_while_playing(events_df, players_df, event_name='Pass', event_team='opposition')
-players_df = wde.events_while_playing(events_df, players_df, event_name='Touch', event_team='own')
-players_df = wde.events_while_playing(events_df[events_df['x']<=100/3], players_df, event_name='Touch', event_team='opposition').rename(columns={'opp_touch':'opp_touch_own_3rd'})
-players_df = wde.events_while_playing(events_df, players_df, event_name='Touch', event_team='opposition')
-events_df['box_entry'] = events_df.apply(wce.box_entry, axis=1)
-events_df['prog_action'] = events_df.apply(wce.progressive_action, axis=1)
+players_df = wde.events_while_playing(events_df, players_df,
+                                      event_specs=[{'event_name': 'Pass', 'event_team': 'own'},
+                                                   {'event_name': 'Pass', 'event_team': 'opposition'},
+                                                   {'event_name': 'Touch', 'event_team': 'own'},
+                                                   {'event_name': 'Touch', 'event_team': 'opposition',
+                                                    'x_range': (None, 100/3), 'column': 'opp_touch_own_3rd'},
+                                                   {'event_name': 'Touch', 'event_team': 'opposition'}])
+events_df['box_entry'] = wce.box_entries(events_df)
+events_df['prog_action'] = wce.progressive_actions(events_df)
 
 # %% Aggregate lineups to construct playerinfo dataframe, and then filter
 
@@ -138,104 +114,73 @@ playerinfo_df = playerinfo_df[(playerinfo_df['name'].isin([player_1['name'],play
 
 # %% Get some metrics
 
-# Touches
-touches = events_df[events_df['isTouch'] == True]
-playerinfo_df = wde.group_player_events(touches, playerinfo_df, group_type='count', col_names='touches')
-
-# IP Box touches and entries
-inplay_touches = touches[touches['satisfiedEventsTypes'].apply(lambda x: False if (5 in x or 31 in x or 34 in x or 212 in x) else True)]
-box_touches = inplay_touches[(inplay_touches['x']>=83) & (inplay_touches['y']<=79) & (inplay_touches['y']>=21)]
-suc_box_entries = events_df[events_df['box_entry']==True]
-playerinfo_df = wde.group_player_events(box_touches, playerinfo_df, group_type='count', col_names='box_touches')
-playerinfo_df = wde.group_player_events(suc_box_entries, playerinfo_df, group_type='count', col_names='suc_box_entries')
-
-# xThreat and passing
-passes = events_df[events_df['eventType'] == 'Pass']
-suc_passes = passes[passes['outcomeType'] == 'Successful']
-carries = events_df[events_df['eventType'] == 'Carry']
-pass_carry = pd.concat([suc_passes, carries])
-prog_pass_carry = pass_carry[pass_carry['prog_action']==True]
-pass_carry_f3rd = pass_carry[(pass_carry['x']<100/3) & (pass_carry['endX']>=200/3)]
-assists = passes[passes['satisfiedEventsTypes'].apply(lambda x: True if 92 in x else False)]
-playerinfo_df = wde.group_player_events(passes, playerinfo_df, group_type='count', col_names='passes')
-playerinfo_df = wde.group_player_events(suc_passes, playerinfo_df, group_type='count', col_names='suc_passes')
-playerinfo_df = wde.group_player_events(carries, playerinfo_df, group_type='count', col_names='carries')
-playerinfo_df = wde.group_player_events(passes, playerinfo_df, group_type='sum', agg_columns='xThreat', col_names='pass_xt')
-playerinfo_df = wde.group_player_events(carries, playerinfo_df, group_type='sum', agg_columns='xThreat', col_names='carry_xt')
-playerinfo_df = wde.group_player_events(pass_carry_f3rd, playerinfo_df, group_type='count', col_names='final_3rd_entries')
-playerinfo_df = wde.group_player_events(prog_pass_carry, playerinfo_df, group_type='count', col_names='prog_actions')
-
-# Shots and big chances
-shots = events_df[(events_df['eventType'].isin(['MissedShots', 'SavedShot', 'ShotOnPost', 'Goal'])) & (~events_df['satisfiedEventsTypes'].apply(lambda x: True if( 5 in x or 6 in x) else False))].copy()
-shots['shot_distance'] = shots[['x','y']].apply(lambda a: np.sqrt((120*((100-a[0])/100))**2 + (80*((50-a[1])/100))**2),axis = 1)        
-goals = shots[shots['eventType'] == 'Goal']
-gc = pd.concat([assists,goals])
-box_shots = shots[(shots['x']>=83) & (shots['y']<=79) & (shots['y']>=21)]
-box_goals = box_shots[box_shots['eventType'] == 'Goal']
-big_chances = events_df[events_df['satisfiedEventsTypes'].apply(lambda x: True if 203 in x and not (31 in x or 34 in x or 212 in x) else False)]
-playerinfo_df = wde.group_player_events(shots, playerinfo_df, group_type='count', col_names='shots')
-playerinfo_df = wde.group_player_events(shots, playerinfo_df, group_type='mean', agg_columns='shot_distance', col_names='mean_shot_dist')
-playerinfo_df = wde.group_player_events(goals, playerinfo_df, group_type='count', col_names='goals')
-playerinfo_df = wde.group_player_events(gc, playerinfo_df, group_type='count', col_names='goal_contributions')
-playerinfo_df = wde.group_player_events(box_shots, playerinfo_df, group_type='count', col_names='box_shots')
-playerinfo_df = wde.group_player_events(box_goals, playerinfo_df, group_type='count', col_names='box_goals')
-playerinfo_df = wde.group_player_events(big_chances, playerinfo_df, group_type='count', col_names='big_chances')
-
-# Aerials
-aerials = events_df[events_df['eventType'] == 'Aerial']
-aerials_won = aerials[aerials['outcomeType'] == 'Successful']
-playerinfo_df = wde.group_player_events(aerials, playerinfo_df, group_type='count', col_names='aerials')
-playerinfo_df = wde.group_player_events(aerials_won, playerinfo_df, group_type='count', col_names='aerials_won')
-
-# Take ons
-take_on = events_df[events_df['eventType'] == 'TakeOn']
-suc_take_on = take_on[take_on['outcomeType'] == 'Successful']
-playerinfo_df = wde.group_player_events(take_on, playerinfo_df, group_type='count', col_names='take_on')
-playerinfo_df = wde.group_player_events(suc_take_on, playerinfo_df, group_type='count', col_names='suc_take_on')
+# Event selections
+touches = events_df['isTouch'] == True
+inplay = ~wde.has_any(events_df, [5, 31, 34, 212])
+in_box = (events_df['x'] >= 83) & (events_df['y'] <= 79) & (events_df['y'] >= 21)
+successful = events_df['outcomeType'] == 'Successful'
+unsuccessful = events_df['outcomeType'] == 'Unsuccessful'
+passes = events_df['eventType'] == 'Pass'
+carries = events_df['eventType'] == 'Carry'
+pass_carry = (passes & successful) | carries
+shots = events_df['eventType'].isin(['MissedShots', 'SavedShot', 'ShotOnPost', 'Goal']) & \
+        ~wde.has_any(events_df, [5, 6])
+goals = shots & (events_df['eventType'] == 'Goal')
+assists = passes & wde.has_any(events_df, 92)
+ball_wins = events_df['eventType'].isin(['BallRecovery', 'Interception', 'Tackle', 'BlockedPass']) & successful
+ball_losses = (events_df['eventType'].isin(['BallTouch', 'Pass', 'TakeOn']) & unsuccessful) | \
+              (events_df['eventType'] == 'Disspossessed')
+events_df['shot_distance'] = np.sqrt((120*((100-events_df['x'])/100))**2 + (80*((50-events_df['y'])/100))**2)
+
+playerinfo_df = wde.aggregate_players(events_df, playerinfo_df, {
+    # Touches, IP box touches and entries
+    'touches': (touches, 'count'),
+    'box_touches': (touches & inplay & in_box, 'count'),
+    'suc_box_entries': (events_df['box_entry'] == True, 'count'),
+    # xThreat and passing
+    'passes': (passes, 'count'),
+    'suc_passes': (passes & successful, 'count'),
+    'carries': (carries, 'count'),
+    'pass_xt': (passes, 'xThreat', 'sum'),
+    'carry_xt': (carries, 'xThreat', 'sum'),
+    'final_3rd_entries': (pass_carry & (events_df['x'] < 100/3) & (events_df['endX'] >= 200/3), 'count'),
+    'prog_actions': (pass_carry & (events_df['prog_action'] == True), 'count'),
+    # Shots and big chances
+    'shots': (shots, 'count'),
+    'mean_shot_dist': (shots, 'shot_distance', 'mean'),
+    'goals': (goals, 'count'),
+    'goal_contributions': (goals | assists, 'count'),
+    'box_shots': (shots & in_box, 'count'),
+    'box_goals': (goals & in_box, 'count'),
+    'big_chances': (wde.has_any(events_df, 203) & ~wde.has_any(events_df, [31, 34, 212]), 'count'),
+    # Aerials
+    'aerials': (events_df['eventType'] == 'Aerial', 'count'),
+    'aerials_won': ((events_df['eventType'] == 'Aerial') & successful, 'count'),
+    # Take ons
+    'take_on': (events_df['eventType'] == 'TakeOn', 'count'),
+    'suc_take_on': ((events_df['eventType'] == 'TakeOn') & successful, 'count'),
+    # High ball wins
+    'tackles': ((events_df['eventType'] == 'Tackle') & successful, 'count'),
+    'bad_tackles': ((events_df['eventType'] == 'Tackle') & unsuccessful, 'count'),
+    'ball_wins': (ball_wins, 'count'),
+    'high_ball_wins': (ball_wins & (events_df['x'] >= 200/3), 'count'),
+    # Ball losses
+    'ball_losses': (ball_losses, 'count')}, per_90=True, per_100=['team_touch', 'team_pass'])
 
 # Crosses
-crosses = passes[passes['satisfiedEventsTypes'].apply(lambda x: True if (125 in x or 126 in x or 59 in x) and not(31 in x or 34 in x or 212 in x) else False)]   
+crosses = events_df[passes & wde.has_any(events_df, [125, 126, 59]) & ~wde.has_any(events_df, [31, 34, 212])]
 crosses = wce.get_pass_outcome(crosses, events_df, t=5)
-cross_to_chance = crosses[crosses['pass_outcome'].isin(['Goal', 'Shot', 'Key Pass'])]
-playerinfo_df = wde.group_player_events(crosses, playerinfo_df, group_type='count', col_names='cross')
-playerinfo_df = wde.group_player_events(cross_to_chance, playerinfo_df, group_type='count', col_names='cross_to_chance')
-
-# High ball wins
-recoveries = events_df[(events_df['eventType']=='BallRecovery') & (events_df['outcomeType']=='Successful')]
-interceptions = events_df[(events_df['eventType']=='Interception') & (events_df['outcomeType']=='Successful')]
-bad_tackles = tackles = events_df[(events_df['eventType']=='Tackle') & (events_df['outcomeType']=='Unsuccessful')]
-tackles = events_df[(events_df['eventType']=='Tackle') & (events_df['outcomeType']=='Successful')]
-pass_blocks = events_df[(events_df['eventType']=='BlockedPass') & (events_df['outcomeType']=='Successful') ]
-ball_wins = pd.concat([recoveries, interceptions, tackles, pass_blocks], axis=0)
-ball_wins_high_33 = ball_wins[ball_wins['x']>=200/3]
-playerinfo_df = wde.group_player_events(tackles, playerinfo_df, group_type='count', col_names='tackles')
-playerinfo_df = wde.group_player_events(bad_tackles, playerinfo_df, group_type='count', col_names='bad_tackles')
-playerinfo_df = wde.group_player_events(ball_wins, playerinfo_df, group_type='count', col_names='ball_wins')
-playerinfo_df = wde.group_player_events(ball_wins_high_33, playerinfo_df, group_type='count', col_names='high_ball_wins')
-
-# Ball losses
-bad_touches = events_df[(events_df['eventType']=='BallTouch') & (events_df['outcomeType']=='Unsuccessful')]
-bad_pass = events_df[(events_df['eventType']=='Pass') & (events_df['outcomeType']=='Unsuccessful')]
-bad_takeon = events_df[(events_df['eventType']=='TakeOn') & (events_df['outcomeType']=='Unsuccessful')]
-disspossessed = events_df[events_df['eventType']=='Disspossessed']
-ball_losses = pd.concat([bad_touches, bad_pass, bad_takeon, disspossessed], axis=0)
-playerinfo_df = wde.group_player_events(ball_losses, playerinfo_df, group_type='count', col_names='ball_losses')
-
-# %% Normalise metrics
-
-playerinfo_df['pass_xt_100_team_touch'] = 100 * playerinfo_df['pass_xt'] / playerinfo_df['team_touch']
-playerinfo_df['carry_xt_100_team_touch'] = 100 * playerinfo_df['carry_xt'] / playerinfo_df['team_touch']
-playerinfo_df['final_3rd_entries_100_team_touch'] = 100 * playerinfo_df['final_3rd_entries'] / playerinfo_df['team_touch']
-playerinfo_df['prog_actions_100_team_touch'] = 100 * playerinfo_df['prog_actions'] / playerinfo_df['team_touch']
+playerinfo_df = wde.aggregate_players(crosses, playerinfo_df, {
+    'cross': (None, 'count'),
+    'cross_to_chance': (crosses['pass_outcome'].isin(['Goal', 'Shot', 'Key Pass']), 'count')})
+
+# %% Normalise metrics (per 90 and per 100 team touches/passes metrics are added by aggregate_players)
+
 playerinfo_df['pass_success_pct'] = 100 * playerinfo_df['suc_passes'] / playerinfo_df['passes']
-playerinfo_df['goal_contributions_100_team_pass'] = 100 * playerinfo_df['goal_contributions'] / playerinfo_df['team_pass']
-playerinfo_df['goal_contributions_90'] = 90 * playerinfo_df['goal_contributions'] / playerinfo_df['mins_played']
-playerinfo_df['box_touches_100_team_pass'] = 100 * playerinfo_df['box_touches'] / playerinfo_df['team_pass']
 playerinfo_df['box_entries_pct'] = 100 * playerinfo_df['suc_box_entries'] / (playerinfo_df['passes'] + playerinfo_df['carries'])
 playerinfo_df['xt_gen_100_team_pass'] = 100 * (playerinfo_df['pass_xt'] + playerinfo_df['carry_xt']) / playerinfo_df['team_pass']
 playerinfo_df['xt_gen_100_team_touch'] = 100 * (playerinfo_df['pass_xt'] + playerinfo_df['carry_xt']) / playerinfo_df['team_touch']
 playerinfo_df['box_shot_conversion'] = 100 * playerinfo_df['box_goals'] / playerinfo_df['box_shots']
-playerinfo_df['big_chances_100_team_pass'] = 100 * playerinfo_df['big_chances'] / playerinfo_df['team_pass']
 playerinfo_df['aerial_win_pct'] = 100 * playerinfo_df['aerials_won'] / playerinfo_df['aerials']
 playerinfo_df['tackles_success_pct'] = 100 * playerinfo_df['tackles'] / (playerinfo_df['tackles'] + playerinfo_df['bad_tackles'])
 playerinfo_df['takeon_pct'] = 100 * playerinfo_df['suc_take_on'] / playerinfo_df['take_on']
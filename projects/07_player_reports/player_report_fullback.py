@@ -20,10 +20,7 @@ import seaborn as sns
 import mplsoccer.pitch
 import os
 import sys
-import bz2
-import pickle
 from scipy.spatial import ConvexHull
-from scipy.interpolate import interp2d
 from scipy.spatial import Delaunay
 from shapely.geometry.polygon import Polygon
 
@@ -35,6 +32,7 @@ sys.path.append(root_folder)
 
 import analysis_tools.whoscored_custom_events as wce
 import analysis_tools.whoscored_data_engineering as wde
+import analysis_tools.whoscored_data_storage as wds
 import analysis_tools.pitch_zones as pz
 import analysis_tools.logos_and_badges as lab
 
@@ -72,32 +70,9 @@ all_data = pd.DataFrame()
 
 for idx, data in enumerate(data_to_load):
     
-    # Determine file path
-    file_path = f"../../data_directory/whoscored_data/{data[2]}_{str(int(data[2].replace('20','', 1)) + 1)}/{data[1]}"
-    files = os.listdir(file_path)
-    
-    # Initialise storage dataframes
-    events_df = pd.DataFrame()
-    players_df = pd.DataFrame()
-    
-    # Load data
-    for file in files:
-        if file == 'event-types.pbz2':
-            event_types = bz2.BZ2File(f"{file_path}/{file}", 'rb')
-            event_types = pickle.load(event_types)
-        elif file == 'formation-mapping.pbz2':
-            formation_mapping = bz2.BZ2File(f"{file_path}/{file}", 'rb')
-            formation_mapping = pickle.load(formation_mapping)
-        elif '-eventdata-' in file:
-            match_events = bz2.BZ2File(f"{file_path}/{file}", 'rb')
-            match_events = pickle.load(match_events)
-            events_df = pd.concat([events_df, match_events])
-        elif '-playerdata-' in file:
-            match_players = bz2.BZ2File(f"{file_path}/{file}", 'rb')
-            match_players = pickle.load(match_players)
-            players_df = pd.concat([players_df, match_players])
-        else:
-            pass
+    # Load data, using compact dtypes as several seasons are held in memory at once
+    events_df, players_df, event_types, formation_mapping = wds.load_season_files(
+        data[1], data[2], data_folder="../../data_directory/whoscored_data")
 
     # Store information
     all_data.loc[idx, 'player'] = data[0]
@@ -146,8 +121,8 @@ for idx, dataset in all_data.iterrows():
     suc_touch_box = inplay_touches[(inplay_touches['outcomeType']=='Successful') & (inplay_touches['x']>=83) & (inplay_touches['y']<=79) & (inplay_touches['y']>=21)]
     
     # Player progressive passes, passes into opposition third and box passes
-    player_events['progressive_action'] = player_events.apply(wce.progressive_action, axis=1)
-    player_events['box_entry'] = player_events.apply(wce.box_entry, axis=1)
+    player_events['progressive_action'] = wce.progressive_actions(player_events)
+    player_events['box_entry'] = wce.box_entries(player_events)
     all_pass =  player_events[player_events['eventType']=='Pass']
     suc_pass = all_pass[all_pass['outcomeType']=='Successful']   
     suc_prog_pass = all_pass[(all_pass['progressive_action']==True)]    
@@ -268,30 +243,8 @@ player_stats['recoveries_90'] = round(90*(player_stats['recoveries']/player_stat
 
 # %% Load league comparison data and analyse
 
-file_path = f"../../data_directory/whoscored_data/{comparison_league[1]}_{str(int(comparison_league[1].replace('20','', 1)) + 1)}/{comparison_league[0]}"
-files = os.listdir(file_path)
-
-# Initialise storage dataframes
-comp_events = pd.DataFrame()
-comp_players = pd.DataFrame()
-
-for file in files:
-    if file == 'event-types.pbz2':
-        event_types = bz2.BZ2File(f"{file_path}/{file}", 'rb')
-        event_types = pickle.load(event_types)
-    elif file == 'formation-mapping.pbz2':
-        formation_mapping = bz2.BZ2File(f"{file_path}/{file}", 'rb')
-        formation_mapping = pickle.load(formation_mapping)
-    elif '-eventdata-' in file:
-        match_events = bz2.BZ2File(f"{file_path}/{file}", 'rb')
-        match_events = pickle.load(match_events)
-        comp_events = pd.concat([comp_events, match_events])
-    elif '-playerdata-' in file:
-        match_players = bz2.BZ2File(f"{file_path}/{file}", 'rb')
-        match_players = pickle.load(match_players)
-        comp_players = pd.concat([comp_players, match_players])
-    else:
-        pass
+comp_events, comp_players, event_types, formation_mapping = wds.load_season_files(
+    comparison_league[0], comparison_league[1], data_folder="../../data_directory/whoscored_data")
 
 
 # %% Produce player dataframe for comparison league
@@ -303,8 +256,8 @@ suc_touch_opp3 = inplay_touches[(inplay_touches['outcomeType']=='Successful') &
 suc_touch_box = inplay_touches[(inplay_touches['outcomeType']=='Successful') & (inplay_touches['x']>=83) & (inplay_touches['y']<=79) & (inplay_touches['y']>=21)]
     
 # Player progressive passes, passes into opposition third and box passes
-comp_events['progressive_action'] = comp_events.apply(wce.progressive_action, axis=1)
-comp_events['box_entry'] = comp_events.apply(wce.box_entry, axis=1)
+comp_events['progressive_action'] = wce.progressive_actions(comp_events)
+comp_events['box_entry'] = wce.box_entries(comp_events)
 all_pass =  comp_events[comp_events['eventType']=='Pass']
 suc_pass = all_pass[all_pass['outcomeType']=='Successful']   
 suc_prog_pass = all_pass[(all_pass['progressive_action']==True)]    
@@ -24,6 +24,7 @@ sys.path.append(root_folder)
 
 import analysis_tools.whoscored_custom_events as wce
 import analysis_tools.whoscored_data_engineering as wde
+import analysis_tools.whoscored_data_storage as wds
 import analysis_tools.logos_and_badges as lab
 
 # %% User inputs
@@ -63,35 +64,11 @@ match_dict = dict.fromkeys([f"{data[0]} {data[1]}" for data in data_grab])
 for data in data_grab:
     league = data[0]
     year = data[1]
-    league_events = pd.DataFrame()
-    league_players = pd.DataFrame()
-        
-    file_path_evts = f"../../data_directory/whoscored_data/{data[1]}_{str(int(data[1].replace('20','', 1)) + 1)}/{data[0]}"
-    files = os.listdir(file_path_evts)
-    idx = 1
-    
-    # Load event data match by match
-    for file in files:
-        if file == 'event-types.pbz2':
-            event_types = bz2.BZ2File(f"{file_path_evts}/{file}", 'rb')
-            event_types = pickle.load(event_types)
-        elif '-eventdata-' in file:
-            match_events = bz2.BZ2File(f"{file_path_evts}/{file}", 'rb')
-            match_events = pickle.load(match_events)
-            if idx == 1:
-                match_shot_events = match_events
-            else:
-                match_shot_events = match_events[match_events['eventType'].isin(['Goal', 'MissedShots', 'SavedShot', 'ShotOnPost'])]
-            league_events = pd.concat([league_events, match_shot_events])
-            print(f"event file {idx}/{int((len(files))/2-1)} loaded")
-            idx += 1
-        elif '-playerdata-' in file:
-            match_players = bz2.BZ2File(f"{file_path_evts}/{file}", 'rb')
-            match_players = pickle.load(match_players)
-            league_players = pd.concat([league_players, match_players])
-        else:
-            pass
-        
+
+    # Load shot events only, filtering each match before concatenation
+    league_events, league_players, event_types, _ = wds.load_season_files(
+        league, year, filters={'eventType': ['Goal', 'MissedShots', 'SavedShot', 'ShotOnPost']})
+
     # Add match ids to match dictionary
     match_dict[f"{data[0]} {data[1]}"] = set(league_events['match_id'].tolist())
     
@@ -113,8 +90,8 @@ all_shots['angle'] = np.arctan2(all_shots['y_distance'],all_shots['x_distance'])
 
 # %% Get ground inplay shots and headed shots
 
-all_ip_shots = all_shots[~all_shots['satisfiedEventsTypes'].apply(lambda x: 5 in x or 6 in x)]
-all_ip_ground_shots = all_ip_shots[~all_ip_shots['satisfiedEventsTypes'].apply(lambda x: 14 in x)]
+all_ip_shots = all_shots[~wde.has_any(all_shots, [5, 6])]
+all_ip_ground_shots = all_ip_shots[~wde.has_any(all_ip_shots, 14)]
 
 # %% Create shot characteristics dataframe and populate
 
@@ -131,10 +108,10 @@ for idx, league_entry in shot_characteristics_df.iterrows():
     shooting_teams = list(set(season_shots['team_name']))
                                 
     # Split shot dataframe to isolate headers, left foot shots and right foot shots
-    season_headers = season_shots[season_shots['satisfiedEventsTypes'].apply(lambda x: 14 in x)]
-    season_foot_shots = season_shots[season_shots['satisfiedEventsTypes'].apply(lambda x: 12 in x or 13 in x)]        
-    season_rfoot_shots = season_foot_shots[season_foot_shots['satisfiedEventsTypes'].apply(lambda x: 12 in x)]        
-    season_lfoot_shots = season_foot_shots[season_foot_shots['satisfiedEventsTypes'].apply(lambda x: 13 in x)]        
+    season_headers = season_shots[wde.has_any(season_shots, 14)]
+    season_foot_shots = season_shots[wde.has_any(season_shots, [12, 13])]
+    season_rfoot_shots = season_foot_shots[wde.has_any(season_foot_shots, 12)]
+    season_lfoot_shots = season_foot_shots[wde.has_any(season_foot_shots, 13)]
     season_out_box_shots = season_foot_shots[season_foot_shots[['x', 'y']].apply(lambda x: x.x < 83 or x.y < 21.1 or x.y > 78.9, axis=1)]
     
     # Average shot and goal count per match
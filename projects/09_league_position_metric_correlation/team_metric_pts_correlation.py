@@ -3,9 +3,7 @@
 # %% Imports
 
 import pandas as pd
-import bz2
 import os
-import pickle
 import matplotlib.pyplot as plt
 import seaborn as sns
 import sys
@@ -22,7 +20,9 @@ sys.path.append(root_folder)
 
 import analysis_tools.whoscored_custom_events as wce
 import analysis_tools.whoscored_data_engineering as wde
+import analysis_tools.whoscored_data_storage as wds
 import analysis_tools.logos_and_badges as lab
+import analysis_tools.data_codecs as dcd
 
 # %% User inputs
 
@@ -49,28 +49,10 @@ match_dict = dict.fromkeys([f"{data[0]} {data[1]}" for data in data_grab])
 for data in data_grab:
     league = data[0]
     year = data[1]
-    league_events = pd.DataFrame()
-    league_players = pd.DataFrame()
-        
-    file_path_evts = f"../../data_directory/whoscored_data/{data[1]}_{str(int(data[1].replace('20','', 1)) + 1)}/{data[0]}"
-    files = os.listdir(file_path_evts)
-    
-    # Load event data match by match
-    for file in files:
-        if file == 'event-types.pbz2':
-            event_types = bz2.BZ2File(f"{file_path_evts}/{file}", 'rb')
-            event_types = pickle.load(event_types)
-        elif '-eventdata-' in file:
-            match_events = bz2.BZ2File(f"{file_path_evts}/{file}", 'rb')
-            match_events = pickle.load(match_events)
-            league_events = pd.concat([league_events, match_events])
-        elif '-playerdata-' in file:
-            match_players = bz2.BZ2File(f"{file_path_evts}/{file}", 'rb')
-            match_players = pickle.load(match_players)
-            league_players = pd.concat([league_players, match_players])
-        else:
-            pass
-        
+
+    # Load event data for all matches in parallel
+    league_events, league_players, event_types, _ = wds.load_season_files(league, year)
+
     # Add match ids to match dictionary
     match_dict[f"{data[0]} {data[1]}"] = set(league_events['match_id'].tolist())
     
@@ -81,8 +63,7 @@ for data in data_grab:
     # Load league table data
     file_path_league = f"../../data_directory/leaguetable_data/{data[1]}_{str(int(data[1].replace('20','', 1)) + 1)}"
     file = f"{data[0]}-table-{data[1]}.pbz2"
-    league_table = bz2.BZ2File(f"{file_path_league}/{file}", 'rb')
-    league_table = pickle.load(league_table)
+    league_table = dcd.load_object(f"{file_path_league}/{file}")
     league_table['league'] = data[0]
     league_table['year'] = data[1]
     leaguetable_df = pd.concat([leaguetable_df, league_table])
@@ -95,8 +76,8 @@ comp_logo = lab.get_competition_logo(data_grab[-1][0], data_grab[-1][1], logo_br
 
 # %% Process event data
 
-events_df['box_entry_attempt'] = events_df.apply(wce.box_entry, successful_only=False, axis=1)
-events_df['box_entry_successful'] = events_df.apply(wce.box_entry, successful_only=True, axis=1)
+events_df['box_entry_attempt'] = wce.box_entries(events_df, successful_only=False)
+events_df['box_entry_successful'] = wce.box_entries(events_df, successful_only=True)
 
 # %% Manual team name replacements
 
@@ -8,8 +8,6 @@ from mplsoccer.pitch import VerticalPitch, Pitch
 import matplotlib.patheffects as path_effects
 import os
 import sys
-import bz2
-import pickle
 import numpy as np
 from collections import Counter
 import highlight_text as htext
@@ -29,6 +27,8 @@ import analysis_tools.get_football_data as gfd
 import analysis_tools.whoscored_custom_events as wce
 import analysis_tools.models as models
 import analysis_tools.whoscored_data_engineering as wde
+import analysis_tools.whoscored_data_storage as wds
+import analysis_tools.match_cache as mc
 import analysis_tools.logos_and_badges as lab
 
 # %% User Inputs
@@ -44,31 +44,7 @@ team = 'Brighton'
 
 # %% Get whoscored data and get statsbomb data
 
-file_path = f"../../data_directory/whoscored_data/{year}_{str(int(year.replace('20','')) + 1)}/{league}"
-files = os.listdir(file_path)
-
-# Initialise storage dataframes
-events_df = pd.DataFrame()
-players_df = pd.DataFrame()
-
-# Load whoscored data
-for file in files:
-    if file == 'event-types.pbz2':
-        event_types = bz2.BZ2File(f"{file_path}/{file}", 'rb')
-        event_types = pickle.load(event_types)
-    elif file == 'formation-mapping.pbz2':
-        formation_mapping = bz2.BZ2File(f"{file_path}/{file}", 'rb')
-        formation_mapping = pickle.load(formation_mapping)
-    elif '-eventdata-' in file:
-        match_events = bz2.BZ2File(f"{file_path}/{file}", 'rb')
-        match_events = pickle.load(match_events)
-        events_df = pd.concat([events_df, match_events])
-    elif '-playerdata-' in file:
-        match_players = bz2.BZ2File(f"{file_path}/{file}", 'rb')
-        match_players = pickle.load(match_players)
-        players_df = pd.concat([players_df, match_players])
-    else:
-        pass
+events_df, players_df, event_types, formation_mapping = wds.load_season_files(league, year)
 
 # %% Isolate matches that team feature in
 
@@ -81,7 +57,7 @@ team_events_df = events_df[events_df['match_id'].isin(team_match_ids)]
 
 # %% Group possessions and count passes in each possession
 
-team_events_df = wce.get_possession_chains(team_events_df)
+team_events_df = mc.cached_apply(wce.get_possession_chains, team_events_df)
 team_events_df = team_events_df[team_events_df['teamId']==team_id]
 
 # Initialise possession chain dataframe